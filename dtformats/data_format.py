@@ -10,13 +10,107 @@ from dfdatetime import posix_time as dfdatetime_posix_time
 
 from dtfabric import errors as dtfabric_errors
 from dtfabric.runtime import data_maps as dtfabric_data_maps
-from dtfabric.runtime import fabric as dtfabric_fabric
 
 from dtformats import errors
+from dtformats import fabric_cache
 from dtformats import file_system
 from dtformats import yaml_definitions_file
 
 
+class LazyDebugInformation(object):
+  """Descriptor of debug information that is read on first access.
+
+  The debug information is shared by all descriptors that read the same debug
+  definition file with the same format callbacks within the process.
+  """
+
+  _DEBUG_INFORMATION_PER_KEY = {}
+
+  def __init__(
+      self, path, debug_format_callbacks, custom_format_callbacks=None):
+    """Initializes a debug information descriptor.
+
+    Args:
+      path (str): path of the dtFormats debug definition file or None if
+          not available.
+      debug_format_callbacks (dict[str, str]): debug format callbacks.
+      custom_format_callbacks (Optional[dict[str, str]]): custom format
+          callbacks.
+    """
+    super(LazyDebugInformation, self).__init__()
+    self._custom_format_callbacks = custom_format_callbacks or {}
+    self._debug_format_callbacks = debug_format_callbacks
+    self._debug_information = None
+    self._path = path
+
+  def __get__(self, instance, owner=None):
+    """Retrieves the debug information.
+
+    Args:
+      instance (object): instance the descriptor is accessed from or None if
+          accessed from the class.
+      owner (Optional[type]): class the descriptor is accessed from.
+
+    Returns:
+      dict[str, list[tuple[str, str, str]]]: debug information per data type
+          map.
+    """
+    if self._debug_information is None:
+      self._debug_information = self._GetDebugInformation()
+
+    return self._debug_information
+
+  def _GetDebugInformation(self):
+    """Retrieves the debug information from the process-wide cache.
+
+    Returns:
+      dict[str, list[tuple[str, str, str]]]: debug information per data type
+          map.
+    """
+    if not self._path:
+      return {}
+
+    lookup_key = (
+        self._path, tuple(sorted(self._debug_format_callbacks.items())),
+        tuple(sorted(self._custom_format_callbacks.items())))
+
+    debug_information = self._DEBUG_INFORMATION_PER_KEY.get(lookup_key, None)
+    if debug_information is None:
+      debug_information = self._ReadDebugInformation()
+      self._DEBUG_INFORMATION_PER_KEY[lookup_key] = debug_information
+
+    return debug_information
+
+  def _ReadDebugInformation(self):
+    """Reads the debug information from the debug definition file.
+
+    Returns:
+      dict[str, list[tuple[str, str, str]]]: debug information per data type
+          map.
+    """
+    debug_information_per_data_type_map = {}
+
+    debug_definitions_file = yaml_definitions_file.YAMLDebugDefinitionsFile()
+
+    for debug_definition in debug_definitions_file.ReadFromFile(self._path):
+      debug_information = []
+      for attribute in debug_definition.attributes.values():
+        if attribute.format.startswith('custom:'):
+          callback = self._custom_format_callbacks.get(
+              attribute.format[7:], None)
+        else:
+          callback = self._debug_format_callbacks.get(attribute.format, None)
+
+        debug_information_tuple = (
+            attribute.name, attribute.description, callback)
+        debug_information.append(debug_information_tuple)
+
+      debug_information_per_data_type_map[debug_definition.data_type_map] = (
+          debug_information)
+
+    return debug_information_per_data_type_map
+
+
 class BinaryDataFormat(object):
   """Binary data format."""
 
@@ -42,6 +136,10 @@ class BinaryDataFormat(object):
   # ReadDefinitionFile class method.
   _FABRIC = None
 
+  # The minimum number of bytes to read ahead when reading a variable size
+  # structure.
+  _MINIMUM_READ_AHEAD_SIZE = 256
+
   _HEXDUMP_CHARACTER_MAP = [
       '.' if byte < 0x20 or byte > 0x7e else chr(byte) for byte in range(256)]
 
@@ -578,7 +676,53 @@ class BinaryDataFormat(object):
 
     return data_type_map
 
-  def _ReadData(self, file_object, file_offset, data_size, description):
+  def _GetTerminatedStreamSizeHint(
+      self, data_type_map, data_buffer, elements_data_offset, size_hint):
+    """Retrieves a size hint of a stream with an elements terminator.
+
+    Args:
+      data_type_map (dtfabric.DataTypeMap): data type map of the stream.
+      data_buffer (bytearray): data read so far.
+      elements_data_offset (int): offset of the first element that was not
+          mapped.
+      size_hint (int): size hint provided by the data type map.
+
+    Returns:
+      int: size hint that includes the elements terminator if present in
+          the data read so far, or that exceeds the data read so far otherwise.
+    """
+    if (not isinstance(data_type_map, dtfabric_data_maps.StreamMap) or
+        not getattr(self, '_FABRIC', None)):
+      return size_hint
+
+    data_type_definition = self._FABRIC.GetDefinitionByName(
+        data_type_map.name)
+    elements_terminator = getattr(
+        data_type_definition, 'elements_terminator', None)
+    if not elements_terminator:
+      return size_hint
+
+    element_byte_size = len(elements_terminator)
+    buffer_size = len(data_buffer)
+
+    terminator_offset = data_buffer.find(
+        elements_terminator, elements_data_offset)
+    while terminator_offset != -1:
+      if (terminator_offset - elements_data_offset) % element_byte_size == 0:
+        return terminator_offset + element_byte_size
+
+      terminator_offset = data_buffer.find(
+          elements_terminator, terminator_offset + 1)
+
+    unmapped_size = buffer_size - elements_data_offset
+    unmapped_size -= unmapped_size % element_byte_size
+
+    return max(size_hint, elements_data_offset + unmapped_size + (
+        element_byte_size))
+
+  def _ReadData(
+      self, file_object, file_offset, data_size, description,
+      read_ahead_size=0):
     """Reads data.
 
     Args:
@@ -587,9 +731,12 @@ class BinaryDataFormat(object):
           the file-like object.
       data_size (int): size of the data.
       description (str): description of the data.
+      read_ahead_size (Optional[int]): number of bytes to read in addition to
+          the size of the data, if available, or -1 to read all remaining
+          data.
 
     Returns:
-      bytes: byte stream containing the data.
+      bytes: byte stream containing the data and the read ahead data.
 
     Raises:
       ParseError: if the data cannot be read.
@@ -603,10 +750,13 @@ class BinaryDataFormat(object):
     read_error = ''
 
     try:
-      data = file_object.read(data_size)
+      if read_ahead_size < 0:
+        data = file_object.read()
+      else:
+        data = file_object.read(data_size + read_ahead_size)
       read_count = len(data)
 
-      if read_count != data_size:
+      if read_count < data_size:
         read_error = (
             f'missing data (read: {read_count:d}, requested: {data_size:d})')
 
@@ -663,6 +813,11 @@ class BinaryDataFormat(object):
     continue to read from the file-like object until the data type map can be
     successfully mapped onto the byte stream or until an error occurs.
 
+    Data of a variable size structure is accumulated in a growable buffer and
+    every subsequent read at least doubles the size of the buffer, hence the
+    number of reads and mapping attempts grows logarithmically with the size
+    of the structure.
+
     Args:
       file_object (file): a file-like object to parse.
       file_offset (int): offset of the structure data relative to the start
@@ -684,29 +839,58 @@ class BinaryDataFormat(object):
           f'(0x{file_offset:08x})\n'))
 
     context = None
-    data = b''
+    data_buffer = bytearray()
+    data_segment = b''
+    data_size = 0
     last_data_size = 0
 
-    data_size = data_type_map.GetSizeHint()
-    while data_size != last_data_size:
-      read_offset = file_offset + last_data_size
-      read_size = data_size - last_data_size
-      data_segment = self._ReadData(
-          file_object, read_offset, read_size, description)
+    size_hint = data_type_map.GetSizeHint()
+    while size_hint is not None and size_hint != last_data_size:
+      buffer_size = len(data_buffer)
+      if size_hint < last_data_size:
+        # The size hint can shrink for some data types, in which case all
+        # the remaining data is mapped.
+        data_segment = self._ReadData(
+            file_object, file_offset + buffer_size, 0, description,
+            read_ahead_size=-1)
+        data_buffer.extend(data_segment)
+        data_size = len(data_buffer)
 
-      data = b''.join([data, data_segment])
+      else:
+        data_size = size_hint
+        if data_size > buffer_size:
+          read_ahead_size = 0
+          if buffer_size:
+            read_ahead_size = max(buffer_size, self._MINIMUM_READ_AHEAD_SIZE)
+
+          data_segment = self._ReadData(
+              file_object, file_offset + buffer_size, data_size - buffer_size,
+              description, read_ahead_size=read_ahead_size)
+          data_buffer.extend(data_segment)
+
+      if not buffer_size and len(data_segment) == data_size:
+        data = data_segment
+      elif len(data_buffer) == data_size:
+        data = bytes(data_buffer)
+      else:
+        data = bytes(memoryview(data_buffer)[:data_size])
 
       try:
         context = dtfabric_data_maps.DataTypeMapContext()
         structure_values_object = data_type_map.MapByteStream(
             data, context=context)
 
+        if len(data_buffer) > data_size:
+          # Callers can rely on the current offset of the file-like object
+          # hence the read ahead data is skipped.
+          file_object.seek(file_offset + data_size, os.SEEK_SET)
+
         if self._debug:
           first_letter = description[0].upper()
           self._DebugPrintData(
               f'{first_letter:s}{description[1:]:s} data', data)
 
-        return structure_values_object, data_size
+        return structure_values_object, size_hint
 
       except dtfabric_errors.ByteStreamTooSmallError:
         pass
@@ -716,8 +900,15 @@ class BinaryDataFormat(object):
             f'Unable to map {description:s} data at offset: {file_offset:d} '
             f'(0x{file_offset:08x}) with error: {exception!s}'))
 
-      last_data_size = data_size
-      data_size = data_type_map.GetSizeHint(context=context)
+      last_data_size = size_hint
+      size_hint = data_type_map.GetSizeHint(context=context)
+
+      elements_data_offset = context.state.get('elements_data_offset', None)
+      if elements_data_offset is not None:
+        # Scan the read ahead data for the elements terminator instead of
+        # growing the size hint by a single element per mapping attempt.
+        size_hint = self._GetTerminatedStreamSizeHint(
+            data_type_map, data_buffer, elements_data_offset, size_hint)
 
     raise errors.ParseError((
         f'Unable to read {description:s} at offset: {file_offset:d} '
@@ -761,50 +952,38 @@ class BinaryDataFormat(object):
   def ReadDebugInformationFile(cls, filename, custom_format_callbacks=None):
     """Reads a dtFormats debug definition file.
 
+    The debug definition file is read on first access of the debug
+    information, which typically only happens in debug mode.
+
     Args:
       filename (str): name of the dtFormats debug definition file.
       custom_format_callbacks (dict[str, str]): custom format callbacks.
 
     Returns:
-      dict[str, list[tuple[str, str, str]]]: debug information per data type
-          map.
+      LazyDebugInformation: descriptor that provides the debug information per
+          data type map, as a dict[str, list[tuple[str, str, str]]].
     """
-    if not filename:
-      return {}
-
-    debug_information_per_data_type_map = {}
-
-    debug_definitions_file = yaml_definitions_file.YAMLDebugDefinitionsFile()
-
-    custom_format_callbacks = custom_format_callbacks or {}
-
-    path = os.path.join(cls._DEFINITION_FILES_PATH, filename)
-    for debug_definition in debug_definitions_file.ReadFromFile(path):
-      debug_information = []
-      for attribute in debug_definition.attributes.values():
-        if attribute.format.startswith('custom:'):
-          callback = custom_format_callbacks.get(attribute.format[7:], None)
-        else:
-          callback = cls._DEBUG_FORMAT_CALLBACKS.get(attribute.format, None)
+    path = None
+    if filename:
+      path = os.path.join(cls._DEFINITION_FILES_PATH, filename)
 
-        debug_information_tuple = (
-            attribute.name, attribute.description, callback)
-        debug_information.append(debug_information_tuple)
-
-      debug_information_per_data_type_map[debug_definition.data_type_map] = (
-          debug_information)
-
-    return debug_information_per_data_type_map
+    return LazyDebugInformation(
+        path, cls._DEBUG_FORMAT_CALLBACKS,
+        custom_format_callbacks=custom_format_callbacks)
 
   @classmethod
   def ReadDefinitionFile(cls, filename):
     """Reads a dtFabric definition file.
 
+    The definition file is read on first use of the data type fabric. If
+    enabled, the compiled definitions are stored in an on-disk cache, see
+    fabric_cache.GetDefaultCachePath().
+
     Args:
       filename (str): name of the dtFabric definition file.
 
     Returns:
-      dtfabric.DataTypeFabric: data type fabric which contains the data format
+      LazyDataTypeFabric: data type fabric which contains the data format
           data type maps of the data type definition, such as a structure, that
           can be mapped onto binary data or None if no filename is provided.
     """
@@ -812,10 +991,9 @@ class BinaryDataFormat(object):
       return None
 
     path = os.path.join(cls._DEFINITION_FILES_PATH, filename)
-    with open(path, 'rb') as file_object:
-      definition = file_object.read()
+    cache_path = fabric_cache.GetDefaultCachePath()
 
-    return dtfabric_fabric.DataTypeFabric(yaml_definition=definition)
+    return fabric_cache.LazyDataTypeFabric(path, cache_path=cache_path)
 
 
 class BinaryDataFile(BinaryDataFormat):
@@ -838,6 +1016,7 @@ class BinaryDataFile(BinaryDataFormat):
     self._file_object_opened_in_object = False
     self._file_size = 0
     self._file_system_helper = file_system_helper
+    self._memory_mapped = False
     self._path = None
 
   def Close(self):
@@ -854,13 +1033,17 @@ class BinaryDataFile(BinaryDataFormat):
       self._file_object.close()
       self._file_object_opened_in_object = False
     self._file_object = None
+    self._memory_mapped = False
     self._path = None
 
-  def Open(self, path):
+  def Open(self, path, memory_mapped=False):
     """Opens a binary data file.
 
     Args:
       path (str): path to the file.
+      memory_mapped (Optional[bool]): True if the file should be memory mapped,
+          if supported by the file system helper. A memory mapped file prevents
+          a seek and read system call per structure read.
 
     Raises:
       IOError: if the file is already opened.
@@ -870,9 +1053,14 @@ class BinaryDataFile(BinaryDataFormat):
       raise IOError('File already opened')
 
     self._file_size = self._file_system_helper.GetFileSizeByPath(path)
+    self._memory_mapped = memory_mapped
     self._path = path
 
-    file_object = self._file_system_helper.OpenFileByPath(path)
+    if memory_mapped:
+      file_object = self._file_system_helper.OpenFileByPath(
+          path, memory_mapped=True)
+    else:
+      file_object = self._file_system_helper.OpenFileByPath(path)
 
     self.ReadFileObject(file_object)
 
@@ -110,15 +110,19 @@ class DFVFSFileSystemHelper(
       for sub_file_entry in file_entry.sub_file_entries:
         yield sub_file_entry.name
 
-  def OpenFileByPath(self, path):
+  def OpenFileByPath(self, path, memory_mapped=False):
     """Opens a specific file.
 
     Args:
       path (str): path of the file.
+      memory_mapped (Optional[bool]): True if the file should be memory mapped,
+          which is not supported by dfVFS and therefore ignored.
 
     Returns:
       file: file-like object of the file.
     """
+    _ = memory_mapped
+
     path_spec = path_spec_factory.Factory.NewPathSpec(
         self._file_system.type_indicator, location=path,
         parent=self._parent_path_spec)
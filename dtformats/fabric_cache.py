@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Cache of compiled dtFabric definition files."""
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+import dtfabric
+
+from dtfabric.runtime import fabric as dtfabric_fabric
+
+import dtformats
+
+
+# Version of the on-disk cache format, which should be changed when the format
+# of the cached data changes.
+_CACHE_FORMAT_VERSION = 1
+
+
+def GetDefaultCachePath():
+  """Retrieves the default path of the on-disk cache.
+
+  The on-disk cache is only used if the DTFORMATS_CACHE_DIR environment
+  variable is set to the path of the cache.
+
+  Returns:
+    str: path of the on-disk cache or None if disabled.
+  """
+  return os.environ.get('DTFORMATS_CACHE_DIR', None) or None
+
+
+class DataTypeFabricCache(object):
+  """On-disk cache of compiled dtFabric definition files.
+
+  The compiled data type fabrics are keyed on a hash of the YAML definition
+  and of the versions of dtFormats, dtFabric and Python. Since unpickling can
+  run code, the cache directory is created only accessible by the current
+  user and cache files that are not owned by the current user are ignored.
+  """
+
+  def __init__(self, path):
+    """Initializes an on-disk cache of compiled dtFabric definition files.
+
+    Args:
+      path (str): path of the directory that contains the cache.
+    """
+    super(DataTypeFabricCache, self).__init__()
+    self._path = path
+
+  def _GetCacheFilePath(self, yaml_definition):
+    """Retrieves the path of the cache file of a definition.
+
+    Args:
+      yaml_definition (bytes): YAML definition.
+
+    Returns:
+      str: path of the cache file.
+    """
+    versions_string = (
+        f'{_CACHE_FORMAT_VERSION:d}:{dtformats.__version__:s}:'
+        f'{dtfabric.__version__:s}:{sys.version_info[0]:d}.'
+        f'{sys.version_info[1]:d}:')
+
+    hash_context = hashlib.sha256()
+    hash_context.update(versions_string.encode('ascii'))
+    hash_context.update(yaml_definition)
+
+    return os.path.join(self._path, f'{hash_context.hexdigest():s}.pickle')
+
+  def _IsOwnedByCurrentUser(self, file_object):
+    """Determines if a cache file is owned by the current user.
+
+    Args:
+      file_object (file): file-like object of the cache file.
+
+    Returns:
+      bool: True if the cache file is owned by the current user or if
+          ownership is not supported by the operating system.
+    """
+    if not hasattr(os, 'getuid'):
+      return True
+
+    stat_object = os.fstat(file_object.fileno())
+    return stat_object.st_uid == os.getuid()
+
+  def GetFabric(self, yaml_definition):
+    """Retrieves a data type fabric, compiling it if not cached.
+
+    Errors reading or writing the cache are ignored, in which case the YAML
+    definition is compiled.
+
+    Args:
+      yaml_definition (bytes): YAML definition.
+
+    Returns:
+      dtfabric.DataTypeFabric: data type fabric.
+    """
+    cache_file_path = self._GetCacheFilePath(yaml_definition)
+
+    try:
+      with open(cache_file_path, 'rb') as file_object:
+        fabric = None
+        if self._IsOwnedByCurrentUser(file_object):
+          fabric = pickle.load(file_object)
+
+      if isinstance(fabric, dtfabric_fabric.DataTypeFabric):
+        return fabric
+
+    except (AttributeError, EOFError, ImportError, IndexError, OSError,
+            pickle.UnpicklingError):
+      pass
+
+    fabric = dtfabric_fabric.DataTypeFabric(yaml_definition=yaml_definition)
+
+    try:
+      os.makedirs(self._path, mode=0o700, exist_ok=True)
+
+      with tempfile.NamedTemporaryFile(
+          dir=self._path, delete=False, suffix='.tmp') as file_object:
+        temporary_path = file_object.name
+        pickle.dump(fabric, file_object, protocol=pickle.HIGHEST_PROTOCOL)
+
+      # Replace atomically so concurrent processes never read a partial file.
+      os.replace(temporary_path, cache_file_path)
+
+    except (OSError, pickle.PicklingError):
+      pass
+
+    return fabric
+
+
+class LazyDataTypeFabric(object):
+  """Data type fabric that is read from a definition file on first use.
+
+  Data type fabrics are shared by all instances that read the same definition
+  file within the process.
+  """
+
+  _FABRICS_PER_PATH = {}
+
+  def __init__(self, path, cache_path=None):
+    """Initializes a lazy data type fabric.
+
+    Args:
+      path (str): path of the dtFabric definition file.
+      cache_path (Optional[str]): path of the on-disk cache of compiled
+          definition files, where None disables the on-disk cache.
+    """
+    super(LazyDataTypeFabric, self).__init__()
+    self._cache_path = cache_path
+    self._fabric = None
+    self._path = path
+
+  def _GetFabric(self):
+    """Retrieves the data type fabric, reading it on first use.
+
+    Returns:
+      dtfabric.DataTypeFabric: data type fabric.
+    """
+    if self._fabric is None:
+      fabric = self._FABRICS_PER_PATH.get(self._path, None)
+      if fabric is None:
+        with open(self._path, 'rb') as file_object:
+          yaml_definition = file_object.read()
+
+        if self._cache_path:
+          fabric_cache = DataTypeFabricCache(self._cache_path)
+          fabric = fabric_cache.GetFabric(yaml_definition)
+        else:
+          fabric = dtfabric_fabric.DataTypeFabric(
+              yaml_definition=yaml_definition)
+
+        self._FABRICS_PER_PATH[self._path] = fabric
+
+      self._fabric = fabric
+
+    return self._fabric
+
+  def CreateDataTypeMap(self, definition_name):
+    """Creates a specific data type map by name.
+
+    Args:
+      definition_name (str): name of the data type definition.
+
+    Returns:
+      DataTypeMap: data type map or None if the date type definition
+          is not available.
+    """
+    return self._GetFabric().CreateDataTypeMap(definition_name)
+
+  def CreateDataTypeMapByType(self, data_type_definition):
+    """Creates a specific data type map by type indicator.
+
+    Args:
+      data_type_definition (DataTypeDefinition): data type definition.
+
+    Returns:
+      DataTypeMap: data type map or None if the date type definition
+          is not available.
+    """
+    return self._GetFabric().CreateDataTypeMapByType(data_type_definition)
+
+  def GetDataTypeDefinition(self, definition_name):
+    """Retrieves a specific data type definition by name.
+
+    Args:
+      definition_name (str): name of the data type definition.
+
+    Returns:
+      DataTypeDefinition: data type definition or None if the date type
+          definition is not available.
+    """
+    return self._GetFabric().GetDataTypeDefinition(definition_name)
+
+  def GetDefinitionByName(self, definition_name):
+    """Retrieves a specific data type definition by name.
+
+    Args:
+      definition_name (str): name of the data type definition.
+
+    Returns:
+      DataTypeDefinition: data type definition or None if the date type
+          definition is not available.
+    """
+    return self._GetFabric().GetDefinitionByName(definition_name)
@@ -2,6 +2,7 @@
 """File system helper."""
 
 import abc
+import mmap
 import os
 
 
@@ -75,11 +76,13 @@ class FileSystemHelper(object):
     """
 
   @abc.abstractmethod
-  def OpenFileByPath(self, path):
+  def OpenFileByPath(self, path, memory_mapped=False):
     """Opens a specific file.
 
     Args:
       path (str): path of the file.
+      memory_mapped (Optional[bool]): True if the file should be memory mapped,
+          if supported by the file system helper.
 
     Returns:
       file: file-like object of the file.
@@ -98,6 +101,113 @@ class FileSystemHelper(object):
     """
 
 
+class MemoryMappedFileObject(object):
+  """Memory mapped file-like object.
+
+  The file-like object reads data from a memory mapped file, which prevents
+  a seek and read system call per read.
+  """
+
+  def __init__(self, file_object):
+    """Initializes a memory mapped file-like object.
+
+    Args:
+      file_object (file): file-like object of the file to memory map, which
+          must have a file descriptor and is closed when the memory mapped
+          file-like object is closed.
+    """
+    super(MemoryMappedFileObject, self).__init__()
+    self._buffer = mmap.mmap(file_object.fileno(), 0, access=mmap.ACCESS_READ)
+    self._current_offset = 0
+    self._file_object = file_object
+    self._size = len(self._buffer)
+
+  # The following methods are part of the file-like object interface.
+  # pylint: disable=invalid-name
+
+  def close(self):
+    """Closes the file-like object."""
+    if self._buffer is not None:
+      self._buffer.close()
+      self._buffer = None
+
+    if self._file_object is not None:
+      self._file_object.close()
+      self._file_object = None
+
+  def get_size(self):
+    """Retrieves the size of the file-like object.
+
+    Returns:
+      int: size of the file-like object data.
+    """
+    return self._size
+
+  def read(self, size=None):
+    """Reads a byte string from the file-like object.
+
+    Args:
+      size (Optional[int]): number of bytes to read, where None or a negative
+          value represents all remaining data.
+
+    Returns:
+      bytes: data read.
+
+    Raises:
+      IOError: if the file-like object is closed.
+      OSError: if the file-like object is closed.
+    """
+    if self._buffer is None:
+      raise IOError('File-like object closed.')
+
+    if size is None or size < 0:
+      end_offset = self._size
+    else:
+      end_offset = min(self._current_offset + size, self._size)
+
+    data = self._buffer[self._current_offset:end_offset]
+    self._current_offset += len(data)
+
+    return data
+
+  def seek(self, offset, whence=os.SEEK_SET):
+    """Seeks to an offset within the file-like object.
+
+    Args:
+      offset (int): offset to seek to.
+      whence (Optional(int)): value that indicates whether offset is an absolute
+          or relative position within the file.
+
+    Returns:
+      int: current offset.
+
+    Raises:
+      IOError: if the seek failed.
+      OSError: if the seek failed.
+    """
+    if whence == os.SEEK_CUR:
+      offset += self._current_offset
+    elif whence == os.SEEK_END:
+      offset += self._size
+    elif whence != os.SEEK_SET:
+      raise IOError('Unsupported whence.')
+
+    if offset < 0:
+      raise IOError('Invalid offset value less than zero.')
+
+    self._current_offset = offset
+
+    return self._current_offset
+
+  def tell(self):
+    """Retrieves the current offset into the file-like object.
+
+    Returns:
+      int: current offset.
+    """
+    return self._current_offset
+
+
 class NativeFileSystemHelper(object):
   """Python native system helper."""
 
@@ -169,16 +279,24 @@ class NativeFileSystemHelper(object):
     """
     yield from os.listdir(path)
 
-  def OpenFileByPath(self, path):
+  def OpenFileByPath(self, path, memory_mapped=False):
     """Opens a specific file.
 
     Args:
       path (str): path of the file.
+      memory_mapped (Optional[bool]): True if the file should be memory mapped.
+          Note that empty files cannot be memory mapped and are opened as
+          a regular file instead.
 
     Returns:
       file: file-like object of the file.
     """
-    return open(path, 'rb')  # pylint: disable=consider-using-with
+    file_object = open(path, 'rb')  # pylint: disable=consider-using-with
+
+    if memory_mapped and os.fstat(file_object.fileno()).st_size > 0:
+      file_object = MemoryMappedFileObject(file_object)
+
+    return file_object
 
   def SplitPath(self, path):
     """Splits the path into path segments.
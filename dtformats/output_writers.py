@@ -2,6 +2,7 @@
 """Output writer."""
 
 import abc
+import sys
 
 
 class OutputWriter(object):
@@ -71,3 +72,53 @@ class StdoutWriter(OutputWriter):
     alignment, _ = divmod(len(description_no_tabs), 8)
     alignment_string = '\t' * (8 - alignment + 1)
     self.WriteText(f'{description:s}{alignment_string:s}: {value!s}\n')
+
+
+class BufferedStdoutWriter(StdoutWriter):
+  """Buffered stdout output writer.
+
+  Text is written to stdout in blocks of at least the buffer size, which
+  is considerably faster than writing many small strings.
+  """
+
+  _DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+  def __init__(self, buffer_size=None):
+    """Initializes a buffered stdout output writer.
+
+    Args:
+      buffer_size (Optional[int]): size, in number of characters, of the
+          text to buffer before writing it to stdout, where None represents
+          the default.
+    """
+    super(BufferedStdoutWriter, self).__init__()
+    self._buffer = []
+    self._buffer_size = buffer_size or self._DEFAULT_BUFFER_SIZE
+    self._buffered_size = 0
+
+  def Close(self):
+    """Closes the output writer object."""
+    self.Flush()
+
+  def Flush(self):
+    """Writes the buffered text to stdout."""
+    if self._buffer:
+      sys.stdout.write(''.join(self._buffer))
+      self._buffer = []
+      self._buffered_size = 0
+
+    sys.stdout.flush()
+
+  def WriteText(self, text):
+    """Writes text to the output.
+
+    Args:
+      text (str): text to write.
+    """
+    self._buffer.append(text)
+    self._buffered_size += len(text)
+
+    if self._buffered_size >= self._buffer_size:
+      sys.stdout.write(''.join(self._buffer))
+      self._buffer = []
+      self._buffered_size = 0
@@ -2,11 +2,20 @@
 """Apple Unified Logging and Activity Tracing files."""
 
 import abc
+import array
 import base64
+import bisect
 import collections
+import concurrent.futures
+import functools
+import heapq
 import os
+import pickle
 import re
+import sqlite3
 import struct
+import sys
+import tempfile
 import uuid
 
 import lz4.block
@@ -18,6 +27,7 @@ from dtfabric.runtime import data_maps as dtfabric_data_maps
 from dtformats import darwin
 from dtformats import data_format
 from dtformats import errors
+from dtformats import file_system
 
 
 class DSCRange(object):
@@ -76,6 +86,11 @@ class ImageValues(object):
     text_offset (int): the offset of the text.
   """
 
+  # String formatters shared by image values with the same format string.
+  _CACHED_STRING_FORMATTERS = collections.OrderedDict()
+
+  _MAXIMUM_CACHED_STRING_FORMATTERS = 16384
+
   def __init__(
       self, identifier=None, path=None, string=None, text_offset=None):
     """Initializes image values.
@@ -96,16 +111,270 @@ class ImageValues(object):
   def GetStringFormatter(self):
     """Retrieves a string formatter.
 
+    String formatters are shared by image values with the same format string,
+    hence a format string is parsed and its value formatters are compiled
+    only once.
+
     Returns:
       StringFormatter: string formatter.
     """
     if not self._string_formatter:
-      self._string_formatter = StringFormatter()
-      self._string_formatter.ParseFormatString(self.string)
+      string_formatter = self._CACHED_STRING_FORMATTERS.get(self.string, None)
+      if string_formatter:
+        self._CACHED_STRING_FORMATTERS.move_to_end(self.string)
+      else:
+        string_formatter = StringFormatter()
+        string_formatter.ParseFormatString(self.string)
+
+        if len(self._CACHED_STRING_FORMATTERS) >= (
+            self._MAXIMUM_CACHED_STRING_FORMATTERS):
+          self._CACHED_STRING_FORMATTERS.popitem(last=False)
+
+        self._CACHED_STRING_FORMATTERS[self.string] = string_formatter
+
+      self._string_formatter = string_formatter
 
     return self._string_formatter
 
 
+class ImageValuesCache(object):
+  """Persistent cache of image values and image paths.
+
+  The cache is a SQLite database that stores the image values read from
+  the uuidtext and shared-cache strings (DSC) files, keyed on the UUID of
+  the strings file, the string reference and the dynamic flag. Since the
+  content of a strings file is identified by its UUID, the cache can be
+  shared by different runs and processes that read log archives of the same
+  operating system builds.
+
+  The rows read from and written to the database are also kept in memory
+  while the cache is opened, hence the database is queried at most once per
+  key and only new rows are written to it.
+  """
+
+  # Version of the database schema, which should be changed when the format
+  # of the cached data changes.
+  _SCHEMA_VERSION = 1
+
+  _CREATE_TABLES_QUERIES = [
+      ('CREATE TABLE IF NOT EXISTS image_paths ('
+       'uuid TEXT PRIMARY KEY, path TEXT) WITHOUT ROWID'),
+      ('CREATE TABLE IF NOT EXISTS image_values ('
+       'uuid TEXT, string_reference INTEGER, is_dynamic INTEGER, '
+       'identifier TEXT, path TEXT, string TEXT, text_offset INTEGER, '
+       'PRIMARY KEY (uuid, string_reference, is_dynamic)) WITHOUT ROWID')]
+
+  # Number of insertions after which they are committed.
+  _MAXIMUM_PENDING_INSERTIONS = 1024
+
+  def __init__(self):
+    """Initializes a persistent cache of image values and image paths."""
+    super(ImageValuesCache, self).__init__()
+    self._connection = None
+    self._image_paths = {}
+    self._image_values = {}
+    self._number_of_pending_insertions = 0
+
+  def _Insert(self, query, values):
+    """Inserts values into the database.
+
+    Insertions are committed in batches. Errors, such as another process that
+    holds the lock on the database, are ignored since the values are only
+    cached.
+
+    Args:
+      query (str): SQL insert query.
+      values (tuple[object]): values to insert.
+    """
+    try:
+      self._connection.execute(query, values)
+
+      self._number_of_pending_insertions += 1
+      if self._number_of_pending_insertions >= (
+          self._MAXIMUM_PENDING_INSERTIONS):
+        self._connection.commit()
+        self._number_of_pending_insertions = 0
+
+    except sqlite3.Error:
+      pass
+
+  def Close(self):
+    """Closes the cache.
+
+    Raises:
+      IOError: if the cache is not opened.
+      OSError: if the cache is not opened.
+    """
+    if not self._connection:
+      raise IOError('Cache not opened')
+
+    try:
+      self._connection.commit()
+    except sqlite3.Error:
+      pass
+
+    self._connection.close()
+    self._connection = None
+    self._image_paths = {}
+    self._image_values = {}
+    self._number_of_pending_insertions = 0
+
+  def GetImagePath(self, uuid_string):
+    """Retrieves a cached image path.
+
+    Args:
+      uuid_string (str): string representation of the UUID of the uuidtext
+          file.
+
+    Returns:
+      str: image path or None if not cached.
+    """
+    if uuid_string in self._image_paths:
+      return self._image_paths[uuid_string]
+
+    try:
+      row = self._connection.execute(
+          'SELECT path FROM image_paths WHERE uuid = ?',
+          (uuid_string, )).fetchone()
+    except sqlite3.Error:
+      return None
+
+    image_path = row[0] if row else None
+    self._image_paths[uuid_string] = image_path
+
+    return image_path
+
+  def GetImageValues(self, uuid_string, string_reference, is_dynamic):
+    """Retrieves cached image values.
+
+    Args:
+      uuid_string (str): string representation of the UUID of the strings
+          file.
+      string_reference (int): string reference.
+      is_dynamic (bool): dynamic flag.
+
+    Returns:
+      ImageValues: image values or None if not cached.
+    """
+    lookup_key = (uuid_string, string_reference, bool(is_dynamic))
+    if lookup_key in self._image_values:
+      row = self._image_values[lookup_key]
+
+    else:
+      try:
+        row = self._connection.execute((
+            'SELECT identifier, path, string, text_offset FROM image_values '
+            'WHERE uuid = ? AND string_reference = ? AND is_dynamic = ?'), (
+                uuid_string, string_reference, int(is_dynamic))).fetchone()
+      except sqlite3.Error:
+        return None
+
+      self._image_values[lookup_key] = row
+
+    if not row:
+      return None
+
+    identifier, path, string, text_offset = row
+    if identifier is not None:
+      identifier = uuid.UUID(identifier)
+
+    return ImageValues(
+        identifier=identifier, path=path, string=string,
+        text_offset=text_offset)
+
+  def Open(self, path):
+    """Opens the cache.
+
+    Args:
+      path (str): path of the SQLite database file, which is created if it
+          does not exist.
+
+    Raises:
+      IOError: if the cache is already opened or cannot be opened.
+      OSError: if the cache is already opened or cannot be opened.
+    """
+    if self._connection:
+      raise IOError('Cache already opened')
+
+    try:
+      connection = sqlite3.connect(path, timeout=5.0)
+
+    except sqlite3.Error as exception:
+      raise IOError(
+          f'Unable to open cache: {path:s} with error: {exception!s}')
+
+    try:
+      # Write-ahead logging allows other processes to read the database
+      # while it is being written to.
+      connection.execute('PRAGMA journal_mode=WAL')
+      connection.execute('PRAGMA synchronous=NORMAL')
+
+      schema_version = connection.execute('PRAGMA user_version').fetchone()[0]
+      if schema_version not in (0, self._SCHEMA_VERSION):
+        connection.execute('DROP TABLE IF EXISTS image_paths')
+        connection.execute('DROP TABLE IF EXISTS image_values')
+
+      for query in self._CREATE_TABLES_QUERIES:
+        connection.execute(query)
+
+      connection.execute(f'PRAGMA user_version={self._SCHEMA_VERSION:d}')
+      connection.commit()
+
+    except sqlite3.Error as exception:
+      connection.close()
+      raise IOError(
+          f'Unable to open cache: {path:s} with error: {exception!s}')
+
+    self._connection = connection
+
+  def SetImagePath(self, uuid_string, image_path):
+    """Caches an image path.
+
+    Args:
+      uuid_string (str): string representation of the UUID of the uuidtext
+          file.
+      image_path (str): image path.
+    """
+    if self._image_paths.get(uuid_string, None) is not None:
+      return
+
+    self._image_paths[uuid_string] = image_path
+
+    self._Insert(
+        'INSERT OR REPLACE INTO image_paths VALUES (?, ?)',
+        (uuid_string, image_path))
+
+  def SetImageValues(
+      self, uuid_string, string_reference, is_dynamic, image_values):
+    """Caches image values.
+
+    Args:
+      uuid_string (str): string representation of the UUID of the strings
+          file.
+      string_reference (int): string reference.
+      is_dynamic (bool): dynamic flag.
+      image_values (ImageValues): image values.
+    """
+    lookup_key = (uuid_string, string_reference, bool(is_dynamic))
+    if self._image_values.get(lookup_key, None):
+      return
+
+    identifier = image_values.identifier
+    if identifier is not None:
+      identifier = str(identifier)
+
+    # A copy of the values is kept since image values can be changed after
+    # they have been cached.
+    self._image_values[lookup_key] = (
+        identifier, image_values.path, image_values.string,
+        image_values.text_offset)
+
+    self._Insert(
+        'INSERT OR REPLACE INTO image_values VALUES (?, ?, ?, ?, ?, ?, ?)', (
+            uuid_string, string_reference, int(is_dynamic), identifier,
+            image_values.path, image_values.string, image_values.text_offset))
+
+
 class BacktraceFrame(object):
   """Backtrace frame.
 
@@ -130,7 +399,8 @@ class LogEntry(object):
     boot_identifier (uuid.UUID): boot identifier.
     category (str): (sub system) category.
     creator_activity_identifier (int): creator activity identifier.
-    event_message (str): event message.
+    event_message (str): event message, which can be formatted on first
+        access.
     event_type (str): event type.
     format_string (str): format string.
     loss_count (int): number of message lost.
@@ -164,15 +434,31 @@ class LogEntry(object):
     ttl (int): Time to live (TTL) value.
   """
 
+  # Slots are used since a log entry is created for every tracepoint and
+  # many log entries can be kept in memory, such as for sorting.
+  __slots__ = (
+      '_deferred_event_message', '_event_message', 'activity_identifier',
+      'backtrace_frames', 'boot_identifier', 'category',
+      'creator_activity_identifier', 'event_type', 'format_string',
+      'loss_count', 'loss_end_mach_timestamp', 'loss_end_timestamp',
+      'loss_start_mach_timestamp', 'loss_start_timestamp', 'mach_timestamp',
+      'message_type', 'parent_activity_identifier', 'process_identifier',
+      'process_image_identifier', 'process_image_path',
+      'sender_image_identifier', 'sender_image_path', 'sender_program_counter',
+      'signpost_identifier', 'signpost_name', 'signpost_scope', 'signpost_type',
+      'sub_system', 'thread_identifier', 'timestamp', 'time_zone_name',
+      'trace_identifier', 'ttl')
+
   def __init__(self):
     """Initializes a log entry."""
     super(LogEntry, self).__init__()
+    self._deferred_event_message = None
+    self._event_message = None
     self.activity_identifier = None
     self.backtrace_frames = None
     self.boot_identifier = None
     self.category = None
     self.creator_activity_identifier = None
-    self.event_message = None
     self.event_type = None
     self.format_string = None
     self.loss_count = None
@@ -200,6 +486,19 @@ class LogEntry(object):
     self.trace_identifier = None
     self.ttl = None
 
+  def __getstate__(self):
+    """Retrieves the state of the log entry for pickling.
+
+    A deferred event message is pickled as the function that formats it and
+    its arguments, which therefore must be picklable. The event message is
+    formatted on first access after unpickling, for example in a worker
+    process.
+
+    Returns:
+      dict[str, object]: state of the log entry.
+    """
+    return {name: getattr(self, name) for name in self.__slots__}
+
   # This method is necessary for heap sort.
   def __lt__(self, other):
     """Compares if the log entry is less than the other.
@@ -214,6 +513,307 @@ class LogEntry(object):
     """
     return self.timestamp < other.timestamp
 
+  def __setstate__(self, state):
+    """Sets the state of the log entry when unpickling.
+
+    Args:
+      state (dict[str, object]): state of the log entry.
+    """
+    for name, value in state.items():
+      setattr(self, name, value)
+
+  @property
+  def event_message(self):
+    """str: event message."""
+    if self._deferred_event_message:
+      self.MaterializeEventMessage()
+
+    return self._event_message
+
+  @event_message.setter
+  def event_message(self, event_message):
+    """Sets the event message.
+
+    Args:
+      event_message (str): event message.
+    """
+    self._deferred_event_message = None
+    self._event_message = event_message
+
+  def MaterializeEventMessage(self):
+    """Formats the event message if its formatting was deferred.
+
+    Raises:
+      ParseError: if the values of the event message cannot be read.
+    """
+    if self._deferred_event_message:
+      function, arguments = self._deferred_event_message
+      self._event_message = function(*arguments)
+      self._deferred_event_message = None
+
+  def SetDeferredEventMessage(self, function, arguments):
+    """Sets a deferred event message.
+
+    The event message is formatted on first access of event_message or by
+    MaterializeEventMessage.
+
+    Args:
+      function (function): function that formats the event message.
+      arguments (tuple[object]): arguments of the function.
+    """
+    self._deferred_event_message = (function, arguments)
+    self._event_message = None
+
+
+class LogEntryBatch(object):
+  """Batch of log entries stored as columns.
+
+  Integer values are stored in arrays and string values in lists of interned
+  strings, which requires significantly less memory than individual log
+  entries and allows a column to be filtered or sorted as a whole. The values
+  of the same log entry are stored at the same index in every column.
+
+  Attributes:
+    activity_identifiers (array.array): activity identifiers.
+    categories (list[str]): (sub system) categories.
+    event_messages (list[str]): event messages.
+    event_types (list[str]): event types.
+    mach_timestamps (array.array): Mach timestamps.
+    message_types (list[str]): message types.
+    process_identifiers (array.array): process identifiers (PID).
+    process_image_paths (list[str]): paths of the process images.
+    sender_image_paths (list[str]): paths of the (sender) images.
+    sub_systems (list[str]): sub systems.
+    thread_identifiers (array.array): thread identifiers.
+    timestamps (array.array): number of nanoseconds since January 1, 1970
+        00:00:00.000000000.
+    trace_identifiers (array.array): trace identifiers.
+  """
+
+  def __init__(self):
+    """Initializes a log entry batch."""
+    super(LogEntryBatch, self).__init__()
+    self.activity_identifiers = array.array('Q')
+    self.categories = []
+    self.event_messages = []
+    self.event_types = []
+    self.mach_timestamps = array.array('Q')
+    self.message_types = []
+    self.process_identifiers = array.array('Q')
+    self.process_image_paths = []
+    self.sender_image_paths = []
+    self.sub_systems = []
+    self.thread_identifiers = array.array('Q')
+    self.timestamps = array.array('q')
+    self.trace_identifiers = array.array('Q')
+
+  def __len__(self):
+    """Retrieves the number of log entries in the batch.
+
+    Returns:
+      int: number of log entries in the batch.
+    """
+    return len(self.timestamps)
+
+  def _InternString(self, string):
+    """Interns a string.
+
+    Args:
+      string (str): string or None if not set.
+
+    Returns:
+      str: interned string or None if not set.
+    """
+    if string is None:
+      return None
+
+    return sys.intern(string)
+
+  def AppendLogEntry(self, log_entry):
+    """Appends a log entry to the batch.
+
+    Args:
+      log_entry (LogEntry): log entry.
+    """
+    self.activity_identifiers.append(log_entry.activity_identifier or 0)
+    self.categories.append(self._InternString(log_entry.category))
+    self.event_messages.append(log_entry.event_message)
+    self.event_types.append(self._InternString(log_entry.event_type))
+    self.mach_timestamps.append(log_entry.mach_timestamp or 0)
+    self.message_types.append(self._InternString(log_entry.message_type))
+    self.process_identifiers.append(log_entry.process_identifier or 0)
+    self.process_image_paths.append(
+        self._InternString(log_entry.process_image_path))
+    self.sender_image_paths.append(
+        self._InternString(log_entry.sender_image_path))
+    self.sub_systems.append(self._InternString(log_entry.sub_system))
+    self.thread_identifiers.append(log_entry.thread_identifier or 0)
+    self.timestamps.append(log_entry.timestamp or 0)
+    self.trace_identifiers.append(log_entry.trace_identifier or 0)
+
+
+class LogEntryFilter(object):
+  """Log entry filter.
+
+  The filter is evaluated while reading the log entries, so that chunk sets,
+  firehose chunks and tracepoints that cannot match are not decoded.
+
+  Attributes:
+    end_timestamp (int): timestamp, in number of nanoseconds since January 1,
+        1970 00:00:00.000000000, before which log entries should have been
+        logged or None if not set.
+    event_types (frozenset[str]): event types of the log entries, such as
+        "logEvent", or None if not set.
+    process_identifiers (frozenset[int]): process identifiers (PID) of the log
+        entries or None if not set.
+    start_timestamp (int): timestamp, in number of nanoseconds since January
+        1, 1970 00:00:00.000000000, at or after which log entries should have
+        been logged or None if not set.
+    sub_systems (frozenset[str]): sub systems of the log entries or None if
+        not set.
+  """
+
+  def __init__(
+      self, end_timestamp=None, event_types=None, process_identifiers=None,
+      start_timestamp=None, sub_systems=None):
+    """Initializes a log entry filter.
+
+    Args:
+      end_timestamp (Optional[int]): timestamp, in number of nanoseconds since
+          January 1, 1970 00:00:00.000000000, before which log entries should
+          have been logged.
+      event_types (Optional[list[str]]): event types of the log entries.
+      process_identifiers (Optional[list[int]]): process identifiers (PID) of
+          the log entries.
+      start_timestamp (Optional[int]): timestamp, in number of nanoseconds
+          since January 1, 1970 00:00:00.000000000, at or after which log
+          entries should have been logged.
+      sub_systems (Optional[list[str]]): sub systems of the log entries.
+    """
+    super(LogEntryFilter, self).__init__()
+    self.end_timestamp = end_timestamp
+    self.event_types = None
+    self.process_identifiers = None
+    self.start_timestamp = start_timestamp
+    self.sub_systems = None
+
+    if event_types is not None:
+      self.event_types = frozenset(event_types)
+
+    if process_identifiers is not None:
+      self.process_identifiers = frozenset(process_identifiers)
+
+    if sub_systems is not None:
+      self.sub_systems = frozenset(sub_systems)
+
+  def CopyWithTimeRange(self, start_timestamp=None, end_timestamp=None):
+    """Copies the filter restricted to a time range.
+
+    The time range is intersected with the time range of the filter.
+
+    Args:
+      start_timestamp (Optional[int]): timestamp, in number of nanoseconds
+          since January 1, 1970 00:00:00.000000000, at or after which log
+          entries should have been logged.
+      end_timestamp (Optional[int]): timestamp, in number of nanoseconds
+          since January 1, 1970 00:00:00.000000000, before which log entries
+          should have been logged.
+
+    Returns:
+      LogEntryFilter: log entry filter.
+    """
+    if self.start_timestamp is not None and (
+        start_timestamp is None or start_timestamp < self.start_timestamp):
+      start_timestamp = self.start_timestamp
+
+    if self.end_timestamp is not None and (
+        end_timestamp is None or end_timestamp > self.end_timestamp):
+      end_timestamp = self.end_timestamp
+
+    return LogEntryFilter(
+        end_timestamp=end_timestamp, event_types=self.event_types,
+        process_identifiers=self.process_identifiers,
+        start_timestamp=start_timestamp, sub_systems=self.sub_systems)
+
+  def Matches(self, log_entry):
+    """Determines if a log entry matches the filter.
+
+    Args:
+      log_entry (LogEntry): log entry.
+
+    Returns:
+      bool: True if the log entry matches the filter.
+    """
+    return (
+        self.MatchesEventType(log_entry.event_type) and
+        self.MatchesProcessIdentifier(log_entry.process_identifier or 0) and
+        self.MatchesSubSystem(log_entry.sub_system) and
+        self.MatchesTimestamp(log_entry.timestamp))
+
+  def MatchesEventType(self, event_type):
+    """Determines if an event type matches the filter.
+
+    Args:
+      event_type (str): event type.
+
+    Returns:
+      bool: True if the event type matches the filter.
+    """
+    return self.event_types is None or event_type in self.event_types
+
+  def MatchesProcessIdentifier(self, process_identifier):
+    """Determines if a process identifier matches the filter.
+
+    Args:
+      process_identifier (int): process identifier (PID).
+
+    Returns:
+      bool: True if the process identifier matches the filter.
+    """
+    return (self.process_identifiers is None or
+            process_identifier in self.process_identifiers)
+
+  def MatchesSubSystem(self, sub_system):
+    """Determines if a sub system matches the filter.
+
+    Args:
+      sub_system (str): sub system.
+
+    Returns:
+      bool: True if the sub system matches the filter.
+    """
+    return self.sub_systems is None or sub_system in self.sub_systems
+
+  def MatchesTimeRange(self, start_timestamp, end_timestamp):
+    """Determines if a time range overlaps with that of the filter.
+
+    Args:
+      start_timestamp (int): timestamp of the start of the time range, in
+          number of nanoseconds since January 1, 1970 00:00:00.000000000.
+      end_timestamp (int): timestamp of the end of the time range (inclusive),
+          in number of nanoseconds since January 1, 1970 00:00:00.000000000.
+
+    Returns:
+      bool: True if the time range overlaps with that of the filter.
+    """
+    if self.start_timestamp is not None and end_timestamp < (
+        self.start_timestamp):
+      return False
+
+    return self.end_timestamp is None or start_timestamp < self.end_timestamp
+
+  def MatchesTimestamp(self, timestamp):
+    """Determines if a timestamp matches the filter.
+
+    Args:
+      timestamp (int): timestamp, in number of nanoseconds since January 1,
+          1970 00:00:00.000000000.
+
+    Returns:
+      bool: True if the timestamp matches the filter.
+    """
+    return self.MatchesTimeRange(timestamp, timestamp)
+
 
 class FormatStringOperator(object):
   """Format string operator.
@@ -367,6 +967,33 @@ class StringFormatter(object):
     self._decoders = []
     self._format_string = None
     self._operators = []
+    self._value_formatters = None
+    self._value_formatters_decoders = None
+
+  def __getstate__(self):
+    """Retrieves the state of the string formatter for pickling.
+
+    The compiled value formatters are not pickled, since they cannot be, and
+    are compiled again on first use.
+
+    Returns:
+      dict[str, object]: state of the string formatter.
+    """
+    state = dict(self.__dict__)
+    state['_value_formatters'] = None
+    state['_value_formatters_decoders'] = None
+    return state
+
+  def _GetConstantValueFormatter(self, string):
+    """Retrieves a value formatter that ignores the value.
+
+    Args:
+      string (str): string the value formatter returns.
+
+    Returns:
+      function: value formatter.
+    """
+    return lambda value_data: string
 
   def FormatString(self, values):
     """Formats the string.
@@ -418,6 +1045,52 @@ class StringFormatter(object):
     except IndexError:
       return None
 
+  def GetValueFormatters(self, format_string_decoders):
+    """Retrieves the value formatters.
+
+    The value formatters are compiled on first use, with the decoder and
+    format string operator of each value bound to its formatter, so that
+    formatting a value does not need to look them up.
+
+    Args:
+      format_string_decoders (dict[str, BaseFormatStringDecoder]): format
+          string decoders per name.
+
+    Returns:
+      list[function]: value formatters, that take the value data and return
+          the formatted value, per value index.
+    """
+    if (self._value_formatters is None or
+        self._value_formatters_decoders is not format_string_decoders):
+      value_formatters = []
+      for decoder_names, format_string_operator in zip(
+          self._decoders, self._operators):
+        if not decoder_names:
+          value_formatter = self._GetConstantValueFormatter(
+              '<decode: missing decoder>')
+
+        else:
+          decoder_object = format_string_decoders.get(decoder_names[0], None)
+          if not decoder_object:
+            value_formatter = self._GetConstantValueFormatter(
+                f'<decode: unsupported decoder: {decoder_names[0]:s}>')
+
+          else:
+            # Build the Python format string in advance since it is cached
+            # by the format string operator.
+            format_string_operator.GetPythonFormatString()
+
+            value_formatter = functools.partial(
+                decoder_object.FormatValue,
+                format_string_operator=format_string_operator)
+
+        value_formatters.append(value_formatter)
+
+      self._value_formatters = value_formatters
+      self._value_formatters_decoders = format_string_decoders
+
+    return self._value_formatters
+
   def ParseFormatString(self, format_string):
     """Parses an Unified Logging format string.
 
@@ -427,6 +1100,8 @@ class StringFormatter(object):
     self._decoders = []
     self._format_string = None
     self._operators = []
+    self._value_formatters = None
+    self._value_formatters_decoders = None
 
     if not format_string:
       return
@@ -1970,40 +2645,131 @@ class DSCFile(data_format.BinaryDataFile):
     super(DSCFile, self).__init__(
         debug=debug, file_system_helper=file_system_helper,
         output_writer=output_writer)
+    self._range_index = None
+    self._text_range_index = None
     self.ranges = []
     self.uuids = []
 
-  def _ReadFileHeader(self, file_object):
-    """Reads a file header.
+  def _BuildRangeIndex(self, is_dynamic):
+    """Builds an index of the ranges sorted by offset.
 
     Args:
-      file_object (file): file-like object.
+      is_dynamic (bool): True to index the ranges by text offset and size,
+          False to index the ranges by range offset and size.
 
     Returns:
-      dsc_file_header: a file header.
-
-    Raises:
-      ParseError: if the file header cannot be read.
+      tuple[list[int], list[int], list[tuple[int, DSCRange]]]: start offsets
+          of the sorted ranges, maximum end offset of the sorted ranges up to
+          and including the range and the sorted ranges with their index in
+          the list of ranges.
     """
-    data_type_map = self._GetDataTypeMap('dsc_file_header')
+    sorted_ranges = []
+    for range_index, dsc_range in enumerate(self.ranges):
+      if is_dynamic:
+        range_offset = dsc_range.text_offset
+        range_size = dsc_range.text_size
+      else:
+        range_offset = dsc_range.range_offset
+        range_size = dsc_range.range_size
 
-    file_header, _ = self._ReadStructureFromFileObject(
-        file_object, 0, data_type_map, 'file header')
+      sorted_ranges.append((range_offset, range_size, range_index, dsc_range))
 
-    if self._debug:
-      debug_info = self._DEBUG_INFORMATION.get('dsc_file_header', None)
-      self._DebugPrintStructureObject(file_header, debug_info)
+    sorted_ranges.sort(key=lambda values: values[:3])
 
-    if file_header.signature != b'hcsd':
-      raise errors.ParseError('Unsupported signature.')
+    start_offsets = []
+    maximum_end_offsets = []
+    maximum_end_offset = -1
+    for range_offset, range_size, _, _ in sorted_ranges:
+      maximum_end_offset = max(maximum_end_offset, range_offset + range_size)
 
-    format_version = (
-        file_header.major_format_version, file_header.minor_format_version)
-    if format_version not in self._SUPPORTED_FORMAT_VERSIONS:
-      format_version_string = '.'.join([
-          f'{file_header.major_format_version:d}',
-          f'{file_header.minor_format_version:d}'])
-      raise errors.ParseError(
+      start_offsets.append(range_offset)
+      maximum_end_offsets.append(maximum_end_offset)
+
+    ranges = [(range_index, dsc_range) for _, _, range_index, dsc_range in (
+        sorted_ranges)]
+
+    return start_offsets, maximum_end_offsets, ranges
+
+  def _GetRange(self, string_reference, is_dynamic):
+    """Retrieves the range that contains a string reference.
+
+    Args:
+      string_reference (int): reference of the string.
+      is_dynamic (bool): dynamic flag.
+
+    Returns:
+      DSCRange: range or None if not available. If multiple ranges contain
+          the string reference the first range in the file is returned.
+    """
+    if is_dynamic:
+      if self._text_range_index is None:
+        self._text_range_index = self._BuildRangeIndex(True)
+
+      range_index = self._text_range_index
+
+    else:
+      if self._range_index is None:
+        self._range_index = self._BuildRangeIndex(False)
+
+      range_index = self._range_index
+
+    start_offsets, maximum_end_offsets, ranges = range_index
+
+    # Ranges can overlap, hence all preceding ranges with a maximum end offset
+    # that includes the string reference are checked.
+    matching_range_index = None
+    matching_range = None
+
+    sorted_index = bisect.bisect_right(start_offsets, string_reference) - 1
+    while (sorted_index >= 0 and
+           maximum_end_offsets[sorted_index] >= string_reference):
+      range_index, dsc_range = ranges[sorted_index]
+
+      if is_dynamic:
+        range_end_offset = dsc_range.text_offset + dsc_range.text_size
+      else:
+        range_end_offset = dsc_range.range_offset + dsc_range.range_size
+
+      if string_reference <= range_end_offset and (
+          matching_range_index is None or range_index < matching_range_index):
+        matching_range_index = range_index
+        matching_range = dsc_range
+
+      sorted_index -= 1
+
+    return matching_range
+
+  def _ReadFileHeader(self, file_object):
+    """Reads a file header.
+
+    Args:
+      file_object (file): file-like object.
+
+    Returns:
+      dsc_file_header: a file header.
+
+    Raises:
+      ParseError: if the file header cannot be read.
+    """
+    data_type_map = self._GetDataTypeMap('dsc_file_header')
+
+    file_header, _ = self._ReadStructureFromFileObject(
+        file_object, 0, data_type_map, 'file header')
+
+    if self._debug:
+      debug_info = self._DEBUG_INFORMATION.get('dsc_file_header', None)
+      self._DebugPrintStructureObject(file_header, debug_info)
+
+    if file_header.signature != b'hcsd':
+      raise errors.ParseError('Unsupported signature.')
+
+    format_version = (
+        file_header.major_format_version, file_header.minor_format_version)
+    if format_version not in self._SUPPORTED_FORMAT_VERSIONS:
+      format_version_string = '.'.join([
+          f'{file_header.major_format_version:d}',
+          f'{file_header.minor_format_version:d}'])
+      raise errors.ParseError(
           f'Unsupported format version: {format_version_string:s}')
 
     return file_header
@@ -2164,28 +2930,18 @@ class DSCFile(data_format.BinaryDataFile):
     Raises:
       ParseError: if the image values cannot be read.
     """
-    for dsc_range in self.ranges:
+    dsc_range = self._GetRange(string_reference, is_dynamic)
+    if dsc_range:
       if is_dynamic:
-        range_offset = dsc_range.text_offset
-        range_size = dsc_range.text_size
+        string = '%s'
       else:
-        range_offset = dsc_range.range_offset
-        range_size = dsc_range.range_size
-
-      if string_reference < range_offset:
-        continue
+        relative_offset = string_reference - dsc_range.range_offset
+        file_offset = dsc_range.data_offset + relative_offset
+        string = self._ReadString(self._file_object, file_offset)
 
-      relative_offset = string_reference - range_offset
-      if relative_offset <= range_size:
-        if is_dynamic:
-          string = '%s'
-        else:
-          file_offset = dsc_range.data_offset + relative_offset
-          string = self._ReadString(self._file_object, file_offset)
-
-        return ImageValues(
-            identifier=dsc_range.image_identifier, path=dsc_range.image_path,
-            string=string, text_offset=dsc_range.text_offset)
+      return ImageValues(
+          identifier=dsc_range.image_identifier, path=dsc_range.image_path,
+          string=string, text_offset=dsc_range.text_offset)
 
     # TODO: if string_reference is invalid use:
     # "<Invalid shared cache format string offset>"
@@ -2223,6 +2979,707 @@ class DSCFile(data_format.BinaryDataFile):
       dsc_range.text_offset = dsc_uuid.text_offset
       dsc_range.text_size = dsc_uuid.text_size
 
+    self._range_index = self._BuildRangeIndex(False)
+    self._text_range_index = self._BuildRangeIndex(True)
+
+
+class LogEntriesSorter(object):
+  """Sorts log entries by timestamp with bounded memory usage.
+
+  The log entries are sorted in runs of a maximum number of log entries. If
+  there are more log entries than fit in a single run, the runs are written
+  to temporary files and combined with a k-way merge, in the same way as the
+  tracev3 files of a log archive, hence only a single run is kept in memory.
+  Log entries with the same timestamp are returned in the order in which
+  they were read.
+  """
+
+  # Default maximum number of log entries in a run.
+  _DEFAULT_MAXIMUM_RUN_SIZE = 131072
+
+  def __init__(self, maximum_run_size=None):
+    """Initializes a log entries sorter.
+
+    Args:
+      maximum_run_size (Optional[int]): maximum number of log entries that
+          are sorted in memory, where None represents the default.
+    """
+    if maximum_run_size is None:
+      maximum_run_size = self._DEFAULT_MAXIMUM_RUN_SIZE
+
+    super(LogEntriesSorter, self).__init__()
+    self._maximum_run_size = maximum_run_size
+
+  @staticmethod
+  def ReadRun(file_object):
+    """Reads log entries from a sorted run that was written to a file.
+
+    Args:
+      file_object (file): file-like object of the run.
+
+    Yields:
+      LogEntry: a log entry.
+    """
+    file_object.seek(0, os.SEEK_SET)
+
+    while True:
+      try:
+        yield pickle.load(file_object)
+      except EOFError:
+        break
+
+  def SortLogEntries(self, log_entries):
+    """Sorts log entries by timestamp.
+
+    Args:
+      log_entries (iterable[LogEntry]): log entries.
+
+    Yields:
+      LogEntry: a log entry.
+    """
+    runs = []
+    try:
+      log_entries_run = []
+      for log_entry in log_entries:
+        log_entries_run.append(log_entry)
+
+        if len(log_entries_run) >= self._maximum_run_size:
+          log_entries_run.sort(key=lambda log_entry: log_entry.timestamp)
+
+          file_object = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+          runs.append(file_object)
+
+          self.WriteRun(log_entries_run, file_object)
+          log_entries_run = []
+
+      log_entries_run.sort(key=lambda log_entry: log_entry.timestamp)
+
+      if not runs:
+        yield from log_entries_run
+
+      else:
+        # The last run is kept in memory and merged after the runs that were
+        # written, to preserve the order of log entries with the same
+        # timestamp.
+        yield from heapq.merge(
+            *[self.ReadRun(file_object) for file_object in runs],
+            log_entries_run, key=lambda log_entry: log_entry.timestamp)
+
+    finally:
+      for file_object in runs:
+        file_object.close()
+
+  @staticmethod
+  def WriteRun(log_entries, file_object):
+    """Writes a sorted run of log entries.
+
+    Args:
+      log_entries (list[LogEntry]): log entries sorted by timestamp.
+      file_object (file): file-like object to write the run to.
+    """
+    # Every log entry is pickled separately so that reading the run does not
+    # retain previously read log entries.
+    for log_entry in log_entries:
+      pickle.dump(log_entry, file_object, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class LogArchive(object):
+  """Apple Unified Logging and Activity Tracing archive.
+
+  A log archive is either a .logarchive directory or a diagnostics directory,
+  such as /private/var/db/diagnostics, that contains tracev3 files in its
+  root and in log class sub directories.
+  """
+
+  # Sub directories that contain tracev3 files.
+  _TRACEV3_DIRECTORIES = frozenset([
+      'HighVolume', 'Persist', 'Signpost', 'Special'])
+
+  def __init__(
+      self, debug=False, error_on_warning=True, file_system_helper=None,
+      image_values_cache_path=None, output_writer=None):
+    """Initializes a log archive.
+
+    Args:
+      debug (Optional[bool]): True if debug information should be written.
+      error_on_warning (Optional[bool]): True if warnings should be treated as
+          errors.
+      file_system_helper (Optional[FileSystemHelper]): file system helper.
+      image_values_cache_path (Optional[str]): path of the persistent cache of
+          image values, where None represents no persistent cache.
+      output_writer (Optional[OutputWriter]): output writer.
+    """
+    if not file_system_helper:
+      file_system_helper = file_system.NativeFileSystemHelper()
+
+    super(LogArchive, self).__init__()
+    self._debug = debug
+    self._error_on_warning = error_on_warning
+    self._file_system_helper = file_system_helper
+    self._image_values_cache_path = image_values_cache_path
+    self._memory_mapped = False
+    self._output_writer = output_writer
+    self._path = None
+    self._tracev3_file_paths = []
+
+  def _GetTraceV3FilePaths(self, path_segments):
+    """Retrieves the paths of the tracev3 files in a directory.
+
+    Args:
+      path_segments (list[str]): path segments of the directory.
+
+    Returns:
+      list[str]: paths of the tracev3 files, sorted by name.
+    """
+    path = self._file_system_helper.JoinPath(path_segments)
+
+    tracev3_file_paths = []
+    for directory_entry in sorted(
+        self._file_system_helper.ListDirectory(path)):
+      if directory_entry.lower().endswith('.tracev3'):
+        tracev3_file_paths.append(self._file_system_helper.JoinPath(
+            path_segments + [directory_entry]))
+
+    return tracev3_file_paths
+
+  def _OpenTraceV3File(self, path):
+    """Opens a tracev3 file.
+
+    Args:
+      path (str): path of the tracev3 file.
+
+    Returns:
+      TraceV3File: tracev3 file.
+
+    Raises:
+      ParseError: if the tracev3 file cannot be read.
+    """
+    tracev3_file = TraceV3File(
+        debug=self._debug, error_on_warning=self._error_on_warning,
+        file_system_helper=self._file_system_helper,
+        image_values_cache_path=self._image_values_cache_path,
+        output_writer=self._output_writer)
+    tracev3_file.Open(path, memory_mapped=self._memory_mapped)
+
+    return tracev3_file
+
+  def _ReadSortedLogEntries(self, path, log_entry_filter=None):
+    """Reads the log entries of a tracev3 file sorted by timestamp.
+
+    Args:
+      path (str): path of the tracev3 file.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
+
+    Returns:
+      list[LogEntry]: log entries sorted by timestamp.
+
+    Raises:
+      ParseError: if the tracev3 file cannot be read.
+    """
+    tracev3_file = self._OpenTraceV3File(path)
+
+    try:
+      log_entries = list(tracev3_file.ReadLogEntries(
+          log_entry_filter=log_entry_filter))
+    finally:
+      tracev3_file.Close()
+
+    log_entries.sort(key=lambda log_entry: log_entry.timestamp)
+
+    return log_entries
+
+  def _ReadRunsInWorkers(
+      self, number_of_workers, temporary_directory, log_entry_filter=None):
+    """Reads the sorted runs of the tracev3 files in worker processes.
+
+    Args:
+      number_of_workers (int): number of worker processes.
+      temporary_directory (str): path of the directory to write the runs to.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
+
+    Returns:
+      list[str]: paths of the runs, in the order of the tracev3 files.
+
+    Raises:
+      ParseError: if a tracev3 file cannot be read.
+    """
+    run_paths = [
+        os.path.join(temporary_directory, f'{index:08d}.run')
+        for index in range(len(self._tracev3_file_paths))]
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=number_of_workers) as executor:
+      number_of_log_entries_per_run = list(executor.map(
+          self._WriteRunInWorker, self._tracev3_file_paths, run_paths,
+          [self._error_on_warning] * len(run_paths),
+          [self._image_values_cache_path] * len(run_paths),
+          [self._memory_mapped] * len(run_paths),
+          [log_entry_filter] * len(run_paths)))
+
+    return [
+        run_path for run_path, number_of_log_entries in zip(
+            run_paths, number_of_log_entries_per_run)
+        if number_of_log_entries]
+
+  @staticmethod
+  def _WriteRunInWorker(
+      path, run_path, error_on_warning, image_values_cache_path, memory_mapped,
+      log_entry_filter):
+    """Writes the sorted run of a tracev3 file in a worker process.
+
+    Args:
+      path (str): path of the tracev3 file.
+      run_path (str): path of the file to write the run to.
+      error_on_warning (bool): True if warnings should be treated as errors.
+      image_values_cache_path (str): path of the persistent cache of image
+          values or None.
+      memory_mapped (bool): True if the files should be memory mapped.
+      log_entry_filter (LogEntryFilter): filter of the log entries or None.
+
+    Returns:
+      int: number of log entries in the run.
+
+    Raises:
+      ParseError: if the tracev3 file cannot be read.
+    """
+    log_archive = LogArchive(
+        error_on_warning=error_on_warning,
+        image_values_cache_path=image_values_cache_path)
+    log_archive._memory_mapped = memory_mapped  # pylint: disable=protected-access
+
+    log_entries = log_archive._ReadSortedLogEntries(  # pylint: disable=protected-access
+        path, log_entry_filter=log_entry_filter)
+
+    # The event messages are formatted by the worker process, in parallel
+    # with the other worker processes.
+    for log_entry in log_entries:
+      log_entry.MaterializeEventMessage()
+
+    with open(run_path, 'wb') as file_object:
+      LogEntriesSorter.WriteRun(log_entries, file_object)
+
+    return len(log_entries)
+
+  def Close(self):
+    """Closes the log archive."""
+    self._path = None
+    self._tracev3_file_paths = []
+
+  def GetTraceV3FilePaths(self):
+    """Retrieves the paths of the tracev3 files in the log archive.
+
+    Returns:
+      list[str]: paths of the tracev3 files.
+    """
+    return list(self._tracev3_file_paths)
+
+  def Open(self, path, memory_mapped=False):
+    """Opens a log archive.
+
+    Args:
+      path (str): path of the log archive directory.
+      memory_mapped (Optional[bool]): True if the files should be memory
+          mapped, if supported by the file system helper.
+
+    Raises:
+      IOError: if the log archive is already opened.
+      OSError: if the log archive is already opened.
+    """
+    if self._path:
+      raise IOError('Log archive already opened')
+
+    path_segments = self._file_system_helper.SplitPath(path)
+
+    tracev3_file_paths = self._GetTraceV3FilePaths(path_segments)
+
+    for directory_entry in sorted(
+        self._file_system_helper.ListDirectory(path)):
+      if directory_entry in self._TRACEV3_DIRECTORIES:
+        tracev3_file_paths.extend(self._GetTraceV3FilePaths(
+            path_segments + [directory_entry]))
+
+    self._memory_mapped = memory_mapped
+    self._path = path
+    self._tracev3_file_paths = tracev3_file_paths
+
+  def ReadLogEntries(self, number_of_workers=1, log_entry_filter=None):
+    """Reads the log entries of all tracev3 files ordered by timestamp.
+
+    The log entries of each tracev3 file are sorted and, if the log archive
+    contains multiple tracev3 files, written as a run to a temporary file.
+    The runs are combined with a k-way merge that keeps only one log entry per
+    tracev3 file in memory, hence the memory usage is bounded by the largest
+    tracev3 file instead of the size of the log archive. Log entries with the
+    same timestamp are returned in the order of the tracev3 files.
+
+    With multiple workers the tracev3 files are decoded in parallel by
+    worker processes, which requires the native file system helper and is
+    not supported in debug mode.
+
+    Args:
+      number_of_workers (Optional[int]): maximum number of worker processes
+          to decode tracev3 files, where 1 represents decoding in the current
+          process and None the number of CPUs.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries,
+          where None represents all log entries.
+
+    Yields:
+      LogEntry: a log entry.
+
+    Raises:
+      ParseError: if a tracev3 file cannot be read.
+    """
+    if number_of_workers is None:
+      number_of_workers = os.cpu_count() or 1
+
+    number_of_workers = min(number_of_workers, len(self._tracev3_file_paths))
+
+    if number_of_workers > 1 and (self._debug or not isinstance(
+        self._file_system_helper, file_system.NativeFileSystemHelper)):
+      number_of_workers = 1
+
+    if number_of_workers <= 1 and len(self._tracev3_file_paths) == 1:
+      yield from self._ReadSortedLogEntries(
+          self._tracev3_file_paths[0], log_entry_filter=log_entry_filter)
+      return
+
+    runs = []
+    temporary_directory = None
+    try:
+      if number_of_workers > 1:
+        temporary_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+        run_paths = self._ReadRunsInWorkers(
+            number_of_workers, temporary_directory.name,
+            log_entry_filter=log_entry_filter)
+
+        for run_path in run_paths:
+          runs.append(open(run_path, 'rb'))  # pylint: disable=consider-using-with
+
+      else:
+        for path in self._tracev3_file_paths:
+          log_entries = self._ReadSortedLogEntries(
+              path, log_entry_filter=log_entry_filter)
+          if log_entries:
+            file_object = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+            runs.append(file_object)
+
+            LogEntriesSorter.WriteRun(log_entries, file_object)
+
+      yield from heapq.merge(
+          *[LogEntriesSorter.ReadRun(file_object) for file_object in runs],
+          key=lambda log_entry: log_entry.timestamp)
+
+    finally:
+      for file_object in runs:
+        file_object.close()
+
+      if temporary_directory:
+        temporary_directory.cleanup()
+
+  def ReadLogEntryBatches(
+      self, batch_size=65536, number_of_workers=1, log_entry_filter=None):
+    """Reads the log entries of all tracev3 files as batches of columns.
+
+    Args:
+      batch_size (Optional[int]): maximum number of log entries per batch.
+      number_of_workers (Optional[int]): maximum number of worker processes
+          to decode tracev3 files, where 1 represents decoding in the current
+          process and None the number of CPUs.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries,
+          where None represents all log entries.
+
+    Yields:
+      LogEntryBatch: a batch of log entries ordered by timestamp.
+
+    Raises:
+      ParseError: if a tracev3 file cannot be read.
+    """
+    log_entry_batch = LogEntryBatch()
+    for log_entry in self.ReadLogEntries(
+        number_of_workers=number_of_workers, log_entry_filter=log_entry_filter):
+      log_entry_batch.AppendLogEntry(log_entry)
+
+      if len(log_entry_batch) >= batch_size:
+        yield log_entry_batch
+        log_entry_batch = LogEntryBatch()
+
+    if log_entry_batch:
+      yield log_entry_batch
+
+
+class OversizeChunkStore(object):
+  """Memory-bounded store of oversize chunk data.
+
+  Oversize chunks contain the values of tracepoints that do not fit in their
+  firehose chunk. The oversize chunk data is stored together with the parsed
+  oversize chunk, so that the chunk is not parsed again when referenced. The
+  data of the least recently used oversize chunks that exceeds the memory
+  budget is written to a temporary file. The parsed oversize chunk is not
+  written to the temporary file.
+
+  Oversize chunk data that is referenced after it was written to the
+  temporary file is read back into memory, where the parsed oversize chunk
+  can be stored again. Its copy in the temporary file is kept, hence it is
+  not written again when it exceeds the memory budget again. The range in
+  the temporary file is freed when the oversize chunk data is replaced.
+  Freed ranges are reused by subsequent writes and freed ranges at the end
+  of the temporary file are truncated.
+
+  The memory budget only accounts for the size of the oversize chunk data.
+  The values and private data of a parsed oversize chunk reference the
+  oversize chunk data without copying, but the other values of the parsed
+  oversize chunk, such as its data items, are not accounted for.
+
+  Attributes:
+    number_of_hits (int): number of lookups of which the oversize chunk data
+        was found.
+    number_of_misses (int): number of lookups of which the oversize chunk
+        data was not found.
+    number_of_spilled_chunks (int): number of oversize chunks of which the
+        data was written to the temporary file.
+    number_of_stored_chunks (int): number of oversize chunks of which the
+        data was stored.
+  """
+
+  # Default maximum size of the oversize chunk data kept in memory.
+  _DEFAULT_MAXIMUM_MEMORY_SIZE = 64 * 1024 * 1024
+
+  def __init__(self, maximum_memory_size=None):
+    """Initializes an oversize chunk store.
+
+    Args:
+      maximum_memory_size (Optional[int]): maximum size, in bytes, of the
+          oversize chunk data kept in memory, where None represents the
+          default.
+    """
+    if maximum_memory_size is None:
+      maximum_memory_size = self._DEFAULT_MAXIMUM_MEMORY_SIZE
+
+    super(OversizeChunkStore, self).__init__()
+    self._chunk_data_per_key = collections.OrderedDict()
+    self._free_spill_ranges = []
+    self._maximum_memory_size = maximum_memory_size
+    self._memory_size = 0
+    self._spilled_chunk_ranges = {}
+    self._spill_file_object = None
+    self._spill_file_size = 0
+    self.number_of_hits = 0
+    self.number_of_misses = 0
+    self.number_of_spilled_chunks = 0
+    self.number_of_stored_chunks = 0
+
+  def _AllocateSpillRange(self, size):
+    """Allocates a range in the spill file.
+
+    The first freed range that is large enough is reused, otherwise the range
+    is allocated at the end of the spill file.
+
+    Args:
+      size (int): size of the range.
+
+    Returns:
+      int: offset of the range relative to the start of the spill file.
+    """
+    for range_index, (file_offset, range_size) in enumerate(
+        self._free_spill_ranges):
+      if range_size >= size:
+        if range_size == size:
+          del self._free_spill_ranges[range_index]
+        else:
+          self._free_spill_ranges[range_index] = (
+              file_offset + size, range_size - size)
+
+        return file_offset
+
+    file_offset = self._spill_file_size
+    self._spill_file_size += size
+
+    return file_offset
+
+  def _FreeSpillRange(self, file_offset, size):
+    """Frees a range in the spill file.
+
+    The freed range is merged with adjacent freed ranges and a freed range
+    at the end of the spill file is truncated.
+
+    Args:
+      file_offset (int): offset of the range relative to the start of the
+          spill file.
+      size (int): size of the range.
+    """
+    if not size:
+      return
+
+    range_index = bisect.bisect_left(
+        self._free_spill_ranges, (file_offset, size))
+
+    if range_index < len(self._free_spill_ranges):
+      next_file_offset, next_size = self._free_spill_ranges[range_index]
+      if file_offset + size == next_file_offset:
+        size += next_size
+        del self._free_spill_ranges[range_index]
+
+    if range_index > 0:
+      previous_file_offset, previous_size = self._free_spill_ranges[
+          range_index - 1]
+      if previous_file_offset + previous_size == file_offset:
+        file_offset = previous_file_offset
+        size += previous_size
+        range_index -= 1
+        del self._free_spill_ranges[range_index]
+
+    if file_offset + size == self._spill_file_size:
+      self._spill_file_size = file_offset
+      self._spill_file_object.truncate(file_offset)
+    else:
+      self._free_spill_ranges.insert(range_index, (file_offset, size))
+
+  def _SpillChunkData(self):
+    """Writes the least recently used oversize chunk data to the spill file.
+
+    Oversize chunk data that was read back from the spill file is not written
+    again.
+    """
+    lookup_key, (chunk_data, _) = self._chunk_data_per_key.popitem(
+        last=False)
+    self._memory_size -= len(chunk_data)
+
+    if lookup_key in self._spilled_chunk_ranges:
+      return
+
+    if not self._spill_file_object:
+      self._spill_file_object = tempfile.TemporaryFile()  # pylint: disable=consider-using-with
+
+    file_offset = self._AllocateSpillRange(len(chunk_data))
+
+    self._spill_file_object.seek(file_offset, os.SEEK_SET)
+    self._spill_file_object.write(chunk_data)
+
+    self._spilled_chunk_ranges[lookup_key] = (file_offset, len(chunk_data))
+    self.number_of_spilled_chunks += 1
+
+  def _StoreChunkData(self, lookup_key, chunk_data, oversize_chunk):
+    """Stores oversize chunk data in memory.
+
+    The least recently used oversize chunk data that exceeds the memory budget
+    is written to the spill file.
+
+    Args:
+      lookup_key (str): lookup key of the oversize chunk, which consists of
+          the proc_id and the data reference.
+      chunk_data (bytes): oversize chunk data.
+      oversize_chunk (object): parsed oversize chunk or None if not available.
+    """
+    self._chunk_data_per_key[lookup_key] = (chunk_data, oversize_chunk)
+    self._memory_size += len(chunk_data)
+
+    while (self._memory_size > self._maximum_memory_size and
+           len(self._chunk_data_per_key) > 1):
+      self._SpillChunkData()
+
+  def Close(self):
+    """Closes the oversize chunk store and removes its spill file."""
+    if self._spill_file_object:
+      self._spill_file_object.close()
+      self._spill_file_object = None
+
+    self._chunk_data_per_key = collections.OrderedDict()
+    self._free_spill_ranges = []
+    self._memory_size = 0
+    self._spilled_chunk_ranges = {}
+    self._spill_file_size = 0
+
+  def GetChunk(self, lookup_key):
+    """Retrieves an oversize chunk.
+
+    Oversize chunk data that was written to the spill file is read back into
+    memory, where it is kept as the most recently used oversize chunk data.
+
+    Args:
+      lookup_key (str): lookup key of the oversize chunk, which consists of
+          the proc_id and the data reference.
+
+    Returns:
+      tuple[bytes, object]: oversize chunk data and parsed oversize chunk,
+          where the parsed oversize chunk is None if it was not stored or if
+          the data was read back from the spill file, or (None, None) if not
+          available.
+    """
+    chunk_data, oversize_chunk = self._chunk_data_per_key.get(
+        lookup_key, (None, None))
+    if chunk_data is not None:
+      self._chunk_data_per_key.move_to_end(lookup_key)
+
+    else:
+      chunk_range = self._spilled_chunk_ranges.get(lookup_key, None)
+      if chunk_range:
+        file_offset, chunk_data_size = chunk_range
+        self._spill_file_object.seek(file_offset, os.SEEK_SET)
+        chunk_data = self._spill_file_object.read(chunk_data_size)
+
+        self._StoreChunkData(lookup_key, chunk_data, None)
+
+    if chunk_data is None:
+      self.number_of_misses += 1
+    else:
+      self.number_of_hits += 1
+
+    return chunk_data, oversize_chunk
+
+  def GetChunkData(self, lookup_key):
+    """Retrieves oversize chunk data.
+
+    Args:
+      lookup_key (str): lookup key of the oversize chunk, which consists of
+          the proc_id and the data reference.
+
+    Returns:
+      bytes: oversize chunk data or None if not available.
+    """
+    chunk_data, _ = self.GetChunk(lookup_key)
+    return chunk_data
+
+  def SetChunkData(self, lookup_key, chunk_data, oversize_chunk=None):
+    """Stores oversize chunk data.
+
+    Oversize chunk data with the same lookup key is replaced.
+
+    Args:
+      lookup_key (str): lookup key of the oversize chunk, which consists of
+          the proc_id and the data reference.
+      chunk_data (bytes): oversize chunk data.
+      oversize_chunk (Optional[object]): parsed oversize chunk, which is kept
+          in memory as long as the oversize chunk data is.
+    """
+    existing_chunk_data, _ = self._chunk_data_per_key.pop(
+        lookup_key, (None, None))
+    if existing_chunk_data is not None:
+      self._memory_size -= len(existing_chunk_data)
+
+    chunk_range = self._spilled_chunk_ranges.pop(lookup_key, None)
+    if chunk_range:
+      self._FreeSpillRange(*chunk_range)
+
+    self.number_of_stored_chunks += 1
+
+    self._StoreChunkData(lookup_key, chunk_data, oversize_chunk)
+
+  def SetParsedChunk(self, lookup_key, oversize_chunk):
+    """Stores the parsed oversize chunk of oversize chunk data in memory.
+
+    This is used to keep the parsed oversize chunk of oversize chunk data that
+    was read back from the spill file, so that it is not parsed again.
+
+    Args:
+      lookup_key (str): lookup key of the oversize chunk, which consists of
+          the proc_id and the data reference.
+      oversize_chunk (object): parsed oversize chunk.
+    """
+    chunk_data, _ = self._chunk_data_per_key.get(lookup_key, (None, None))
+    if chunk_data is not None:
+      self._chunk_data_per_key[lookup_key] = (chunk_data, oversize_chunk)
+
 
 class TimesyncDatabaseFile(data_format.BinaryDataFile):
   """Timesync database file."""
@@ -2322,6 +3779,337 @@ class TimesyncDatabaseFile(data_format.BinaryDataFile):
       file_offset += record.record_size
 
 
+class TimesyncIndex(object):
+  """Index of the timesync records of a timesync directory.
+
+  The index maps boot identifiers to their boot record and the sync records
+  that follow it and is built once for all tracev3 files that share the
+  timesync directory.
+  """
+
+  def __init__(self, file_system_helper, path, memory_mapped=False):
+    """Initializes a timesync index.
+
+    Args:
+      file_system_helper (FileSystemHelper): file system helper.
+      path (str): path of the timesync directory.
+      memory_mapped (Optional[bool]): True if the timesync database files
+          should be memory mapped.
+    """
+    super(TimesyncIndex, self).__init__()
+    self._file_system_helper = file_system_helper
+    self._memory_mapped = memory_mapped
+    self._path = path
+    self._records_per_boot_identifier = None
+    self._signature = None
+
+  def _GetSignature(self):
+    """Retrieves a signature of the timesync database files in the directory.
+
+    Returns:
+      tuple[tuple[str, int]]: names and sizes of the timesync database files.
+    """
+    signature = []
+    for directory_entry in self._file_system_helper.ListDirectory(self._path):
+      lower_directory_entry = directory_entry.lower()
+      if not lower_directory_entry.endswith('.timesync'):
+        continue
+
+      timesync_file_path = self._file_system_helper.JoinPath([
+          self._path, directory_entry])
+      file_size = self._file_system_helper.GetFileSizeByPath(
+          timesync_file_path)
+      signature.append((directory_entry, file_size))
+
+    return tuple(signature)
+
+  def _ReadRecords(self, signature):
+    """Reads the timesync records of the timesync database files.
+
+    Args:
+      signature (tuple[tuple[str, int]]): names and sizes of the timesync
+          database files.
+
+    Returns:
+      dict[str, tuple[timesync_boot_record, list[timesync_sync_record]]]:
+          boot record and sync records per boot identifier.
+
+    Raises:
+      ParseError: if a timesync database file cannot be read.
+    """
+    records_per_boot_identifier = {}
+
+    for directory_entry, _ in signature:
+      timesync_file_path = self._file_system_helper.JoinPath([
+          self._path, directory_entry])
+
+      timesync_file = TimesyncDatabaseFile(
+          file_system_helper=self._file_system_helper)
+      timesync_file.Open(timesync_file_path, memory_mapped=self._memory_mapped)
+
+      try:
+        sync_records = None
+        for record in timesync_file.ReadRecords():
+          boot_identifier = getattr(record, 'boot_identifier', None)
+          if not boot_identifier:
+            if sync_records is not None:
+              sync_records.append(record)
+
+          # Only the first boot record of a boot identifier is used.
+          elif boot_identifier in records_per_boot_identifier:
+            sync_records = None
+
+          else:
+            sync_records = []
+            records_per_boot_identifier[boot_identifier] = (
+                record, sync_records)
+
+      finally:
+        timesync_file.Close()
+
+    return records_per_boot_identifier
+
+  def GetRecords(self, boot_identifier):
+    """Retrieves the timesync records of a specific boot.
+
+    The index is rebuilt if the timesync database files have changed.
+
+    Args:
+      boot_identifier (uuid.UUID): boot identifier.
+
+    Returns:
+      tuple[timesync_boot_record, list[timesync_sync_record]]: boot record and
+          sync records or None and an empty list if not available.
+
+    Raises:
+      ParseError: if a timesync database file cannot be read.
+    """
+    signature = self._GetSignature()
+    if signature != self._signature:
+      self._records_per_boot_identifier = self._ReadRecords(signature)
+      self._signature = signature
+
+    boot_record, sync_records = self._records_per_boot_identifier.get(
+        boot_identifier, (None, []))
+
+    return boot_record, list(sync_records)
+
+
+class TraceV3ChunkSetIndexEntry(object):
+  """Entry of an index of the chunk sets of a tracev3 file.
+
+  Attributes:
+    catalog_file_offset (int): offset of the chunk header of the catalog that
+        describes the chunk set relative to the start of the file or None if
+        not set.
+    chunk_set_file_offset (int): offset of the chunk header of the chunk set
+        relative to the start of the file.
+    end_time (int): continuous time of the end of the chunk set.
+    has_oversize_chunks (bool): True if the chunk set contains oversize
+        chunks.
+    process_identifiers (frozenset[int]): process identifiers (PID) of the
+        chunks in the chunk set.
+    start_time (int): continuous time of the start of the chunk set.
+  """
+
+  def __init__(self):
+    """Initializes a chunk set index entry."""
+    super(TraceV3ChunkSetIndexEntry, self).__init__()
+    self.catalog_file_offset = None
+    self.chunk_set_file_offset = None
+    self.end_time = None
+    self.has_oversize_chunks = False
+    self.process_identifiers = frozenset()
+    self.start_time = None
+
+
+class TraceV3ChunkSetIndex(object):
+  """Index of the chunk sets of a tracev3 file.
+
+  The index allows the chunk sets of a time range or processes to be read
+  without decompressing the other chunk sets. It is stored in a sidecar file.
+
+  Attributes:
+    boot_identifier (uuid.UUID): boot identifier of the tracev3 file.
+    entries (list[TraceV3ChunkSetIndexEntry]): entries, in order of the chunk
+        sets in the tracev3 file.
+    file_size (int): size of the tracev3 file.
+  """
+
+  _SIGNATURE = b'tv3csidx'
+
+  # Version of the sidecar file format, which should be changed when
+  # the format changes.
+  _FORMAT_VERSION = 1
+
+  # Signature, format version, boot identifier, file size and number of
+  # entries.
+  _HEADER = struct.Struct('<8sI16sQI')
+
+  # Catalog offset, chunk set offset, start time, end time, flags and number
+  # of process identifiers.
+  _ENTRY = struct.Struct('<QQQQII')
+
+  _UNDEFINED_OFFSET = 0xffffffffffffffff
+
+  def __init__(self):
+    """Initializes a chunk set index."""
+    super(TraceV3ChunkSetIndex, self).__init__()
+    self.boot_identifier = None
+    self.entries = []
+    self.file_size = None
+
+  def ReadFromFile(self, path):
+    """Reads the index from a sidecar file.
+
+    Args:
+      path (str): path of the sidecar file.
+
+    Raises:
+      OSError: if the sidecar file cannot be read.
+      ParseError: if the sidecar file is not supported.
+    """
+    with open(path, 'rb') as file_object:
+      data = file_object.read()
+
+    try:
+      (signature, format_version, boot_identifier, file_size,
+       number_of_entries) = self._HEADER.unpack_from(data, 0)
+      data_offset = self._HEADER.size
+
+      if signature != self._SIGNATURE or format_version != (
+          self._FORMAT_VERSION):
+        raise errors.ParseError('Unsupported chunk set index file.')
+
+      entries = []
+      for _ in range(number_of_entries):
+        (catalog_file_offset, chunk_set_file_offset, start_time, end_time,
+         flags, number_of_process_identifiers) = self._ENTRY.unpack_from(
+             data, data_offset)
+        data_offset += self._ENTRY.size
+
+        process_identifiers = struct.unpack_from(
+            f'<{number_of_process_identifiers:d}Q', data, data_offset)
+        data_offset += number_of_process_identifiers * 8
+
+        entry = TraceV3ChunkSetIndexEntry()
+        entry.chunk_set_file_offset = chunk_set_file_offset
+        entry.end_time = end_time
+        entry.has_oversize_chunks = bool(flags & 0x00000001)
+        entry.process_identifiers = frozenset(process_identifiers)
+        entry.start_time = start_time
+
+        if catalog_file_offset != self._UNDEFINED_OFFSET:
+          entry.catalog_file_offset = catalog_file_offset
+
+        entries.append(entry)
+
+    except struct.error as exception:
+      raise errors.ParseError(
+          f'Unable to read chunk set index file with error: {exception!s}')
+
+    self.boot_identifier = uuid.UUID(bytes=boot_identifier)
+    self.entries = entries
+    self.file_size = file_size
+
+  def WriteToFile(self, path):
+    """Writes the index to a sidecar file.
+
+    Args:
+      path (str): path of the sidecar file.
+
+    Raises:
+      OSError: if the sidecar file cannot be written.
+    """
+    boot_identifier = getattr(self.boot_identifier, 'bytes', None)
+
+    data = [self._HEADER.pack(
+        self._SIGNATURE, self._FORMAT_VERSION, boot_identifier or bytes(16),
+        self.file_size, len(self.entries))]
+
+    for entry in self.entries:
+      catalog_file_offset = entry.catalog_file_offset
+      if catalog_file_offset is None:
+        catalog_file_offset = self._UNDEFINED_OFFSET
+
+      flags = 0x00000001 if entry.has_oversize_chunks else 0
+      process_identifiers = sorted(entry.process_identifiers)
+
+      data.append(self._ENTRY.pack(
+          catalog_file_offset, entry.chunk_set_file_offset, entry.start_time,
+          entry.end_time, flags, len(process_identifiers)))
+      data.append(struct.pack(
+          f'<{len(process_identifiers):d}Q', *process_identifiers))
+
+    directory_name = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+        dir=directory_name, delete=False, suffix='.tmp') as file_object:
+      temporary_path = file_object.name
+      file_object.write(b''.join(data))
+
+    # Replace atomically so concurrent readers never read a partial file.
+    os.replace(temporary_path, path)
+
+
+class TraceV3FileCursor(object):
+  """Resumable position in a tracev3 file.
+
+  The cursor describes the state needed to continue reading chunks that
+  were appended to a tracev3 file, such as logdata.LiveData.tracev3, after
+  the chunks that have already been read.
+
+  Attributes:
+    catalog_file_offset (int): offset of the chunk header of the most recent
+        catalog relative to the start of the file or None if not set.
+    chunk_set_index (int): index of the next chunk set relative to the most
+        recent catalog.
+    file_offset (int): offset of the next chunk relative to the start of
+        the file or None if no chunks have been read.
+    oversize_chunk_set_file_offsets (list[int]): offsets of the chunk
+        headers of the chunk sets, described by the most recent catalog, that
+        contain oversize chunks relative to the start of the file.
+  """
+
+  def __init__(self):
+    """Initializes a tracev3 file cursor."""
+    super(TraceV3FileCursor, self).__init__()
+    self.catalog_file_offset = None
+    self.chunk_set_index = 0
+    self.file_offset = None
+    self.oversize_chunk_set_file_offsets = []
+
+  @classmethod
+  def CopyFromDict(cls, cursor_dict):
+    """Creates a cursor from a dictionary.
+
+    Args:
+      cursor_dict (dict[str, object]): cursor values.
+
+    Returns:
+      TraceV3FileCursor: cursor.
+    """
+    cursor = cls()
+    cursor.catalog_file_offset = cursor_dict.get('catalog_file_offset', None)
+    cursor.chunk_set_index = cursor_dict.get('chunk_set_index', 0)
+    cursor.file_offset = cursor_dict.get('file_offset', None)
+    cursor.oversize_chunk_set_file_offsets = list(cursor_dict.get(
+        'oversize_chunk_set_file_offsets', []))
+    return cursor
+
+  def CopyToDict(self):
+    """Copies the cursor to a dictionary, for example to store it as JSON.
+
+    Returns:
+      dict[str, object]: cursor values.
+    """
+    return {
+        'catalog_file_offset': self.catalog_file_offset,
+        'chunk_set_index': self.chunk_set_index,
+        'file_offset': self.file_offset,
+        'oversize_chunk_set_file_offsets': list(
+            self.oversize_chunk_set_file_offsets)}
+
+
 class TraceV3File(data_format.BinaryDataFile):
   """Apple Unified Logging and Activity Tracing (tracev3) file."""
 
@@ -2506,6 +4294,10 @@ class TraceV3File(data_format.BinaryDataFile):
 
   _MAXIMUM_CACHED_FILES = 64
   _MAXIMUM_CACHED_IMAGE_VALUES = 8192
+  _MAXIMUM_CACHED_TIMESYNC_INDEXES = 16
+
+  # Timesync indexes per timesync directory, shared by all tracev3 files.
+  _CACHED_TIMESYNC_INDEXES = collections.OrderedDict()
 
   _NANOSECONDS_PER_SECOND = 1000000000
 
@@ -2513,6 +4305,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
   def __init__(
       self, debug=False, error_on_warning=True, file_system_helper=None,
+      image_values_cache_path=None, maximum_oversize_chunks_memory_size=None,
       output_writer=None):
     """Initializes a tracev3 file.
 
@@ -2521,6 +4314,11 @@ class TraceV3File(data_format.BinaryDataFile):
       error_on_warning (Optional[bool]): True if warnings should be treated as
           errors.
       file_system_helper (Optional[FileSystemHelper]): file system helper.
+      image_values_cache_path (Optional[str]): path of the persistent cache of
+          image values, where None represents no persistent cache.
+      maximum_oversize_chunks_memory_size (Optional[int]): maximum size, in
+          bytes, of the oversize chunk data kept in memory, where None
+          represents the default.
       output_writer (Optional[OutputWriter]): output writer.
     """
     super(TraceV3File, self).__init__(
@@ -2529,19 +4327,31 @@ class TraceV3File(data_format.BinaryDataFile):
     self._boot_identifier = None
     self._cached_dsc_files = collections.OrderedDict()
     self._cached_image_values = collections.OrderedDict()
+    self._cached_process_image_values = {}
     self._cached_uuidtext_files = collections.OrderedDict()
     self._catalog = None
+    self._catalog_file_offset = None
     self._catalog_process_information_entries = {}
     self._catalog_strings_map = {}
     self._chunk_index = 0
+    self._chunk_set_index = None
     self._error_on_warning = error_on_warning
+    self._first_chunk_file_offset = 0
     self._header_timebase = 1.0
     self._header_timestamp = 0
-    self._sorted_timesync_sync_records = []
+    self._image_values_cache = None
+    self._image_values_cache_path = image_values_cache_path
+    self._maximum_oversize_chunks_memory_size = (
+        maximum_oversize_chunks_memory_size)
+    self._oversize_chunk_store = None
     self._timesync_boot_record = None
+    self._timesync_kernel_times = []
+    self._timesync_last_lookup = None
     self._timesync_path = None
     self._timesync_sync_records = []
     self._timesync_timebase = 1.0
+    self._timesync_timestamps = []
+    self._unread_oversize_chunk_set_file_offsets = []
     self._uuidtext_path = None
 
   def _BuildCatalogProcessInformationEntries(self, catalog):
@@ -2653,51 +4463,144 @@ class TraceV3File(data_format.BinaryDataFile):
     """Calculates the program counter.
 
     Args:
-      tracepoint_data_object (object): firehose tracepoint data object.
-      image_text_offset (int): image text offset.
+      tracepoint_data_object (object): firehose tracepoint data object.
+      image_text_offset (int): image text offset.
+
+    Returns:
+      int: program counter.
+    """
+    load_address = getattr(
+        tracepoint_data_object, 'load_address_upper', None) or 0
+    load_address <<= 32
+    load_address |= tracepoint_data_object.load_address_lower
+
+    large_offset_data = getattr(
+        tracepoint_data_object, 'large_offset_data', None)
+    large_shared_cache_data = getattr(
+        tracepoint_data_object, 'large_shared_cache_data', None)
+
+    if large_shared_cache_data:
+      calculated_large_offset_data = large_shared_cache_data >> 1
+      if (large_offset_data and
+          large_offset_data != calculated_large_offset_data):
+        load_address |= large_offset_data << 32
+      else:
+        load_address |= large_shared_cache_data << 31
+
+    elif large_offset_data:
+      load_address |= large_offset_data << 31
+
+    program_counter = load_address - image_text_offset
+
+    if self._debug:
+      value_string, _ = self._FormatIntegerAsHexadecimal8(load_address)
+      self._DebugPrintValue('Load address', value_string)
+
+      value_string, _ = self._FormatIntegerAsHexadecimal8(image_text_offset)
+      self._DebugPrintValue('Image text offset', value_string)
+
+      value_string, _ = self._FormatIntegerAsHexadecimal8(program_counter)
+      self._DebugPrintValue('Program counter', value_string)
+
+      self._DebugPrintText('\n')
+
+    return program_counter
+
+  def _CalculateTimestamp(self, continuous_time):
+    """Calculates the timestamp of a continuous time.
+
+    Args:
+      continuous_time (int): continuous time.
+
+    Returns:
+      int: timestamp containing the number of nanoseconds since January 1, 1970
+          00:00:00.000000000.
+    """
+    timesync_record_index = self._GetTimesyncRecordIndex(continuous_time)
+    if timesync_record_index is not None:
+      continuous_time -= self._timesync_kernel_times[timesync_record_index]
+      return self._timesync_timestamps[timesync_record_index] + int(
+          continuous_time * self._timesync_timebase)
+
+    if self._timesync_boot_record:
+      return self._timesync_boot_record.timestamp + int(
+          continuous_time * self._timesync_timebase)
+
+    return self._header_timestamp + int(
+        continuous_time * self._header_timebase)
+
+  def _CalculateTimestampRange(self, start_time, end_time):
+    """Calculates the timestamps range of a continuous time range.
+
+    Since the wall clock can be adjusted backwards by a timesync record, the
+    timestamps at both sides of every timesync record in the continuous time
+    range are taken into account.
+
+    Args:
+      start_time (int): continuous time of the start of the range.
+      end_time (int): continuous time of the end of the range (inclusive).
+
+    Returns:
+      tuple[int, int]: smallest and largest timestamp of the range, containing
+          the number of nanoseconds since January 1, 1970 00:00:00.000000000.
+    """
+    timestamps = [
+        self._CalculateTimestamp(start_time),
+        self._CalculateTimestamp(end_time)]
+
+    kernel_times = self._timesync_kernel_times
+
+    index = bisect.bisect_right(kernel_times, start_time)
+    while index < len(kernel_times) and kernel_times[index] <= end_time:
+      kernel_time = kernel_times[index]
+      timestamps.append(self._CalculateTimestamp(kernel_time - 1))
+      timestamps.append(self._CalculateTimestamp(kernel_time))
+      index += 1
+
+    return min(timestamps), max(timestamps)
+
+  @classmethod
+  def _DecodeRawValues(cls, raw_values, string_formatter):
+    """Decodes raw values using the string formatter.
+
+    Args:
+      raw_values (list[tuple[int, bytes]]): data item value type, or None for
+          trace values, and value data of the raw values.
+      string_formatter (StringFormatter): string formatter.
 
     Returns:
-      int: program counter.
+      list[str]: values formatted as strings.
     """
-    load_address = getattr(
-        tracepoint_data_object, 'load_address_upper', None) or 0
-    load_address <<= 32
-    load_address |= tracepoint_data_object.load_address_lower
-
-    large_offset_data = getattr(
-        tracepoint_data_object, 'large_offset_data', None)
-    large_shared_cache_data = getattr(
-        tracepoint_data_object, 'large_shared_cache_data', None)
+    values = []
 
-    if large_shared_cache_data:
-      calculated_large_offset_data = large_shared_cache_data >> 1
-      if (large_offset_data and
-          large_offset_data != calculated_large_offset_data):
-        load_address |= large_offset_data << 32
-      else:
-        load_address |= large_shared_cache_data << 31
+    value_index = 0
+    precision = None
 
-    elif large_offset_data:
-      load_address |= large_offset_data << 31
+    for value_type, value_data in raw_values:
+      if value_type in cls._DATA_ITEM_PRECISION_VALUE_TYPES:
+        precision = int.from_bytes(value_data, 'little', signed=False)
+        continue
 
-    program_counter = load_address - image_text_offset
+      value = None
+      if value_type in cls._DATA_ITEM_PRIVATE_VALUE_TYPES:
+        if not value_data:
+          value = '<private>'
 
-    if self._debug:
-      value_string, _ = self._FormatIntegerAsHexadecimal8(load_address)
-      self._DebugPrintValue('Load address', value_string)
+      if not value:
+        value = cls._DecodeValue(
+            string_formatter, value_index, value_data, precision=precision)
 
-      value_string, _ = self._FormatIntegerAsHexadecimal8(image_text_offset)
-      self._DebugPrintValue('Image text offset', value_string)
+      precision = None
 
-      value_string, _ = self._FormatIntegerAsHexadecimal8(program_counter)
-      self._DebugPrintValue('Program counter', value_string)
+      values.append(value)
 
-      self._DebugPrintText('\n')
+      value_index += 1
 
-    return program_counter
+    return values
 
+  @classmethod
   def _DecodeValue(
-      self, string_formatter, value_index, value_data, precision=None):
+      cls, string_formatter, value_index, value_data, precision=None):
     """Decodes value data using the string formatter.
 
     Args:
@@ -2712,21 +4615,15 @@ class TraceV3File(data_format.BinaryDataFile):
     if not string_formatter:
       return '<decode: missing string formatter>'
 
-    decoder_names = string_formatter.GetDecoderNamesByIndex(value_index)
-    if not decoder_names:
+    value_formatters = string_formatter.GetValueFormatters(
+        cls._FORMAT_STRING_DECODERS)
+    if value_index >= len(value_formatters):
       return '<decode: missing decoder>'
 
-    decoder_object = self._FORMAT_STRING_DECODERS.get(decoder_names[0], None)
-    if not decoder_object:
-      return f'<decode: unsupported decoder: {decoder_names[0]:s}>'
-
     # TODO: add support for precision
     _ = precision
 
-    format_string_operator = string_formatter.GetFormatStringOperator(
-        value_index)
-    return decoder_object.FormatValue(
-        value_data, format_string_operator=format_string_operator)
+    return value_formatters[value_index](value_data)
 
   def _FormatArrayOfStrings(self, array_of_strings):
     """Formats an array of strings.
@@ -2815,6 +4712,29 @@ class TraceV3File(data_format.BinaryDataFile):
     """
     return f'offset: 0x{data_range.offset:04x}, size: {data_range.size:d}'
 
+  @classmethod
+  def _FormatEventMessage(cls, string_formatter, raw_values):
+    """Formats an event message.
+
+    This function does not depend on the state of the tracev3 file, so that
+    a deferred event message can be pickled and formatted in another process.
+
+    Args:
+      string_formatter (StringFormatter): string formatter or None if not
+          available.
+      raw_values (list[tuple[int, bytes]]): data item value type, or None for
+          trace values, and value data of the raw values.
+
+    Returns:
+      str: event message.
+    """
+    values = cls._DecodeRawValues(raw_values, string_formatter)
+
+    if not string_formatter:
+      return '<compose failure [missing precomposed log]>'
+
+    return string_formatter.FormatString(values)
+
   def _FormatFirehoseStreamType(self, integer):
     """Formats a firehose stream type.
 
@@ -2950,7 +4870,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
   def _GetDataItemsAndValuesData(
       self, proc_id, tracepoint_data_object, values_data, private_data,
-      oversize_chunks):
+      oversize_chunk_store):
     """Retrieves the data items and values data.
 
     Args:
@@ -2958,12 +4878,14 @@ class TraceV3File(data_format.BinaryDataFile):
       tracepoint_data_object (object): firehose tracepoint data object.
       values_data (bytes): (public) values data.
       private_data (bytes): private data.
-      oversize_chunks (dict[str, oversize_chunk]): Oversize chunks per data
-          reference.
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
 
     Returns:
       tuple[list[tracev3_data_item], bytes, bytes]: data items and values
           data and private data.
+
+    Raises:
+      ParseError: if the oversize chunk cannot be read.
     """
     data_reference = getattr(tracepoint_data_object, 'data_reference', None)
     if not data_reference:
@@ -2971,7 +4893,16 @@ class TraceV3File(data_format.BinaryDataFile):
       return data_items, values_data, private_data
 
     lookup_key = f'{proc_id:s}:{data_reference:04x}'
-    oversize_chunk = oversize_chunks.get(lookup_key, None)
+    chunk_data, oversize_chunk = oversize_chunk_store.GetChunk(lookup_key)
+    if chunk_data is None and self._unread_oversize_chunk_set_file_offsets:
+      self._ReadUnreadOversizeChunkSets(oversize_chunk_store)
+      chunk_data, oversize_chunk = oversize_chunk_store.GetChunk(lookup_key)
+    if chunk_data and not oversize_chunk:
+      # The oversize chunk was read back from the spill file and was already
+      # printed in debug mode when it was first read.
+      oversize_chunk, _ = self._GetOversizeChunk(chunk_data, 0)
+      oversize_chunk_store.SetParsedChunk(lookup_key, oversize_chunk)
+
     if oversize_chunk:
       return (oversize_chunk.data_items, oversize_chunk.values_data,
               oversize_chunk.private_data)
@@ -3003,6 +4934,38 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return dsc_file
 
+  def _GetDSCImageValues(self, uuid_string, string_reference, is_dynamic):
+    """Retrieves image values from a shared-cache strings (DSC) file.
+
+    Args:
+      uuid_string (str): string representation of the UUID of the DSC file.
+      string_reference (int): string reference.
+      is_dynamic (bool): dynamic flag.
+
+    Returns:
+      ImageValues: image values or None if not available.
+
+    Raises:
+      ParseError: if the image values cannot be read.
+    """
+    if self._image_values_cache:
+      image_values = self._image_values_cache.GetImageValues(
+          uuid_string, string_reference, is_dynamic)
+      if image_values:
+        return image_values
+
+    dsc_file = self._GetDSCFile(uuid_string)
+    if not dsc_file:
+      return None
+
+    image_values = dsc_file.GetImageValues(string_reference, is_dynamic)
+
+    if self._image_values_cache and image_values:
+      self._image_values_cache.SetImageValues(
+          uuid_string, string_reference, is_dynamic, image_values)
+
+    return image_values
+
   def _GetImageValues(
       self, process_information_entry, firehose_tracepoint,
       tracepoint_data_object, string_reference, is_dynamic):
@@ -3067,7 +5030,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     uuid_string = strings_file_identifier.hex.upper()
 
-    lookup_key = f'{uuid_string:s}:0x{string_reference:x}'
+    lookup_key = (uuid_string, string_reference, is_dynamic)
     image_values = self._cached_image_values.get(lookup_key, None)
     if not image_values:
       large_offset_data = getattr(
@@ -3077,21 +5040,18 @@ class TraceV3File(data_format.BinaryDataFile):
         image_values = ImageValues(
             identifier=strings_file_identifier, text_offset=image_text_offset)
 
-        uuidtext_file = self._GetUUIDTextFile(uuid_string)
-        if uuidtext_file:
-          image_values.path = uuidtext_file.GetImagePath()
-          if is_dynamic:
-            image_values.string = '%s'
-          else:
-            image_values.string = uuidtext_file.GetString(string_reference)
-            if image_values.string is None:
-              # ~~> Invalid bounds INTEGER for UUID
-              image_values.text_offset = large_offset_data << 31
+        uuidtext_image_values = self._GetUUIDTextImageValues(
+            uuid_string, string_reference, is_dynamic)
+        if uuidtext_image_values:
+          image_values.path = uuidtext_image_values.path
+          image_values.string = uuidtext_image_values.string
+          if image_values.string is None:
+            # ~~> Invalid bounds INTEGER for UUID
+            image_values.text_offset = large_offset_data << 31
 
       else:
-        dsc_file = self._GetDSCFile(uuid_string)
-        if dsc_file:
-          image_values = dsc_file.GetImageValues(string_reference, is_dynamic)
+        image_values = self._GetDSCImageValues(
+            uuid_string, string_reference, is_dynamic)
 
         if not image_values:
           image_values = ImageValues(
@@ -3135,6 +5095,42 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return image_values
 
+  def _GetOversizeChunk(self, chunk_data, data_offset):
+    """Retrieves an Oversize chunk from its data.
+
+    Args:
+      chunk_data (bytes): Oversize chunk data.
+      data_offset (int): offset of the Oversize chunk relative to the start
+          of the chunk set.
+
+    Returns:
+      tuple[oversize_chunk, int]: Oversize chunk and size of the data used.
+
+    Raises:
+      ParseError: if the chunk cannot be read.
+    """
+    data_type_map = self._GetDataTypeMap('tracev3_oversize_chunk')
+
+    context = dtfabric_data_maps.DataTypeMapContext()
+
+    oversize_chunk = self._ReadStructureFromByteStream(
+        chunk_data, data_offset, data_type_map, 'Oversize chunk',
+        context=context)
+
+    # The values and private data reference the chunk data, instead of being
+    # copied, since the oversize chunk is stored together with its data.
+    chunk_data = memoryview(chunk_data)
+
+    data_offset = context.byte_size
+    data_size = data_offset + oversize_chunk.data_size
+    oversize_chunk.values_data = chunk_data[data_offset:data_size]
+
+    data_offset += oversize_chunk.data_size
+    data_size = data_offset + oversize_chunk.private_data_size
+    oversize_chunk.private_data = chunk_data[data_offset:data_size]
+
+    return oversize_chunk, data_size
+
   def _GetProcessImageValues(self, process_information_entry):
     """Retrieves the process image value.
 
@@ -3151,10 +5147,32 @@ class TraceV3File(data_format.BinaryDataFile):
 
     if process_information_entry and process_information_entry.main_uuid:
       uuid_string = process_information_entry.main_uuid.hex.upper()
-      uuidtext_file = self._GetUUIDTextFile(uuid_string)
-      if uuidtext_file:
-        image_identifier = process_information_entry.main_uuid
-        image_path = uuidtext_file.GetImagePath()
+
+      # The process image values are retrieved once per main UUID, including
+      # when they are not available.
+      process_image_values = self._cached_process_image_values.get(
+          uuid_string, None)
+      if process_image_values:
+        image_identifier, image_path = process_image_values
+
+      else:
+        if self._image_values_cache:
+          image_path = self._image_values_cache.GetImagePath(uuid_string)
+
+        if image_path is not None:
+          image_identifier = process_information_entry.main_uuid
+
+        else:
+          uuidtext_file = self._GetUUIDTextFile(uuid_string)
+          if uuidtext_file:
+            image_identifier = process_information_entry.main_uuid
+            image_path = uuidtext_file.GetImagePath()
+
+            if self._image_values_cache and image_path is not None:
+              self._image_values_cache.SetImagePath(uuid_string, image_path)
+
+        self._cached_process_image_values[uuid_string] = (
+            image_identifier, image_path)
 
     if self._debug and image_path:
       self._DebugPrintValue('Process image identifier', image_identifier)
@@ -3207,19 +5225,7 @@ class TraceV3File(data_format.BinaryDataFile):
       int: timestamp containing the number of nanoseconds since January 1, 1970
           00:00:00.000000000.
     """
-    timesync_record = self._GetTimesyncRecord(continuous_time)
-    if timesync_record:
-      continuous_time -= timesync_record.kernel_time
-      timestamp = timesync_record.timestamp + int(
-          continuous_time * self._timesync_timebase)
-
-    elif self._timesync_boot_record:
-      timestamp = self._timesync_boot_record.timestamp + int(
-          continuous_time * self._timesync_timebase)
-
-    else:
-      timestamp = self._header_timestamp + int(
-          continuous_time * self._header_timebase)
+    timestamp = self._CalculateTimestamp(continuous_time)
 
     if self._debug:
       self._DebugPrintDecimalValue(description, continuous_time)
@@ -3233,6 +5239,35 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return timestamp
 
+  def _GetTimesyncIndex(self):
+    """Retrieves the timesync index of the timesync directory.
+
+    The timesync index is shared with other tracev3 files that use the same
+    timesync directory and file system helper.
+
+    Returns:
+      TimesyncIndex: timesync index.
+    """
+    lookup_key = (self._file_system_helper, self._timesync_path)
+    if isinstance(self._file_system_helper, file_system.NativeFileSystemHelper):
+      lookup_key = (None, self._timesync_path)
+
+    timesync_index = self._CACHED_TIMESYNC_INDEXES.get(lookup_key, None)
+    if timesync_index:
+      self._CACHED_TIMESYNC_INDEXES.move_to_end(lookup_key)
+
+    else:
+      if (len(self._CACHED_TIMESYNC_INDEXES) >=
+          self._MAXIMUM_CACHED_TIMESYNC_INDEXES):
+        self._CACHED_TIMESYNC_INDEXES.popitem(last=False)
+
+      timesync_index = TimesyncIndex(
+          self._file_system_helper, self._timesync_path,
+          memory_mapped=self._memory_mapped)
+      self._CACHED_TIMESYNC_INDEXES[lookup_key] = timesync_index
+
+    return timesync_index
+
   def _GetTraceIdentifier(self, firehose_tracepoint):
     """Determines a trace identifier.
 
@@ -3253,20 +5288,44 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return trace_identifier
 
-  def _GetTimesyncRecord(self, continuous_time):
-    """Retrieves a timesync record corresponding to the continuous time.
+  def _GetTimesyncRecordIndex(self, continuous_time):
+    """Retrieves the index of the timesync record of the continuous time.
+
+    The timesync record is the record with the largest kernel time that is
+    less than or equal to the continuous time. Since continuous times of
+    successive log entries tend to be close to each other, the kernel time
+    range of the previous lookup is checked first.
 
     Args:
       continuous_time (int): continuous time.
 
     Returns:
-      timesync_sync_record: timesync sync record or None if not available.
+      int: index of the timesync record in the sorted kernel times and
+          timestamps or None if not available.
     """
-    for record in self._sorted_timesync_sync_records:
-      if continuous_time >= record.kernel_time:
-        return record
+    last_lookup = self._timesync_last_lookup
+    if last_lookup and last_lookup[0] <= continuous_time < last_lookup[1]:
+      return last_lookup[2]
 
-    return None
+    kernel_times = self._timesync_kernel_times
+
+    index = bisect.bisect_right(kernel_times, continuous_time)
+    if index == 0:
+      lower_kernel_time = float('-inf')
+    else:
+      lower_kernel_time = kernel_times[index - 1]
+
+    if index == len(kernel_times):
+      upper_kernel_time = float('inf')
+    else:
+      upper_kernel_time = kernel_times[index]
+
+    record_index = index - 1 if index > 0 else None
+
+    self._timesync_last_lookup = (
+        lower_kernel_time, upper_kernel_time, record_index)
+
+    return record_index
 
   def _GetUUIDTextFile(self, uuid_string):
     """Retrieves a specific uuidtext file.
@@ -3291,51 +5350,67 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return uuidtext_file
 
-  def _OpenDSCFile(self, uuid_string):
-    """Opens a specific shared-cache strings (DSC) file.
+  def _GetUUIDTextImageValues(self, uuid_string, string_reference, is_dynamic):
+    """Retrieves image values from an uuidtext file.
 
     Args:
-      uuid_string (str): string representation of the UUID.
+      uuid_string (str): string representation of the UUID of the uuidtext
+          file.
+      string_reference (int): string reference.
+      is_dynamic (bool): dynamic flag.
 
     Returns:
-      DSCFile: a shared-cache strings (DSC) file or None if not available.
+      ImageValues: image values with the image path and string or None if
+          not available.
+
+    Raises:
+      ParseError: if the image values cannot be read.
     """
-    if not self._uuidtext_path:
-      return None
+    if self._image_values_cache:
+      image_values = self._image_values_cache.GetImageValues(
+          uuid_string, string_reference, is_dynamic)
+      if image_values:
+        return image_values
 
-    dsc_file_path = self._file_system_helper.JoinPath([
-        self._uuidtext_path, 'dsc', uuid_string])
-    if not self._file_system_helper.CheckFileExistsByPath(dsc_file_path):
+    uuidtext_file = self._GetUUIDTextFile(uuid_string)
+    if not uuidtext_file:
       return None
 
-    dsc_file = DSCFile(file_system_helper=self._file_system_helper)
-    dsc_file.Open(dsc_file_path)
+    if is_dynamic:
+      string = '%s'
+    else:
+      string = uuidtext_file.GetString(string_reference)
 
-    return dsc_file
+    image_values = ImageValues(
+        path=uuidtext_file.GetImagePath(), string=string)
+
+    if self._image_values_cache:
+      self._image_values_cache.SetImageValues(
+          uuid_string, string_reference, is_dynamic, image_values)
+
+    return image_values
 
-  def _OpenTimesyncDatabaseFile(self, filename):
-    """Opens a specific timesync database file.
+  def _OpenDSCFile(self, uuid_string):
+    """Opens a specific shared-cache strings (DSC) file.
 
     Args:
-      filename (str): name of the timesync database file.
+      uuid_string (str): string representation of the UUID.
 
     Returns:
-      TimesyncDatabaseFile: a timesync database file or None if not available.
+      DSCFile: a shared-cache strings (DSC) file or None if not available.
     """
-    if not self._timesync_path:
+    if not self._uuidtext_path:
       return None
 
-    timesync_file_path = self._file_system_helper.JoinPath([
-        self._timesync_path, filename])
-    result = self._file_system_helper.CheckFileExistsByPath(timesync_file_path)
-    if not result:
+    dsc_file_path = self._file_system_helper.JoinPath([
+        self._uuidtext_path, 'dsc', uuid_string])
+    if not self._file_system_helper.CheckFileExistsByPath(dsc_file_path):
       return None
 
-    timesync_file = TimesyncDatabaseFile(
-        file_system_helper=self._file_system_helper)
-    timesync_file.Open(timesync_file_path)
+    dsc_file = DSCFile(file_system_helper=self._file_system_helper)
+    dsc_file.Open(dsc_file_path, memory_mapped=self._memory_mapped)
 
-    return timesync_file
+    return dsc_file
 
   def _OpenUUIDTextFile(self, uuid_string):
     """Opens a specific uuidtext file.
@@ -3355,8 +5430,10 @@ class TraceV3File(data_format.BinaryDataFile):
     if not result:
       return None
 
-    uuidtext_file = UUIDTextFile(file_system_helper=self._file_system_helper)
-    uuidtext_file.Open(uuidtext_file_path)
+    uuidtext_file = UUIDTextFile(
+        file_system_helper=self._file_system_helper, preload_strings=True)
+    uuidtext_file.Open(
+        uuidtext_file_path, memory_mapped=self._memory_mapped)
 
     return uuidtext_file
 
@@ -3428,6 +5505,7 @@ class TraceV3File(data_format.BinaryDataFile):
       sub_chunks_data = file_object.read(chunk_data_size - bytes_read)
       self._DebugPrintData('Catalog sub chunks data', sub_chunks_data)
 
+    catalog.sub_chunks = []
     for _ in range(catalog.number_of_sub_chunks):
       catalog_sub_chunk, bytes_read = self._ReadStructureFromFileObject(
           file_object, file_offset, data_type_map, 'Catalog sub chunk')
@@ -3442,52 +5520,170 @@ class TraceV3File(data_format.BinaryDataFile):
             catalog_sub_chunk.start_time, description='Start time')
         self._GetTimestamp(catalog_sub_chunk.end_time, description='End time')
 
+      catalog.sub_chunks.append(catalog_sub_chunk)
+
     return catalog
 
+  def _ReadCatalogChunk(self, file_offset):
+    """Reads a catalog chunk and makes it the current catalog.
+
+    Args:
+      file_offset (int): offset of the chunk header of the catalog relative
+          to the start of the file.
+
+    Raises:
+      ParseError: if the catalog cannot be read.
+    """
+    chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+
+    self._catalog = self._ReadCatalog(
+        self._file_object, file_offset + 16, chunk_header.chunk_data_size)
+    self._catalog_file_offset = file_offset
+    self._BuildCatalogProcessInformationEntries(self._catalog)
+
   def _ReadChunkHeader(self, file_object, file_offset):
     """Reads a chunk header.
 
-    Args:
-      file_object (file): file-like object.
-      file_offset (int): offset of the chunk header relative to the start
-          of the file.
+    Args:
+      file_object (file): file-like object.
+      file_offset (int): offset of the chunk header relative to the start
+          of the file.
+
+    Returns:
+      tracev3_chunk_header: a chunk header.
+
+    Raises:
+      ParseError: if the chunk header cannot be read.
+    """
+    data_type_map = self._GetDataTypeMap('tracev3_chunk_header')
+
+    chunk_header, _ = self._ReadStructureFromFileObject(
+        file_object, file_offset, data_type_map, 'chunk header')
+
+    if self._debug:
+      debug_info = self._DEBUG_INFORMATION.get('tracev3_chunk_header', None)
+      self._DebugPrintStructureObject(chunk_header, debug_info)
+
+    return chunk_header
+
+  def _ReadChunkSet(
+        self, file_object, file_offset, chunk_header, oversize_chunk_store,
+        log_entry_filter=None, oversize_chunks_only=False):
+    """Reads a chunk set.
+
+    Args:
+      file_object (file): file-like object.
+      file_offset (int): offset of the chunk set data relative to the start
+          of the file.
+      chunk_header (tracev3_chunk_header): the chunk header of the chunk set.
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
+      oversize_chunks_only (Optional[bool]): True if only the oversize chunks
+          should be read, since they can be referenced by log entries in other
+          chunk sets.
+
+    Yields:
+      LogEntry: a log entry.
+
+    Raises:
+      ParseError: if the chunk header cannot be read.
+    """
+    uncompressed_data = self._ReadChunkSetData(
+        file_object, file_offset, chunk_header)
+
+    data_type_map = self._GetDataTypeMap('tracev3_chunk_header')
+
+    data_offset = 0
+    while data_offset < len(uncompressed_data):
+      if self._debug:
+        self._DebugPrintText(f'Chunk: {self._chunk_index:d}\n')
+        self._chunk_index += 1
+
+      if self._debug:
+        self._DebugPrintData('Chunk header data', uncompressed_data[
+            data_offset:data_offset + 16])
+
+      chunkset_chunk_header = self._ReadStructureFromByteStream(
+          uncompressed_data[data_offset:], data_offset, data_type_map,
+          'chunk header')
+      data_offset += 16
+
+      if self._debug:
+        debug_info = self._DEBUG_INFORMATION.get('tracev3_chunk_header', None)
+        self._DebugPrintStructureObject(chunkset_chunk_header, debug_info)
+
+      data_end_offset = data_offset + chunkset_chunk_header.chunk_data_size
+      chunkset_chunk_data = uncompressed_data[data_offset:data_end_offset]
+
+      if chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_OVERSIZE:
+        # The data is copied and the oversize chunk is read from the copy so
+        # that the store does not keep the chunk set data alive.
+        chunkset_chunk_data = bytes(chunkset_chunk_data)
+
+        oversize_chunk = self._ReadOversizeChunkData(
+            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
+            data_offset)
+
+        lookup_key = (f'{oversize_chunk.proc_id_upper:d}@'
+                      f'{oversize_chunk.proc_id_lower:d}:'
+                      f'{oversize_chunk.data_reference:04x}')
+        oversize_chunk_store.SetChunkData(
+            lookup_key, chunkset_chunk_data, oversize_chunk=oversize_chunk)
+
+      elif oversize_chunks_only:
+        pass
+
+      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_FIREHOSE:
+        yield from self._ReadFirehoseChunkData(
+            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
+            data_offset, oversize_chunk_store,
+            log_entry_filter=log_entry_filter)
 
-    Returns:
-      tracev3_chunk_header: a chunk header.
+      # StateDump and SimpleDump chunks contain strings and UUIDs, which
+      # cannot be mapped from a memory view.
+      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_STATEDUMP:
+        for log_entry in self._ReadStateDumpChunkData(
+            bytes(chunkset_chunk_data), chunkset_chunk_header.chunk_data_size,
+            data_offset):
+          if not log_entry_filter or log_entry_filter.Matches(log_entry):
+            yield log_entry
 
-    Raises:
-      ParseError: if the chunk header cannot be read.
-    """
-    data_type_map = self._GetDataTypeMap('tracev3_chunk_header')
+      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_SIMPLEDUMP:
+        for log_entry in self._ReadSimpleDumpChunkData(
+            bytes(chunkset_chunk_data), chunkset_chunk_header.chunk_data_size,
+            data_offset):
+          if not log_entry_filter or log_entry_filter.Matches(log_entry):
+            yield log_entry
 
-    chunk_header, _ = self._ReadStructureFromFileObject(
-        file_object, file_offset, data_type_map, 'chunk header')
+      elif self._debug:
+        self._DebugPrintData('Chunk data', chunkset_chunk_data)
 
-    if self._debug:
-      debug_info = self._DEBUG_INFORMATION.get('tracev3_chunk_header', None)
-      self._DebugPrintStructureObject(chunk_header, debug_info)
+      data_offset = data_end_offset
 
-    return chunk_header
+      _, alignment = divmod(data_offset, 8)
+      if alignment > 0:
+        alignment = 8 - alignment
 
-  def _ReadChunkSet(
-        self, file_object, file_offset, chunk_header, oversize_chunks):
-    """Reads a chunk set.
+      data_offset += alignment
+
+  def _ReadChunkSetData(self, file_object, file_offset, chunk_header):
+    """Reads and decompresses chunk set data.
 
     Args:
       file_object (file): file-like object.
       file_offset (int): offset of the chunk set data relative to the start
           of the file.
       chunk_header (tracev3_chunk_header): the chunk header of the chunk set.
-      oversize_chunks (dict[str, oversize_chunk]): Oversize chunks per data
-          reference.
 
-    Yields:
-      LogEntry: a log entry.
+    Returns:
+      memoryview: uncompressed chunk set data.
 
     Raises:
-      ParseError: if the chunk header cannot be read.
+      ParseError: if the chunk set data cannot be read.
     """
-    chunk_data = file_object.read(chunk_header.chunk_data_size)
+    # The chunk set data is accessed through memory views to prevent copying
+    # the remainder of the data for every chunk and firehose tracepoint.
+    chunk_data = memoryview(file_object.read(chunk_header.chunk_data_size))
 
     data_type_map = self._GetDataTypeMap('tracev3_lz4_block_header')
 
@@ -3501,9 +5697,9 @@ class TraceV3File(data_format.BinaryDataFile):
     # TODO: add support for multi block compressed data.
     if lz4_block_header.signature == b'bv41':
       end_of_data_offset = 12 + lz4_block_header.compressed_data_size
-      uncompressed_data = lz4.block.decompress(
+      uncompressed_data = memoryview(lz4.block.decompress(
           chunk_data[12:end_of_data_offset],
-          uncompressed_size=lz4_block_header.uncompressed_data_size)
+          uncompressed_size=lz4_block_header.uncompressed_data_size))
 
     elif lz4_block_header.signature == b'bv4-':
       end_of_data_offset = 8 + lz4_block_header.uncompressed_data_size
@@ -3518,65 +5714,220 @@ class TraceV3File(data_format.BinaryDataFile):
     if end_of_lz4_block_marker != b'bv4$':
       raise errors.ParseError('Unsupported end of LZ4 block marker')
 
-    data_type_map = self._GetDataTypeMap('tracev3_chunk_header')
+    return uncompressed_data
 
-    data_offset = 0
-    while data_offset < lz4_block_header.uncompressed_data_size:
-      if self._debug:
-        self._DebugPrintText(f'Chunk: {self._chunk_index:d}\n')
-        self._chunk_index += 1
+  def _ReadChunkSetIndexValues(self, uncompressed_data):
+    """Reads the values of a chunk set index entry from chunk set data.
 
-      if self._debug:
-        self._DebugPrintData('Chunk header data', uncompressed_data[
-            data_offset:data_offset + 16])
+    Args:
+      uncompressed_data (memoryview): uncompressed chunk set data.
+
+    Returns:
+      tuple[frozenset[int], bool]: process identifiers (PID) of the chunks
+          and True if the chunk set contains oversize chunks.
+
+    Raises:
+      ParseError: if the chunk set data cannot be read.
+    """
+    data_type_map = self._GetDataTypeMap('tracev3_chunk_header')
+
+    has_oversize_chunks = False
+    process_identifiers = set()
 
+    data_offset = 0
+    while data_offset < len(uncompressed_data):
       chunkset_chunk_header = self._ReadStructureFromByteStream(
           uncompressed_data[data_offset:], data_offset, data_type_map,
           'chunk header')
       data_offset += 16
 
+      if chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_OVERSIZE:
+        has_oversize_chunks = True
+
+      elif chunkset_chunk_header.chunk_tag in (
+          self._CHUNK_TAG_FIREHOSE, self._CHUNK_TAG_STATEDUMP,
+          self._CHUNK_TAG_SIMPLEDUMP):
+        # These chunks start with the proc_id upper and lower values.
+        try:
+          proc_id_upper, proc_id_lower = struct.unpack_from(
+              '<QI', uncompressed_data, data_offset)
+        except struct.error as exception:
+          raise errors.ParseError((
+              f'Unable to read proc_id at offset: {data_offset:d} with '
+              f'error: {exception!s}'))
+
+        process_information_entry = (
+            self._catalog_process_information_entries.get(
+                f'{proc_id_upper:d}@{proc_id_lower:d}', None))
+        process_identifiers.add(getattr(
+            process_information_entry, 'process_identifier', None) or 0)
+
+      data_offset += chunkset_chunk_header.chunk_data_size
+
+      _, alignment = divmod(data_offset, 8)
+      if alignment > 0:
+        data_offset += 8 - alignment
+
+    return frozenset(process_identifiers), has_oversize_chunks
+
+  def _ReadChunks(
+      self, cursor, oversize_chunk_store, log_entry_filter=None,
+      tolerate_incomplete=False):
+    """Reads the chunks from the cursor up to the end of the file.
+
+    Args:
+      cursor (TraceV3FileCursor): cursor, which is updated after each chunk.
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
+      tolerate_incomplete (Optional[bool]): True if a trailing chunk that was
+          not completely written yet should be ignored, so that it can be read
+          on a next call, instead of raising an error.
+
+    Yields:
+      LogEntry: a log entry.
+
+    Raises:
+      ParseError: if a chunk cannot be read.
+    """
+    file_offset = cursor.file_offset
+
+    while file_offset < self._file_size:
+      if tolerate_incomplete and file_offset + 16 > self._file_size:
+        break
+
       if self._debug:
-        debug_info = self._DEBUG_INFORMATION.get('tracev3_chunk_header', None)
-        self._DebugPrintStructureObject(chunkset_chunk_header, debug_info)
+        self._DebugPrintText(f'Chunk: {self._chunk_index:d}\n')
+        self._chunk_index += 1
 
-      data_end_offset = data_offset + chunkset_chunk_header.chunk_data_size
-      chunkset_chunk_data = uncompressed_data[data_offset:data_end_offset]
+      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+      if file_offset + 16 + chunk_header.chunk_data_size > self._file_size:
+        if tolerate_incomplete:
+          break
 
-      if chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_FIREHOSE:
-        yield from self._ReadFirehoseChunkData(
-            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
-            data_offset, oversize_chunks)
+        raise errors.ParseError((
+            f'Chunk at offset: {file_offset:d} (0x{file_offset:08x}) '
+            f'extends beyond end of file.'))
 
-      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_OVERSIZE:
-        oversize_chunk = self._ReadOversizeChunkData(
-            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
-            data_offset)
+      chunk_header_file_offset = file_offset
+      file_offset += 16
 
-        lookup_key = (f'{oversize_chunk.proc_id_upper:d}@'
-                      f'{oversize_chunk.proc_id_lower:d}:'
-                      f'{oversize_chunk.data_reference:04x}')
-        oversize_chunks[lookup_key] = oversize_chunk
+      if chunk_header.chunk_tag == self._CHUNK_TAG_CATALOG:
+        self._catalog = self._ReadCatalog(
+            self._file_object, file_offset, chunk_header.chunk_data_size)
+        self._catalog_file_offset = chunk_header_file_offset
+        self._BuildCatalogProcessInformationEntries(self._catalog)
 
-      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_STATEDUMP:
-        yield from self._ReadStateDumpChunkData(
-            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
-            data_offset)
+        # The catalog sub chunks describe the chunk sets that follow it.
+        cursor.catalog_file_offset = chunk_header_file_offset
+        cursor.chunk_set_index = 0
 
-      elif chunkset_chunk_header.chunk_tag == self._CHUNK_TAG_SIMPLEDUMP:
-        yield from self._ReadSimpleDumpChunkData(
-            chunkset_chunk_data, chunkset_chunk_header.chunk_data_size,
-            data_offset)
+        # Oversize chunks are referenced by the firehose chunks of chunk sets
+        # described by the same catalog, hence the oversize chunks of chunk
+        # sets before the catalog no longer need to be restored.
+        cursor.oversize_chunk_set_file_offsets = []
 
-      elif self._debug:
-        self._DebugPrintData('Chunk data', chunkset_chunk_data)
+      elif chunk_header.chunk_tag == self._CHUNK_TAG_CHUNK_SET:
+        oversize_chunks_only = False
+        if log_entry_filter and self._catalog and cursor.chunk_set_index < len(
+            self._catalog.sub_chunks):
+          catalog_sub_chunk = self._catalog.sub_chunks[cursor.chunk_set_index]
+          start_timestamp, end_timestamp = self._CalculateTimestampRange(
+              catalog_sub_chunk.start_time, catalog_sub_chunk.end_time)
+          oversize_chunks_only = not log_entry_filter.MatchesTimeRange(
+              start_timestamp, end_timestamp)
 
-      data_offset = data_end_offset
+        number_of_stored_chunks = oversize_chunk_store.number_of_stored_chunks
 
-      _, alignment = divmod(data_offset, 8)
+        yield from self._ReadChunkSet(
+            self._file_object, file_offset, chunk_header, oversize_chunk_store,
+            log_entry_filter=log_entry_filter,
+            oversize_chunks_only=oversize_chunks_only)
+
+        cursor.chunk_set_index += 1
+
+        if oversize_chunk_store.number_of_stored_chunks > (
+            number_of_stored_chunks):
+          cursor.oversize_chunk_set_file_offsets.append(
+              chunk_header_file_offset)
+
+      else:
+        raise errors.ParseError(
+            f'Unsupported chunk tag: 0x{chunk_header.chunk_tag:04x}.')
+
+      file_offset += chunk_header.chunk_data_size
+
+      _, alignment = divmod(file_offset, 8)
       if alignment > 0:
         alignment = 8 - alignment
 
-      data_offset += alignment
+      file_offset += alignment
+
+      cursor.file_offset = file_offset
+
+  def _ReadChunkSetsWithIndex(self, oversize_chunk_store, log_entry_filter):
+    """Reads the chunk sets that can match a filter using the chunk set index.
+
+    Only the chunk sets of which the time range and process identifiers can
+    match the filter are decompressed. Oversize chunks are read from the chunk
+    sets described by the same catalog, when a log entry references an
+    oversize chunk that was not read yet.
+
+    Args:
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+      log_entry_filter (LogEntryFilter): filter of the log entries.
+
+    Yields:
+      LogEntry: a log entry.
+
+    Raises:
+      ParseError: if a chunk set cannot be read.
+    """
+    entries = self._chunk_set_index.entries
+
+    catalog_file_offset = None
+
+    # Loss log entries have no process identifier and are matched as process
+    # identifier 0, which can be in any chunk set.
+    match_process_identifiers = (
+        log_entry_filter.process_identifiers is not None and
+        not log_entry_filter.MatchesProcessIdentifier(0))
+
+    for entry in entries:
+      if match_process_identifiers and (
+          log_entry_filter.process_identifiers.isdisjoint(
+              entry.process_identifiers)):
+        continue
+
+      start_timestamp, end_timestamp = self._CalculateTimestampRange(
+          entry.start_time, entry.end_time)
+      if not log_entry_filter.MatchesTimeRange(start_timestamp, end_timestamp):
+        continue
+
+      if (entry.catalog_file_offset is not None and
+          entry.catalog_file_offset != catalog_file_offset):
+        catalog_file_offset = entry.catalog_file_offset
+        if catalog_file_offset != self._catalog_file_offset:
+          self._ReadCatalogChunk(catalog_file_offset)
+
+        # The chunk sets of the catalog that contain oversize chunks are only
+        # read when an oversize chunk is referenced.
+        self._unread_oversize_chunk_set_file_offsets = [
+            oversize_entry.chunk_set_file_offset for oversize_entry in entries
+            if oversize_entry.has_oversize_chunks and
+            oversize_entry.catalog_file_offset == catalog_file_offset]
+
+      file_offset = entry.chunk_set_file_offset
+
+      # The oversize chunks of the chunk set are read together with its log
+      # entries.
+      if file_offset in self._unread_oversize_chunk_set_file_offsets:
+        self._unread_oversize_chunk_set_file_offsets.remove(file_offset)
+
+      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+
+      yield from self._ReadChunkSet(
+          self._file_object, file_offset + 16, chunk_header,
+          oversize_chunk_store, log_entry_filter=log_entry_filter)
 
   def _ReadBacktraceData(self, flags, backtrace_data, data_offset):
     """Reads firehose tracepoint backtrace data.
@@ -3599,8 +5950,10 @@ class TraceV3File(data_format.BinaryDataFile):
     data_type_map = self._GetDataTypeMap(
         'tracev3_firehose_tracepoint_backtrace_data')
 
+    # The backtrace data contains UUIDs, which cannot be mapped from a memory
+    # view.
     backtrace_data = self._ReadStructureFromByteStream(
-        backtrace_data, data_offset, data_type_map, 'backtrace data')
+        bytes(backtrace_data), data_offset, data_type_map, 'backtrace data')
 
     if self._debug:
       debug_info = self._DEBUG_INFORMATION.get(
@@ -3632,8 +5985,8 @@ class TraceV3File(data_format.BinaryDataFile):
 
     Args:
       data_items (list[tracev3_data_item]): data items.
-      values_data (bytes): (public) values data.
-      private_data (bytes): firehose private data.
+      values_data (bytes|memoryview): (public) values data.
+      private_data (bytes|memoryview): firehose private data.
       private_data_range_offset (int): offset of the private data range
           relative to the start of the private data.
       string_formatter (StringFormatter): string formatter.
@@ -3644,10 +5997,29 @@ class TraceV3File(data_format.BinaryDataFile):
     Raises:
       ParseError: if the data items cannot be read.
     """
-    values = []
+    raw_values = self._ReadDataItemsRawValues(
+        data_items, values_data, private_data, private_data_range_offset)
 
-    value_index = 0
-    precision = None
+    return self._DecodeRawValues(raw_values, string_formatter)
+
+  def _ReadDataItemsRawValues(
+      self, data_items, values_data, private_data, private_data_range_offset):
+    """Reads the raw values of data items.
+
+    Args:
+      data_items (list[tracev3_data_item]): data items.
+      values_data (bytes|memoryview): (public) values data.
+      private_data (bytes|memoryview): firehose private data.
+      private_data_range_offset (int): offset of the private data range
+          relative to the start of the private data.
+
+    Returns:
+      list[tuple[int, bytes]]: value type and value data of the data items.
+
+    Raises:
+      ParseError: if the data items cannot be read.
+    """
+    raw_values = []
 
     for data_item in data_items:
       value_data = None
@@ -3674,6 +6046,11 @@ class TraceV3File(data_format.BinaryDataFile):
         value_data = values_data[
             value_data_offset:value_data_offset + data_item.value_data_size]
 
+      # The value data is copied since the decoders expect bytes and so that
+      # a deferred event message does not keep the chunk data in memory.
+      if value_data is not None:
+        value_data = bytes(value_data)
+
       if self._debug:
         data_item.value_data = value_data
 
@@ -3687,38 +6064,22 @@ class TraceV3File(data_format.BinaryDataFile):
               f'Unsupported data item value type: '
               f'0x{data_item.value_type:02x}.'))
 
-      if data_item.value_type in self._DATA_ITEM_PRECISION_VALUE_TYPES:
-        precision = int.from_bytes(value_data, 'little', signed=False)
-        continue
-
-      value = None
-      if data_item.value_type in self._DATA_ITEM_PRIVATE_VALUE_TYPES:
-        if not value_data:
-          value = '<private>'
-
-      if not value:
-        value = self._DecodeValue(
-            string_formatter, value_index, value_data, precision=precision)
-
-      precision = None
-
-      values.append(value)
-
-      value_index += 1
+      raw_values.append((data_item.value_type, value_data))
 
-    return values
+    return raw_values
 
   def _ReadFirehoseChunkData(
-      self, chunk_data, chunk_data_size, data_offset, oversize_chunks):
+      self, chunk_data, chunk_data_size, data_offset, oversize_chunk_store,
+      log_entry_filter=None):
     """Reads firehose chunk data.
 
     Args:
-      chunk_data (bytes): firehose chunk data.
+      chunk_data (memoryview): firehose chunk data.
       chunk_data_size (int): size of the firehose chunk data.
       data_offset (int): offset of the firehose chunk relative to the start
           of the chunk set.
-      oversize_chunks (dict[str, oversize_chunk]): Oversize chunks per data
-          reference.
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
 
     Yields:
       LogEntry: a log entry.
@@ -3751,6 +6112,26 @@ class TraceV3File(data_format.BinaryDataFile):
             f'Unable to retrieve process information entry: {proc_id:s} from '
             f'catalog'))
 
+    process_identifier = getattr(
+        process_information_entry, 'process_identifier', None) or 0
+
+    # All tracepoints of a firehose chunk are of the same process, except
+    # for loss tracepoints, of which the log entries have no process
+    # identifier and are matched as process identifier 0, like
+    # LogEntryFilter.Matches does.
+    matches_process_identifier = True
+    matches_loss_process_identifier = True
+    if log_entry_filter:
+      matches_process_identifier = log_entry_filter.MatchesProcessIdentifier(
+          process_identifier)
+      matches_loss_process_identifier = (
+          log_entry_filter.MatchesProcessIdentifier(0))
+
+    if not matches_process_identifier and not matches_loss_process_identifier:
+      return
+
+    private_data = b''
+
     chunk_data_offset = 32
     while chunk_data_offset < firehose_header.public_data_size:
       if self._debug:
@@ -3771,9 +6152,45 @@ class TraceV3File(data_format.BinaryDataFile):
         chunk_data_offset += bytes_read
         continue
 
+      next_chunk_data_offset = (
+          chunk_data_offset + 24 + firehose_tracepoint.data_size)
+
+      _, alignment = divmod(next_chunk_data_offset, 8)
+      if alignment > 0:
+        next_chunk_data_offset += 8 - alignment
+
       chunk_data_offset += 24
 
+      continuous_time = firehose_tracepoint.continuous_time_lower | (
+          firehose_tracepoint.continuous_time_upper << 32)
+      continuous_time += firehose_header.base_continuous_time
+
+      if record_type == self._RECORD_TYPE_ACTIVITY:
+        event_type = self._ACTIVITY_EVENT_TYPE_DESCRIPTIONS.get(
+            firehose_tracepoint.log_type, None)
+      else:
+        event_type = self._EVENT_TYPE_DESCRIPTIONS.get(record_type, None)
+
+      timestamp = self._GetTimestamp(continuous_time)
+
+      if record_type == self._RECORD_TYPE_LOSS:
+        matches_filter = matches_loss_process_identifier
+      else:
+        matches_filter = matches_process_identifier
+
+      if log_entry_filter and not (
+          matches_filter and log_entry_filter.MatchesEventType(event_type) and
+          log_entry_filter.MatchesTimestamp(timestamp)):
+        chunk_data_offset = next_chunk_data_offset
+        continue
+
+      tracepoint_data = firehose_tracepoint.data
       tracepoint_data_offset = data_offset + chunk_data_offset
+
+      # The UUID of an uuidtext file cannot be mapped from a memory view.
+      if firehose_tracepoint.flags & 0x000e == 0x000a:
+        tracepoint_data = bytes(tracepoint_data)
+
       tracepoint_data_object = None
       bytes_read = 0
 
@@ -3785,7 +6202,7 @@ class TraceV3File(data_format.BinaryDataFile):
         tracepoint_data_object, bytes_read = (
             self._ReadFirehoseTracepointActivityData(
                 firehose_tracepoint.log_type, firehose_tracepoint.flags,
-                firehose_tracepoint.data, tracepoint_data_offset))
+                tracepoint_data, tracepoint_data_offset))
 
       elif record_type == self._RECORD_TYPE_TRACE:
         if firehose_tracepoint.log_type not in (0x00, ):
@@ -3794,7 +6211,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
         tracepoint_data_object, bytes_read = (
             self._ReadFirehoseTracepointTraceData(
-                firehose_tracepoint.flags, firehose_tracepoint.data,
+                firehose_tracepoint.flags, tracepoint_data,
                 tracepoint_data_offset))
 
       elif record_type == self._RECORD_TYPE_LOG:
@@ -3804,7 +6221,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
         tracepoint_data_object, bytes_read = (
             self._ReadFirehoseTracepointLogData(
-                firehose_tracepoint.flags, firehose_tracepoint.data,
+                firehose_tracepoint.flags, tracepoint_data,
                 tracepoint_data_offset))
 
       elif record_type == self._RECORD_TYPE_SIGNPOST:
@@ -3815,7 +6232,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
         tracepoint_data_object, bytes_read = (
             self._ReadFirehoseTracepointSignpostData(
-                firehose_tracepoint.flags, firehose_tracepoint.data,
+                firehose_tracepoint.flags, tracepoint_data,
                 tracepoint_data_offset))
 
       elif record_type == self._RECORD_TYPE_LOSS:
@@ -3825,31 +6242,35 @@ class TraceV3File(data_format.BinaryDataFile):
 
         tracepoint_data_object, bytes_read = (
             self._ReadFirehoseTracepointLossData(
-                firehose_tracepoint.flags, firehose_tracepoint.data,
+                firehose_tracepoint.flags, tracepoint_data,
                 tracepoint_data_offset))
 
-      continuous_time = firehose_tracepoint.continuous_time_lower | (
-          firehose_tracepoint.continuous_time_upper << 32)
-      continuous_time += firehose_header.base_continuous_time
+      if record_type == self._RECORD_TYPE_LOSS:
+        category = None
+        sub_system = None
+      else:
+        sub_system_identifier = getattr(
+            tracepoint_data_object, 'sub_system_identifier', None)
+        category, sub_system = self._GetSubSystemStrings(
+            process_information_entry, sub_system_identifier)
+
+      if log_entry_filter and not log_entry_filter.MatchesSubSystem(
+          sub_system):
+        chunk_data_offset = next_chunk_data_offset
+        continue
 
       process_image_identifier, process_image_path = (
           self._GetProcessImageValues(process_information_entry))
 
       log_entry = LogEntry()
       log_entry.boot_identifier = self._boot_identifier
+      log_entry.event_type = event_type
       log_entry.mach_timestamp = continuous_time
       log_entry.process_image_identifier = process_image_identifier
       log_entry.thread_identifier = firehose_tracepoint.thread_identifier
-      log_entry.timestamp = self._GetTimestamp(continuous_time)
+      log_entry.timestamp = timestamp
       log_entry.trace_identifier = self._GetTraceIdentifier(firehose_tracepoint)
 
-      if record_type == self._RECORD_TYPE_ACTIVITY:
-        log_entry.event_type = self._ACTIVITY_EVENT_TYPE_DESCRIPTIONS.get(
-            firehose_tracepoint.log_type, None)
-      else:
-        log_entry.event_type = self._EVENT_TYPE_DESCRIPTIONS.get(
-            firehose_tracepoint.record_type, None)
-
       if record_type == self._RECORD_TYPE_LOSS:
         loss_count = tracepoint_data_object.number_of_messages or 0
         loss_start_time = tracepoint_data_object.start_time or 0
@@ -3869,7 +6290,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
       else:
         values_data_offset = bytes_read
-        values_data = firehose_tracepoint.data[values_data_offset:]
+        values_data = tracepoint_data[values_data_offset:]
 
         string_reference, is_dynamic = self._CalculateFormatStringReference(
             tracepoint_data_object, firehose_tracepoint.format_string_reference)
@@ -3884,13 +6305,10 @@ class TraceV3File(data_format.BinaryDataFile):
           string_formatter = None
 
         backtrace_frames = []
-        values = []
-
-        if record_type == self._RECORD_TYPE_TRACE:
-          values = self._ReadFirehoseTracepointTraceValuesData(
-              tracepoint_data_object, values_data, string_formatter)
+        data_items = None
+        private_data_offset = 0
 
-        else:
+        if record_type != self._RECORD_TYPE_TRACE:
           private_data_virtual_offset = (
               firehose_header.private_data_virtual_offset & 0x0fff)
           if not private_data_virtual_offset:
@@ -3902,7 +6320,7 @@ class TraceV3File(data_format.BinaryDataFile):
           data_items, values_data, private_data = (
               self._GetDataItemsAndValuesData(
                   proc_id, tracepoint_data_object, values_data, private_data,
-                  oversize_chunks))
+                  oversize_chunk_store))
 
           if self._debug and private_data:
             self._DebugPrintData('Private data', private_data)
@@ -3922,15 +6340,27 @@ class TraceV3File(data_format.BinaryDataFile):
               private_data_offset = (
                   private_data_range.offset - private_data_virtual_offset)
 
-            # TODO: calculate item data offset for debugging purposes.
-            values = self._ReadDataItems(
-                data_items, values_data, private_data, private_data_offset,
-                string_formatter)
+        # The raw values are copied out of the chunk data so that a deferred
+        # event message does not keep the chunk data in memory.
+        if record_type == self._RECORD_TYPE_TRACE:
+          raw_values = self._ReadFirehoseTracepointTraceRawValues(
+              tracepoint_data_object, values_data)
 
-        sub_system_identifier = getattr(
-            tracepoint_data_object, 'sub_system_identifier', None)
-        category, sub_system = self._GetSubSystemStrings(
-            process_information_entry, sub_system_identifier)
+        elif data_items:
+          # TODO: calculate item data offset for debugging purposes.
+          raw_values = self._ReadDataItemsRawValues(
+              data_items, values_data, private_data, private_data_offset)
+
+        else:
+          raw_values = []
+
+        # The raw values are decoded and formatted on first access of the event
+        # message, except in debug mode to preserve the debug output order.
+        event_message_arguments = (string_formatter, raw_values)
+
+        event_message = None
+        if self._debug:
+          event_message = self._FormatEventMessage(*event_message_arguments)
 
         text_offset = getattr(image_values, 'text_offset', None) or 0
         program_counter = self._CalculateProgramCounter(
@@ -3946,8 +6376,7 @@ class TraceV3File(data_format.BinaryDataFile):
         log_entry.backtrace_frames = backtrace_frames
         log_entry.category = category
         log_entry.format_string = getattr(image_values, 'string', None)
-        log_entry.process_identifier = getattr(
-            process_information_entry, 'process_identifier', None) or 0
+        log_entry.process_identifier = process_identifier
         log_entry.process_image_path = process_image_path
         log_entry.sender_image_identifier = getattr(
             image_values, 'identifier', None)
@@ -4006,21 +6435,18 @@ class TraceV3File(data_format.BinaryDataFile):
           log_entry.signpost_type = self._SIGNPOST_TYPE_DESCRIPTIONS.get(
               firehose_tracepoint.log_type & 0x0f, None)
 
-        if string_formatter:
-          log_entry.event_message = string_formatter.FormatString(values)
+        if event_message is not None:
+          log_entry.event_message = event_message
+        elif string_formatter:
+          log_entry.SetDeferredEventMessage(
+              self._FormatEventMessage, event_message_arguments)
         else:
           log_entry.event_message = (
               '<compose failure [missing precomposed log]>')
 
       yield log_entry
 
-      chunk_data_offset += firehose_tracepoint.data_size
-
-      _, alignment = divmod(chunk_data_offset, 8)
-      if alignment > 0:
-        alignment = 8 - alignment
-
-      chunk_data_offset += alignment
+      chunk_data_offset = next_chunk_data_offset
 
     private_data_size = len(private_data)
     if private_data_size:
@@ -4035,7 +6461,7 @@ class TraceV3File(data_format.BinaryDataFile):
     """Reads firehose tracepoint data.
 
     Args:
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint relative to
           the start of the chunk set.
 
@@ -4068,7 +6494,7 @@ class TraceV3File(data_format.BinaryDataFile):
     Args:
       log_type (int): firehose tracepoint log type.
       flags (int): firehose tracepoint flags.
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (bytes|memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint data relative to
           the start of the chunk set.
 
@@ -4107,7 +6533,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     Args:
       flags (int): firehose tracepoint flags.
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (bytes|memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint data relative to
           the start of the chunk set.
 
@@ -4146,7 +6572,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     Args:
       flags (int): firehose tracepoint flags.
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (bytes|memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint data relative to
           the start of the chunk set.
 
@@ -4184,7 +6610,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     Args:
       flags (int): firehose tracepoint flags.
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (bytes|memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint data relative to
           the start of the chunk set.
 
@@ -4224,7 +6650,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     Args:
       flags (int): firehose tracepoint flags.
-      tracepoint_data (bytes): firehose tracepoint data.
+      tracepoint_data (bytes|memoryview): firehose tracepoint data.
       data_offset (int): offset of the firehose tracepoint data relative to
           the start of the chunk set.
 
@@ -4258,6 +6684,43 @@ class TraceV3File(data_format.BinaryDataFile):
 
     return trace, context.byte_size
 
+  def _ReadFirehoseTracepointTraceRawValues(self, trace, values_data):
+    """Reads the raw values of firehose tracepoint trace values data.
+
+    Args:
+      trace (tracev3_firehose_tracepoint_trace): trace.
+      values_data (bytes|memoryview): (public) values data.
+
+    Returns:
+      list[tuple[None, bytes]]: None and value data of the trace values.
+
+    Raises:
+      ParseError: if the values cannot be read.
+    """
+    if not trace.number_of_values:
+      return []
+
+    raw_values = []
+
+    value_data_offset = 0
+    value_size_offset = -(1 + trace.number_of_values)
+
+    for _ in range(trace.number_of_values):
+      value_data_size = values_data[value_size_offset]
+
+      if value_data_size not in (4, 8):
+        raise errors.ParseError(f'Unsupported value size: {value_data_size:d}')
+
+      value_data = bytes(values_data[
+          value_data_offset:value_data_offset + value_data_size])
+
+      raw_values.append((None, value_data))
+
+      value_data_offset += value_data_size
+      value_size_offset += 1
+
+    return raw_values
+
   def _ReadFirehoseTracepointTraceValuesData(
       self, trace, values_data, string_formatter):
     """Reads firehose tracepoint trace values data.
@@ -4273,31 +6736,9 @@ class TraceV3File(data_format.BinaryDataFile):
     Raises:
       ParseError: if the values cannot be read.
     """
-    if not trace.number_of_values:
-      return []
-
-    values = []
-
-    value_data_offset = 0
-    value_size_offset = -(1 + trace.number_of_values)
-
-    for value_index in range(trace.number_of_values):
-      value_data_size = values_data[value_size_offset]
-
-      if value_data_size not in (4, 8):
-        raise errors.ParseError(f'Unsupported value size: {value_data_size:d}')
-
-      value_data = values_data[
-          value_data_offset:value_data_offset + value_data_size]
-
-      value = self._DecodeValue(string_formatter, value_index, value_data)
-
-      values.append(value)
+    raw_values = self._ReadFirehoseTracepointTraceRawValues(trace, values_data)
 
-      value_data_offset += value_data_size
-      value_size_offset += 1
-
-    return values
+    return self._DecodeRawValues(raw_values, string_formatter)
 
   def _ReadHeaderChunk(self, file_object, file_offset):
     """Reads a header chunk.
@@ -4361,26 +6802,12 @@ class TraceV3File(data_format.BinaryDataFile):
     Raises:
       ParseError: if the chunk cannot be read.
     """
-    data_type_map = self._GetDataTypeMap('tracev3_oversize_chunk')
-
-    context = dtfabric_data_maps.DataTypeMapContext()
-
-    oversize_chunk = self._ReadStructureFromByteStream(
-        chunk_data, data_offset, data_type_map, 'Oversize chunk',
-        context=context)
+    oversize_chunk, data_size = self._GetOversizeChunk(chunk_data, data_offset)
 
     if self._debug:
       debug_info = self._DEBUG_INFORMATION.get('tracev3_oversize_chunk', None)
       self._DebugPrintStructureObject(oversize_chunk, debug_info)
 
-    data_offset = context.byte_size
-    data_size = data_offset + oversize_chunk.data_size
-    oversize_chunk.values_data = chunk_data[data_offset:data_size]
-
-    data_offset += oversize_chunk.data_size
-    data_size = data_offset + oversize_chunk.private_data_size
-    oversize_chunk.private_data = chunk_data[data_offset:data_size]
-
     if self._debug and data_size < chunk_data_size:
       self._DebugPrintData(
           'Trailing Oversize chunk data', chunk_data[data_size:])
@@ -4542,6 +6969,52 @@ class TraceV3File(data_format.BinaryDataFile):
 
     yield log_entry
 
+  def _ReadTimesyncLogEntries(self, log_entry_filter=None):
+    """Reads the timesync log entries.
+
+    Args:
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries.
+
+    Yields:
+      LogEntry: a log entry.
+    """
+    if self._timesync_boot_record:
+      boot_identifier_string = str(self._boot_identifier).upper()
+
+      log_entry = LogEntry()
+      log_entry.boot_identifier = self._boot_identifier
+      log_entry.event_message = f'=== system boot: {boot_identifier_string:s}'
+      log_entry.event_type = 'timesyncEvent'
+      log_entry.mach_timestamp = 0
+      log_entry.thread_identifier = 0
+      log_entry.timestamp = self._timesync_boot_record.timestamp
+      log_entry.trace_identifier = 0
+
+      if not log_entry_filter or log_entry_filter.Matches(log_entry):
+        yield log_entry
+
+    # TODO: generate timesyncEvent LogEntry
+    # "=== log class: persist begins"
+    # "=== log class: in-memory begins"
+    # are these determined based on the base continuous time of the first
+    # firehose chunk?
+
+    for record in self._timesync_sync_records:
+      boot_identifier_string = str(self._boot_identifier).upper()
+
+      log_entry = LogEntry()
+      log_entry.boot_identifier = self._boot_identifier
+      log_entry.event_message = '=== system wallclock time adjusted'
+      log_entry.event_type = 'timesyncEvent'
+      log_entry.mach_timestamp = record.kernel_time
+      log_entry.parent_activity_identifier = 0
+      log_entry.thread_identifier = 0
+      log_entry.timestamp = record.timestamp
+      log_entry.trace_identifier = 0
+
+      if not log_entry_filter or log_entry_filter.Matches(log_entry):
+        yield log_entry
+
   def _ReadTimesyncRecords(self, boot_identifier):
     """Reads the timesync records corresponding to the boot identifier.
 
@@ -4549,43 +7022,147 @@ class TraceV3File(data_format.BinaryDataFile):
       boot_identifier (str): boot identifier (UUID).
     """
     self._timesync_boot_record = None
+    self._timesync_kernel_times = []
+    self._timesync_last_lookup = None
     self._timesync_sync_records = []
+    self._timesync_timestamps = []
 
     if not self._timesync_path:
       return
 
-    for directory_entry in self._file_system_helper.ListDirectory(
-        self._timesync_path):
-      if self._timesync_boot_record:
+    timesync_index = self._GetTimesyncIndex()
+
+    self._timesync_boot_record, self._timesync_sync_records = (
+        timesync_index.GetRecords(boot_identifier))
+
+    if self._timesync_boot_record:
+      self._timesync_timebase = (
+          self._timesync_boot_record.timebase_numerator /
+          self._timesync_boot_record.timebase_denominator)
+
+      # Sort the timesync records by kernel time into parallel arrays, where
+      # of records with the same kernel time only the first one is used.
+      for record in sorted(
+          self._timesync_sync_records, key=lambda record: record.kernel_time):
+        if (self._timesync_kernel_times and
+            self._timesync_kernel_times[-1] == record.kernel_time):
+          continue
+
+        self._timesync_kernel_times.append(record.kernel_time)
+        self._timesync_timestamps.append(record.timestamp)
+
+  def _ReadUnreadOversizeChunkSets(self, oversize_chunk_store):
+    """Reads the oversize chunks of the chunk sets that were not read yet.
+
+    Args:
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+
+    Raises:
+      ParseError: if a chunk set cannot be read.
+    """
+    file_offsets = self._unread_oversize_chunk_set_file_offsets
+    self._unread_oversize_chunk_set_file_offsets = []
+
+    for file_offset in file_offsets:
+      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+
+      for _ in self._ReadChunkSet(
+          self._file_object, file_offset + 16, chunk_header,
+          oversize_chunk_store, oversize_chunks_only=True):
+        pass
+
+  def _RestoreCursor(self, cursor, oversize_chunk_store):
+    """Restores the state of a cursor.
+
+    The most recent catalog and the oversize chunks, which can be referenced
+    by chunks that follow the cursor, are read again.
+
+    Args:
+      cursor (TraceV3FileCursor): cursor.
+      oversize_chunk_store (OversizeChunkStore): oversize chunk store.
+
+    Raises:
+      ParseError: if the catalog or a chunk set cannot be read.
+    """
+    if (cursor.catalog_file_offset is not None and
+        cursor.catalog_file_offset != self._catalog_file_offset):
+      self._ReadCatalogChunk(cursor.catalog_file_offset)
+
+    for file_offset in cursor.oversize_chunk_set_file_offsets:
+      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+
+      for _ in self._ReadChunkSet(
+          self._file_object, file_offset + 16, chunk_header,
+          oversize_chunk_store, oversize_chunks_only=True):
+        pass
+
+  def BuildChunkSetIndex(self):
+    """Builds an index of the chunk sets.
+
+    Every chunk set is decompressed once to determine the process identifiers
+    of its chunks. The time range of a chunk set is that of the corresponding
+    catalog sub chunk.
+
+    Returns:
+      TraceV3ChunkSetIndex: chunk set index.
+
+    Raises:
+      ParseError: if the file cannot be read.
+    """
+    chunk_set_index = TraceV3ChunkSetIndex()
+    chunk_set_index.boot_identifier = self._boot_identifier
+    chunk_set_index.file_size = self._file_size
+
+    catalog_chunk_set_index = 0
+    file_offset = self._first_chunk_file_offset
+
+    while file_offset + 16 <= self._file_size:
+      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
+      if file_offset + 16 + chunk_header.chunk_data_size > self._file_size:
         break
 
-      lower_directory_entry = directory_entry.lower()
-      if not lower_directory_entry.endswith('.timesync'):
-        continue
+      if chunk_header.chunk_tag == self._CHUNK_TAG_CATALOG:
+        self._ReadCatalogChunk(file_offset)
+        catalog_chunk_set_index = 0
 
-      timesync_file = self._OpenTimesyncDatabaseFile(directory_entry)
+      elif chunk_header.chunk_tag == self._CHUNK_TAG_CHUNK_SET:
+        uncompressed_data = self._ReadChunkSetData(
+            self._file_object, file_offset + 16, chunk_header)
+
+        process_identifiers, has_oversize_chunks = (
+            self._ReadChunkSetIndexValues(uncompressed_data))
+
+        entry = TraceV3ChunkSetIndexEntry()
+        entry.catalog_file_offset = self._catalog_file_offset
+        entry.chunk_set_file_offset = file_offset
+        entry.has_oversize_chunks = has_oversize_chunks
+        entry.process_identifiers = process_identifiers
+
+        if self._catalog and catalog_chunk_set_index < len(
+            self._catalog.sub_chunks):
+          catalog_sub_chunk = self._catalog.sub_chunks[catalog_chunk_set_index]
+          entry.end_time = catalog_sub_chunk.end_time
+          entry.start_time = catalog_sub_chunk.start_time
+        else:
+          # Without a catalog sub chunk the chunk set can be of any time.
+          entry.end_time = 0xffffffffffffffff
+          entry.start_time = 0
 
-      for record in timesync_file.ReadRecords():
-        record_boot_identifier = getattr(record, 'boot_identifier', None)
+        chunk_set_index.entries.append(entry)
 
-        if self._timesync_boot_record:
-          if record_boot_identifier:
-            break
+        catalog_chunk_set_index += 1
 
-          self._timesync_sync_records.append(record)
+      else:
+        raise errors.ParseError(
+            f'Unsupported chunk tag: 0x{chunk_header.chunk_tag:04x}.')
 
-        elif record_boot_identifier == boot_identifier:
-          self._timesync_boot_record = record
+      file_offset += 16 + chunk_header.chunk_data_size
 
-    if self._timesync_boot_record:
-      self._timesync_timebase = (
-          self._timesync_boot_record.timebase_numerator /
-          self._timesync_boot_record.timebase_denominator)
+      _, alignment = divmod(file_offset, 8)
+      if alignment > 0:
+        file_offset += 8 - alignment
 
-      # Sort the timesync records starting with the largest kernel time.
-      self._sorted_timesync_sync_records = sorted(
-          self._timesync_sync_records, key=lambda record: record.kernel_time,
-          reverse=True)
+    return chunk_set_index
 
   def Close(self):
     """Closes a tracev3 file.
@@ -4602,8 +7179,52 @@ class TraceV3File(data_format.BinaryDataFile):
       if uuidtext_file:
         uuidtext_file.Close()
 
+    if self._image_values_cache:
+      self._image_values_cache.Close()
+      self._image_values_cache = None
+
+    if self._oversize_chunk_store:
+      self._oversize_chunk_store.Close()
+      self._oversize_chunk_store = None
+
     super(TraceV3File, self).Close()
 
+  def ReadChunkSetIndex(self, path):
+    """Reads the chunk set index from a sidecar file.
+
+    The chunk set index is used by ReadLogEntries to read only the chunk sets
+    that can match the log entry filter. The index is built and written to
+    the sidecar file if the sidecar file does not exist or is not of the
+    current tracev3 file, where errors writing the sidecar file are ignored.
+
+    Args:
+      path (str): path of the sidecar file.
+
+    Raises:
+      ParseError: if the chunk set index cannot be built.
+    """
+    chunk_set_index = TraceV3ChunkSetIndex()
+
+    try:
+      chunk_set_index.ReadFromFile(path)
+    except (OSError, errors.ParseError):
+      chunk_set_index = None
+
+    if chunk_set_index and (
+        chunk_set_index.boot_identifier != self._boot_identifier or
+        chunk_set_index.file_size != self._file_size):
+      chunk_set_index = None
+
+    if not chunk_set_index:
+      chunk_set_index = self.BuildChunkSetIndex()
+
+      try:
+        chunk_set_index.WriteToFile(path)
+      except OSError:
+        pass
+
+    self._chunk_set_index = chunk_set_index
+
   def ReadFileObject(self, file_object):
     """Reads a tracev3 file-like object.
 
@@ -4664,6 +7285,10 @@ class TraceV3File(data_format.BinaryDataFile):
     if self._file_system_helper.CheckFileExistsByPath(timesync_path):
       self._timesync_path = timesync_path
 
+    if self._image_values_cache_path:
+      self._image_values_cache = ImageValuesCache()
+      self._image_values_cache.Open(self._image_values_cache_path)
+
     file_offset = 0
     self._chunk_index = 1
 
@@ -4685,6 +7310,7 @@ class TraceV3File(data_format.BinaryDataFile):
 
     file_object.seek(file_offset, os.SEEK_SET)
 
+    self._first_chunk_file_offset = file_offset
     self._header_timestamp = (
         header_chunk.timestamp * self._NANOSECONDS_PER_SECOND)
     self._header_timebase = (
@@ -4698,82 +7324,141 @@ class TraceV3File(data_format.BinaryDataFile):
           header_chunk.continuous.continuous_time,
           description='Continuous sub chunk time')
 
-  def ReadLogEntries(self):
+  def ReadLogEntries(
+      self, log_entry_filter=None, start_timestamp=None, end_timestamp=None):
     """Reads log traces.
 
+    The filter is evaluated as early as possible: chunk sets of which the time
+    range, according to the catalog, does not overlap with that of the filter
+    are not decoded, firehose chunks of other processes are skipped, and
+    tracepoints of other event types, time ranges or sub systems are skipped
+    before their values are read and formatted.
+
+    If a chunk set index was read, only the chunk sets that can match the
+    filter are read, instead of all chunks of the file.
+
+    Args:
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries,
+          where None represents all log entries.
+      start_timestamp (Optional[int]): timestamp, in number of nanoseconds
+          since January 1, 1970 00:00:00.000000000, at or after which log
+          entries should have been logged, which is intersected with the time
+          range of log_entry_filter.
+      end_timestamp (Optional[int]): timestamp, in number of nanoseconds
+          since January 1, 1970 00:00:00.000000000, before which log entries
+          should have been logged, which is intersected with the time range
+          of log_entry_filter.
+
     Yields:
       LogEntry: a log entry.
 
     Raises:
       ParseError: if the file cannot be read.
     """
-    if self._timesync_boot_record:
-      boot_identifier_string = str(self._boot_identifier).upper()
+    if start_timestamp is not None or end_timestamp is not None:
+      if not log_entry_filter:
+        log_entry_filter = LogEntryFilter()
 
-      log_entry = LogEntry()
-      log_entry.boot_identifier = self._boot_identifier
-      log_entry.event_message = f'=== system boot: {boot_identifier_string:s}'
-      log_entry.event_type = 'timesyncEvent'
-      log_entry.mach_timestamp = 0
-      log_entry.thread_identifier = 0
-      log_entry.timestamp = self._timesync_boot_record.timestamp
-      log_entry.trace_identifier = 0
+      log_entry_filter = log_entry_filter.CopyWithTimeRange(
+          end_timestamp=end_timestamp, start_timestamp=start_timestamp)
 
-      yield log_entry
+    yield from self._ReadTimesyncLogEntries(log_entry_filter=log_entry_filter)
 
-    # TODO: generate timesyncEvent LogEntry
-    # "=== log class: persist begins"
-    # "=== log class: in-memory begins"
-    # are these determined based on the base continuous time of the first
-    # firehose chunk?
+    cursor = TraceV3FileCursor()
+    cursor.file_offset = self._first_chunk_file_offset
 
-    for record in self._timesync_sync_records:
-      boot_identifier_string = str(self._boot_identifier).upper()
+    oversize_chunk_store = OversizeChunkStore(
+        maximum_memory_size=self._maximum_oversize_chunks_memory_size)
 
-      log_entry = LogEntry()
-      log_entry.boot_identifier = self._boot_identifier
-      log_entry.event_message = '=== system wallclock time adjusted'
-      log_entry.event_type = 'timesyncEvent'
-      log_entry.mach_timestamp = record.kernel_time
-      log_entry.parent_activity_identifier = 0
-      log_entry.thread_identifier = 0
-      log_entry.timestamp = record.timestamp
-      log_entry.trace_identifier = 0
+    try:
+      if self._chunk_set_index and log_entry_filter:
+        yield from self._ReadChunkSetsWithIndex(
+            oversize_chunk_store, log_entry_filter)
+      else:
+        yield from self._ReadChunks(
+            cursor, oversize_chunk_store, log_entry_filter=log_entry_filter)
 
-      yield log_entry
+    finally:
+      self._unread_oversize_chunk_set_file_offsets = []
+      oversize_chunk_store.Close()
 
-    file_offset = self._file_object.tell()
+    if self._debug:
+      self._DebugPrintDecimalValue(
+          'Number of oversize chunk hits', oversize_chunk_store.number_of_hits)
+      self._DebugPrintDecimalValue(
+          'Number of oversize chunk misses',
+          oversize_chunk_store.number_of_misses)
+      self._DebugPrintDecimalValue(
+          'Number of spilled oversize chunks',
+          oversize_chunk_store.number_of_spilled_chunks)
+      self._DebugPrintText('\n')
 
-    oversize_chunks = {}
+  def ReadLogEntryBatches(self, batch_size=65536, log_entry_filter=None):
+    """Reads log traces as batches of columns.
 
-    while file_offset < self._file_size:
-      if self._debug:
-        self._DebugPrintText(f'Chunk: {self._chunk_index:d}\n')
-        self._chunk_index += 1
+    Args:
+      batch_size (Optional[int]): maximum number of log entries per batch.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries,
+          where None represents all log entries.
 
-      chunk_header = self._ReadChunkHeader(self._file_object, file_offset)
-      file_offset += 16
+    Yields:
+      LogEntryBatch: a batch of log entries.
 
-      if chunk_header.chunk_tag == self._CHUNK_TAG_CATALOG:
-        self._catalog = self._ReadCatalog(
-            self._file_object, file_offset, chunk_header.chunk_data_size)
-        self._BuildCatalogProcessInformationEntries(self._catalog)
+    Raises:
+      ParseError: if the file cannot be read.
+    """
+    log_entry_batch = LogEntryBatch()
+    for log_entry in self.ReadLogEntries(log_entry_filter=log_entry_filter):
+      log_entry_batch.AppendLogEntry(log_entry)
 
-      elif chunk_header.chunk_tag == self._CHUNK_TAG_CHUNK_SET:
-        yield from self._ReadChunkSet(
-            self._file_object, file_offset, chunk_header, oversize_chunks)
+      if len(log_entry_batch) >= batch_size:
+        yield log_entry_batch
+        log_entry_batch = LogEntryBatch()
 
-      else:
-        raise errors.ParseError(
-            f'Unsupported chunk tag: 0x{chunk_header.chunk_tag:04x}.')
+    if log_entry_batch:
+      yield log_entry_batch
 
-      file_offset += chunk_header.chunk_data_size
+  def ReadNewLogEntries(self, cursor, log_entry_filter=None):
+    """Reads the log traces of chunks that were appended since the cursor.
 
-      _, alignment = divmod(file_offset, 8)
-      if alignment > 0:
-        alignment = 8 - alignment
+    This allows to follow a tracev3 file that is being written, such as
+    logdata.LiveData.tracev3, by calling this method repeatedly with the same
+    cursor. Only complete chunks are read. The cursor is updated after all
+    log entries of a chunk have been read, so that reading can be resumed,
+    also by another tracev3 file object, without reading chunks again.
 
-      file_offset += alignment
+    Appended chunks cannot be read from a memory mapped file.
+
+    Args:
+      cursor (TraceV3FileCursor): cursor, which is updated while reading.
+          A new cursor represents the start of the file.
+      log_entry_filter (Optional[LogEntryFilter]): filter of the log entries,
+          where None represents all log entries.
+
+    Yields:
+      LogEntry: a log entry.
+
+    Raises:
+      ParseError: if the file cannot be read.
+    """
+    if not self._memory_mapped:
+      self._file_size = self._file_system_helper.GetFileSizeByPath(self._path)
+
+    if not self._oversize_chunk_store:
+      self._oversize_chunk_store = OversizeChunkStore(
+          maximum_memory_size=self._maximum_oversize_chunks_memory_size)
+
+      self._RestoreCursor(cursor, self._oversize_chunk_store)
+
+    if cursor.file_offset is None:
+      yield from self._ReadTimesyncLogEntries(
+          log_entry_filter=log_entry_filter)
+
+      cursor.file_offset = self._first_chunk_file_offset
+
+    yield from self._ReadChunks(
+        cursor, self._oversize_chunk_store, log_entry_filter=log_entry_filter,
+        tolerate_incomplete=True)
 
 
 class UUIDTextFile(data_format.BinaryDataFile):
@@ -4788,19 +7473,29 @@ class UUIDTextFile(data_format.BinaryDataFile):
           'array_of_entry_descriptors': '_FormatArrayOfEntryDescriptors',
           'signature': '_FormatStreamAsString'})
 
-  def __init__(self, debug=False, file_system_helper=None, output_writer=None):
+  def __init__(
+      self, debug=False, file_system_helper=None, output_writer=None,
+      preload_strings=False):
     """Initializes an uuidtext file.
 
     Args:
       debug (Optional[bool]): True if debug information should be written.
       file_system_helper (Optional[FileSystemHelper]): file system helper.
       output_writer (Optional[OutputWriter]): output writer.
+      preload_strings (Optional[bool]): True if the string data should be
+          read into memory when the file is opened, instead of reading every
+          string from the file.
     """
     super(UUIDTextFile, self).__init__(
         debug=debug, file_system_helper=file_system_helper,
         output_writer=output_writer)
     self._entry_descriptors = []
+    self._entry_descriptors_end_offsets = []
+    self._entry_descriptors_offsets = []
     self._file_footer = None
+    self._preload_strings = preload_strings
+    self._string_data = None
+    self._string_data_offset = 0
 
   def _FormatArrayOfEntryDescriptors(self, array_of_entry_descriptors):
     """Formats an array of entry descriptors.
@@ -4900,6 +7595,35 @@ class UUIDTextFile(data_format.BinaryDataFile):
 
     return format_string
 
+  def _ReadStringFromStringData(self, file_offset):
+    """Reads a string from the string data read into memory.
+
+    Args:
+      file_offset (int): offset of the string data relative to the start
+          of the file.
+
+    Returns:
+      str: string.
+
+    Raises:
+      ParseError: if the string cannot be read.
+    """
+    data_offset = file_offset - self._string_data_offset
+
+    end_offset = -1
+    if data_offset >= 0:
+      end_offset = self._string_data.find(b'\x00', data_offset)
+
+    if end_offset == -1:
+      return self._ReadString(self._file_object, file_offset)
+
+    try:
+      return self._string_data[data_offset:end_offset].decode('utf8')
+    except UnicodeDecodeError as exception:
+      raise errors.ParseError((
+          f'Unable to decode string at offset: {file_offset:d} '
+          f'(0x{file_offset:08x}) with error: {exception!s}'))
+
   def GetString(self, string_reference):
     """Retrieves a string.
 
@@ -4912,16 +7636,35 @@ class UUIDTextFile(data_format.BinaryDataFile):
     Raises:
       ParseError: if the string cannot be read.
     """
-    for file_offset, entry_descriptor in self._entry_descriptors:
-      if string_reference < entry_descriptor.offset:
-        continue
+    # Entries can overlap, hence all preceding entries with a maximum end
+    # offset that includes the string reference are checked.
+    matching_entry_index = None
+    matching_file_offset = None
+
+    entry_index = bisect.bisect_right(
+        self._entry_descriptors_offsets, string_reference) - 1
+    while (entry_index >= 0 and
+           self._entry_descriptors_end_offsets[entry_index] >= (
+               string_reference)):
+      descriptor_index, file_offset, entry_descriptor = (
+          self._entry_descriptors[entry_index])
 
       relative_offset = string_reference - entry_descriptor.offset
-      if relative_offset <= entry_descriptor.data_size:
-        file_offset += relative_offset
-        return self._ReadString(self._file_object, file_offset)
+      if relative_offset <= entry_descriptor.data_size and (
+          matching_entry_index is None or
+          descriptor_index < matching_entry_index):
+        matching_entry_index = descriptor_index
+        matching_file_offset = file_offset + relative_offset
 
-    return None
+      entry_index -= 1
+
+    if matching_file_offset is None:
+      return None
+
+    if self._string_data is not None and not self._debug:
+      return self._ReadStringFromStringData(matching_file_offset)
+
+    return self._ReadString(self._file_object, matching_file_offset)
 
   def GetImagePath(self):
     """Retrieves the image path.
@@ -4942,12 +7685,42 @@ class UUIDTextFile(data_format.BinaryDataFile):
     """
     file_header = self._ReadFileHeader(file_object)
 
-    self._entry_descriptors = []
+    entry_descriptors = []
 
-    file_offset = file_object.tell()
-    for entry_descriptor in file_header.entry_descriptors:
-      self._entry_descriptors.append((file_offset, entry_descriptor))
+    string_data_offset = file_object.tell()
+
+    file_offset = string_data_offset
+    for descriptor_index, entry_descriptor in enumerate(
+        file_header.entry_descriptors):
+      entry_descriptors.append((
+          entry_descriptor.offset, descriptor_index, file_offset,
+          entry_descriptor))
 
       file_offset += entry_descriptor.data_size
 
+    entry_descriptors.sort(key=lambda values: values[:2])
+
+    self._entry_descriptors = []
+    self._entry_descriptors_end_offsets = []
+    self._entry_descriptors_offsets = []
+
+    maximum_end_offset = -1
+    for entry_offset, descriptor_index, entry_file_offset, entry_descriptor in (
+        entry_descriptors):
+      maximum_end_offset = max(
+          maximum_end_offset, entry_offset + entry_descriptor.data_size)
+
+      self._entry_descriptors.append((
+          descriptor_index, entry_file_offset, entry_descriptor))
+      self._entry_descriptors_end_offsets.append(maximum_end_offset)
+      self._entry_descriptors_offsets.append(entry_offset)
+
     self._file_footer = self._ReadFileFooter(file_object, file_offset)
+
+    if self._preload_strings:
+      # The string data is followed by the file footer, which is included
+      # so that strings are terminated the same as when read from the file.
+      self._string_data = self._ReadData(
+          file_object, string_data_offset, 0, 'string data',
+          read_ahead_size=-1)
+      self._string_data_offset = string_data_offset
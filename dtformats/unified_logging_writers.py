@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+"""Apple Unified Logging and Activity Tracing log entry writers."""
+
+import abc
+import collections
+import concurrent.futures
+import functools
+
+from dfdatetime import posix_time as dfdatetime_posix_time
+
+from dtformats import unified_logging
+
+
+# Characters that are escaped in JSON strings, which includes the forward
+# slash, as done by "log show --style json".
+_JSON_ESCAPE_CHARACTERS = {
+    character: f'\\u{character:04x}' for character in range(0x20)}
+_JSON_ESCAPE_CHARACTERS.update({
+    ord('\t'): '\\t',
+    ord('\n'): '\\n',
+    ord('"'): '\\"',
+    ord('/'): '\\/',
+    ord('\\'): '\\\\'})
+
+_JSON_ESCAPE_TABLE = str.maketrans(_JSON_ESCAPE_CHARACTERS)
+
+
+@functools.lru_cache(maxsize=4096)
+def _GetDateTimeStringOfSecond(number_of_seconds):
+  """Determines the date and time strings of a second.
+
+  Args:
+    number_of_seconds (int): number of seconds since January 1, 1970
+        00:00:00.
+
+  Returns:
+    tuple[str, str]: date and time string, without fraction of second, and
+        time zone string.
+  """
+  date_time = dfdatetime_posix_time.PosixTimeInNanoseconds(
+      timestamp=number_of_seconds * 1000000000)
+  iso8601_string = date_time.CopyToDateTimeStringISO8601()
+  return ''.join([iso8601_string[:10], ' ', iso8601_string[11:19]]), ''.join([
+      iso8601_string[29:32], iso8601_string[33:35]])
+
+
+def GetDateTimeString(timestamp):
+  """Determines the date and time string.
+
+  Since log entries are mostly written in order of their timestamp, the date
+  and time string of a second is cached.
+
+  Args:
+    timestamp (int): number of nanoseconds since January 1, 1970
+        00:00:00.000000000.
+
+  Returns:
+    str: date and time string.
+  """
+  if timestamp is None:
+    return 'YYYY-MM-DD hh:ss:mm.######+####'
+
+  number_of_seconds, number_of_nanoseconds = divmod(timestamp, 1000000000)
+  date_time_string, time_zone_string = _GetDateTimeStringOfSecond(
+      number_of_seconds)
+
+  number_of_microseconds = number_of_nanoseconds // 1000
+  return (
+      f'{date_time_string:s}.{number_of_microseconds:06d}'
+      f'{time_zone_string:s}')
+
+
+class LogEntryWriter(object):
+  """Log entry writer.
+
+  Log entries can be formatted in worker processes, in batches, where the
+  formatted batches are written in the order of the log entries. Deferred
+  event messages are sent to the worker processes as their raw values and
+  string formatter, hence they are also formatted by the worker processes.
+  """
+
+  # Number of log entries that are formatted in one batch.
+  _BATCH_SIZE = 1024
+
+  # Text that separates formatted log entries.
+  _LOG_ENTRY_SEPARATOR = ''
+
+  def __init__(self, output_writer, number_of_workers=1):
+    """Initializes a log entry writer.
+
+    Args:
+      output_writer (OutputWriter): output writer.
+      number_of_workers (Optional[int]): number of worker processes to format
+          log entries, where 1 represents formatting log entries in the current
+          process and None the number of CPUs.
+    """
+    super(LogEntryWriter, self).__init__()
+    self._number_of_log_entries = 0
+    self._number_of_workers = number_of_workers
+    self._output_writer = output_writer
+
+  @classmethod
+  def _FormatLogEntries(cls, batch):
+    """Formats a batch of log entries.
+
+    Args:
+      batch (list[tuple[LogEntry, int]]): log entries and their parent
+          activity identifiers.
+
+    Returns:
+      str: formatted log entries.
+    """
+    return cls._LOG_ENTRY_SEPARATOR.join([
+        cls._FormatLogEntry(log_entry, parent_activity_identifier)
+        for log_entry, parent_activity_identifier in batch])
+
+  @classmethod
+  @abc.abstractmethod
+  def _FormatLogEntry(cls, log_entry, parent_activity_identifier):
+    """Formats a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+      parent_activity_identifier (int): parent activity identifier or None if
+          not used by the format.
+
+    Returns:
+      str: formatted log entry.
+    """
+
+  def _GetBatches(self, log_entries):
+    """Retrieves batches of log entries.
+
+    Args:
+      log_entries (iterable[LogEntry]): log entries.
+
+    Yields:
+      list[tuple[LogEntry, int]]: log entries and their parent activity
+          identifiers.
+    """
+    batch = []
+    for log_entry in log_entries:
+      # The parent activity identifier depends on the preceding log entries
+      # and therefore is determined before the batch is formatted.
+      parent_activity_identifier = self._GetParentActivityIdentifier(log_entry)
+      batch.append((log_entry, parent_activity_identifier))
+
+      if len(batch) >= self._BATCH_SIZE:
+        yield batch
+        batch = []
+
+    if batch:
+      yield batch
+
+  def _GetParentActivityIdentifier(self, log_entry):  # pylint: disable=unused-argument
+    """Determines the parent activity identifier of a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+
+    Returns:
+      int: parent activity identifier or None if not used by the format.
+    """
+    return None
+
+  def _WriteFormattedLogEntries(self, formatted_log_entries):
+    """Writes formatted log entries.
+
+    Args:
+      formatted_log_entries (str): formatted log entries.
+    """
+    if self._number_of_log_entries > 0:
+      self._output_writer.WriteText(self._LOG_ENTRY_SEPARATOR)
+
+    self._output_writer.WriteText(formatted_log_entries)
+
+  def _WriteLogEntriesInWorkers(self, batches):
+    """Formats log entries in worker processes and writes them.
+
+    Args:
+      batches (iterable[list[tuple[LogEntry, int]]]): batches of log entries
+          and their parent activity identifiers.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=self._number_of_workers) as executor:
+      # The number of batches in flight is bounded to limit memory usage.
+      maximum_number_of_futures = 2 * executor._max_workers  # pylint: disable=protected-access
+
+      futures = collections.deque()
+      for batch in batches:
+        futures.append((
+            executor.submit(self._FormatLogEntries, batch), len(batch)))
+
+        if len(futures) >= maximum_number_of_futures:
+          future, number_of_log_entries = futures.popleft()
+          self._WriteFormattedLogEntries(future.result())
+          self._number_of_log_entries += number_of_log_entries
+
+      while futures:
+        future, number_of_log_entries = futures.popleft()
+        self._WriteFormattedLogEntries(future.result())
+        self._number_of_log_entries += number_of_log_entries
+
+  def WriteFooter(self):
+    """Writes the footer."""
+    return
+
+  def WriteHeader(self):
+    """Writes the header."""
+    return
+
+  def WriteLogEntries(self, log_entries):
+    """Writes log entries.
+
+    Args:
+      log_entries (iterable[LogEntry]): log entries.
+    """
+    batches = self._GetBatches(log_entries)
+
+    if self._number_of_workers != 1:
+      self._WriteLogEntriesInWorkers(batches)
+      return
+
+    for batch in batches:
+      self._WriteFormattedLogEntries(self._FormatLogEntries(batch))
+      self._number_of_log_entries += len(batch)
+
+
+class BaseJSONLogEntryWriter(LogEntryWriter):
+  """Shared functionality for JSON log entry writers."""
+
+  def __init__(self, output_writer, number_of_workers=1):
+    """Initializes a JSON log entry writer.
+
+    Args:
+      output_writer (OutputWriter): output writer.
+      number_of_workers (Optional[int]): number of worker processes to format
+          log entries, where 1 represents formatting log entries in the current
+          process and None the number of CPUs.
+    """
+    super(BaseJSONLogEntryWriter, self).__init__(
+        output_writer, number_of_workers=number_of_workers)
+    self._parent_per_activity_identifier = {}
+
+  @classmethod
+  def _GetFields(cls, log_entry, parent_activity_identifier):
+    """Retrieves the fields of a log entry.
+
+    The fields are in the order used by "log show --style json".
+
+    Args:
+      log_entry (LogEntry): log entry.
+      parent_activity_identifier (int): parent activity identifier.
+
+    Returns:
+      list[tuple[str, object]]: names and values of the fields, where a value
+          is a JSON formatted string, except for backtrace frames, which are
+          represented as a tuple of image offset and identifier pairs.
+    """
+    activity_identifier = log_entry.activity_identifier or 0
+    date_time_string = GetDateTimeString(log_entry.timestamp)
+    process_identifier = log_entry.process_identifier or 0
+    sender_program_counter = log_entry.sender_program_counter or 0
+    thread_identifier = log_entry.thread_identifier or 0
+
+    boot_identifier = str(log_entry.boot_identifier).upper()
+    category = (log_entry.category or '').translate(_JSON_ESCAPE_TABLE)
+    event_type = log_entry.event_type or ''
+    sub_system = (log_entry.sub_system or '').translate(_JSON_ESCAPE_TABLE)
+
+    event_message = log_entry.event_message or ''
+    event_message = event_message.rstrip()
+    if len(event_message) >= 1085:
+      event_message = ''.join([event_message[:1087], '<…>'])
+
+    event_message = event_message.translate(_JSON_ESCAPE_TABLE)
+
+    creator_activity_identifier = log_entry.creator_activity_identifier
+
+    if event_type in ('activityCreateEvent', 'userActionEvent'):
+      # The format string for an activityCreateEvent or an userActionEvent
+      # is empty.
+      format_string = ''
+    else:
+      format_string = log_entry.format_string or ''
+      format_string = format_string.translate(_JSON_ESCAPE_TABLE)
+
+    process_image_identifier = ''
+    if log_entry.process_image_identifier:
+      process_image_identifier = str(
+          log_entry.process_image_identifier).upper()
+
+    process_image_path = log_entry.process_image_path or ''
+    process_image_path = process_image_path.translate(_JSON_ESCAPE_TABLE)
+
+    sender_image_identifier = ''
+    if log_entry.sender_image_identifier:
+      sender_image_identifier = str(
+          log_entry.sender_image_identifier).upper()
+
+    sender_image_path = log_entry.sender_image_path or ''
+    sender_image_path = sender_image_path.translate(_JSON_ESCAPE_TABLE)
+
+    if event_type == 'timesyncEvent':
+      return [
+          ('bootUUID', f'"{boot_identifier:s}"'),
+          ('category', f'"{category:s}"'),
+          ('processImageUUID', f'"{process_image_identifier:s}"'),
+          ('eventType', f'"{event_type:s}"'),
+          ('threadID', f'{thread_identifier:d}'),
+          ('timestamp', f'"{date_time_string:s}"'),
+          ('activityIdentifier', f'{activity_identifier:d}'),
+          ('senderProgramCounter', f'{sender_program_counter:d}'),
+          ('parentActivityIdentifier', '0'),
+          ('machTimestamp', f'{log_entry.mach_timestamp:d}'),
+          ('processID', f'{process_identifier:d}'),
+          ('subsystem', f'"{sub_system:s}"'),
+          ('timezoneName', '""'),
+          ('traceID', f'{log_entry.trace_identifier:d}'),
+          ('eventMessage', f'"{event_message:s}"'),
+          ('formatString', f'"{format_string:s}"'),
+          ('processImagePath', f'"{process_image_path:s}"'),
+          ('senderImageUUID', f'"{sender_image_identifier:s}"'),
+          ('senderImagePath', f'"{sender_image_path:s}"')]
+
+    fields = [('traceID', f'{log_entry.trace_identifier:d}')]
+
+    if event_type not in (
+        'activityCreateEvent', 'lossEvent', 'signpostEvent',
+        'userActionEvent'):
+      fields.append(('eventMessage', f'"{event_message:s}"'))
+
+    fields.append(('eventType', f'"{event_type:s}"'))
+
+    if log_entry.loss_count is not None:
+      # TODO: improve support for lossCountSaturated
+      fields.extend([
+          ('lossCount', f'{log_entry.loss_count:d}'),
+          ('lossCountSaturated', 'true')])
+
+    if log_entry.signpost_identifier is not None:
+      signpost_scope = (log_entry.signpost_scope or '').translate(
+          _JSON_ESCAPE_TABLE)
+
+      fields.extend([
+          ('signpostID', f'{log_entry.signpost_identifier:d}'),
+          ('signpostScope', f'"{signpost_scope:s}"')])
+
+    if event_type not in (
+        'activityCreateEvent', 'lossEvent', 'userActionEvent'):
+      # TODO: implement source support.
+      fields.append(('source', 'null'))
+
+    fields.append(('formatString', f'"{format_string:s}"'))
+
+    if log_entry.loss_count is not None:
+      fields.append((
+          'lossEndMachContinuousTimestamp',
+          f'{log_entry.loss_end_mach_timestamp:d}'))
+
+    fields.extend([
+        ('activityIdentifier', f'{activity_identifier:d}'),
+        ('subsystem', f'"{sub_system:s}"'),
+        ('category', f'"{category:s}"'),
+        ('threadID', f'{thread_identifier:d}'),
+        ('senderImageUUID', f'"{sender_image_identifier:s}"')])
+
+    if log_entry.signpost_identifier is not None:
+      signpost_type = (log_entry.signpost_type or '').translate(
+          _JSON_ESCAPE_TABLE)
+
+      fields.append(('signpostType', f'"{signpost_type:s}"'))
+
+    if log_entry.backtrace_frames:
+      fields.append(('backtrace', tuple(
+          (backtrace_frame.image_offset,
+           str(backtrace_frame.image_identifier).upper())
+          for backtrace_frame in log_entry.backtrace_frames)))
+
+    fields.extend([
+        ('bootUUID', f'"{boot_identifier:s}"'),
+        ('processImagePath', f'"{process_image_path:s}"'),
+        ('timestamp', f'"{date_time_string:s}"'),
+        ('senderImagePath', f'"{sender_image_path:s}"')])
+
+    if creator_activity_identifier is not None:
+      fields.append((
+          'creatorActivityID', f'{creator_activity_identifier:d}'))
+
+    elif log_entry.loss_count is not None:
+      start_time_string = GetDateTimeString(log_entry.loss_start_timestamp)
+      end_time_string = GetDateTimeString(log_entry.loss_end_timestamp)
+
+      fields.extend([
+          ('lossStartMachContinuousTimestamp',
+           f'{log_entry.loss_start_mach_timestamp:d}'),
+          ('lossEndTimestamp', f'"{end_time_string:s}"'),
+          ('lossStartTimestamp', f'"{start_time_string:s}"')])
+
+    elif log_entry.signpost_identifier is not None:
+      signpost_name = (log_entry.signpost_name or '').translate(
+          _JSON_ESCAPE_TABLE)
+
+      fields.append(('signpostName', f'"{signpost_name:s}"'))
+
+    fields.append(('machTimestamp', f'{log_entry.mach_timestamp:d}'))
+
+    if event_type in (
+        'activityCreateEvent', 'lossEvent', 'signpostEvent',
+        'userActionEvent'):
+      fields.append(('eventMessage', f'"{event_message:s}"'))
+    else:
+      message_type = log_entry.message_type or ''
+
+      fields.append(('messageType', f'"{message_type:s}"'))
+
+    fields.extend([
+        ('processImageUUID', f'"{process_image_identifier:s}"'),
+        ('processID', f'{process_identifier:d}'),
+        ('senderProgramCounter', f'{sender_program_counter:d}'),
+        ('parentActivityIdentifier', f'{parent_activity_identifier:d}'),
+        ('timezoneName', '""')])
+
+    return fields
+
+  def _GetParentActivityIdentifier(self, log_entry):
+    """Determines the parent activity identifier of a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+
+    Returns:
+      int: parent activity identifier.
+    """
+    if log_entry.event_type == 'timesyncEvent':
+      return 0
+
+    activity_identifier = log_entry.activity_identifier or 0
+    creator_activity_identifier = log_entry.creator_activity_identifier
+
+    if creator_activity_identifier is not None:
+      self._parent_per_activity_identifier[activity_identifier] = (
+          creator_activity_identifier &
+          unified_logging.TraceV3File.ACTIVITY_IDENTIFIER_BITMASK)
+
+    if log_entry.parent_activity_identifier:
+      parent_activity_identifier = log_entry.parent_activity_identifier
+    else:
+      parent_activity_identifier = self._parent_per_activity_identifier.get(
+          activity_identifier, None) or 0
+
+    if parent_activity_identifier == creator_activity_identifier:
+      parent_activity_identifier = 0
+
+    return parent_activity_identifier
+
+
+class JSONLogEntryWriter(BaseJSONLogEntryWriter):
+  """JSON log entry writer compatible with "log show --style json"."""
+
+  _LOG_ENTRY_SEPARATOR = '},{\n'
+
+  @classmethod
+  def _FormatLogEntry(cls, log_entry, parent_activity_identifier):
+    """Formats a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+      parent_activity_identifier (int): parent activity identifier.
+
+    Returns:
+      str: formatted log entry.
+    """
+    lines = []
+    for name, value in cls._GetFields(log_entry, parent_activity_identifier):
+      if not isinstance(value, tuple):
+        lines.append(f'  "{name:s}" : {value:s},')
+        continue
+
+      lines.extend([
+          f'  "{name:s}" : {{',
+          '    "frames" : [',
+          '      {'])
+
+      for index, (image_offset, image_identifier) in enumerate(value):
+        if index > 0:
+          lines.extend([
+              '      },',
+              '      {'])
+
+        lines.extend([
+            f'        "imageOffset" : {image_offset:d},',
+            f'        "imageUUID" : "{image_identifier:s}"'])
+
+      lines.extend([
+          '      }',
+          '    ]',
+          '  },'])
+
+    # The last field is not followed by a comma.
+    lines[-1] = lines[-1][:-1]
+    lines.append('')
+
+    return '\n'.join(lines)
+
+  def WriteFooter(self):
+    """Writes the footer."""
+    self._output_writer.WriteText('}]')
+
+  def WriteHeader(self):
+    """Writes the header."""
+    self._output_writer.WriteText('[{\n')
+
+
+class NDJSONLogEntryWriter(BaseJSONLogEntryWriter):
+  """Newline delimited JSON (NDJSON) log entry writer.
+
+  Every log entry is written as a JSON object on a single line, with the
+  fields of "log show --style json".
+  """
+
+  @classmethod
+  def _FormatLogEntry(cls, log_entry, parent_activity_identifier):
+    """Formats a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+      parent_activity_identifier (int): parent activity identifier.
+
+    Returns:
+      str: formatted log entry.
+    """
+    values = []
+    for name, value in cls._GetFields(log_entry, parent_activity_identifier):
+      if isinstance(value, tuple):
+        frames = ','.join([
+            f'{{"imageOffset":{image_offset:d},'
+            f'"imageUUID":"{image_identifier:s}"}}'
+            for image_offset, image_identifier in value])
+        value = f'{{"frames":[{frames:s}]}}'
+
+      values.append(f'"{name:s}":{value:s}')
+
+    values = ','.join(values)
+    return f'{{{values:s}}}\n'
+
+
+class TextLogEntryWriter(LogEntryWriter):
+  """Text log entry writer."""
+
+  @classmethod
+  def _FormatLogEntry(cls, log_entry, parent_activity_identifier):
+    """Formats a log entry.
+
+    Args:
+      log_entry (LogEntry): log entry.
+      parent_activity_identifier (int): parent activity identifier or None if
+          not used by the format.
+
+    Returns:
+      str: formatted log entry.
+    """
+    activity_identifier = log_entry.activity_identifier or 0
+    date_time_string = GetDateTimeString(log_entry.timestamp)
+    process_identifier = log_entry.process_identifier or 0
+    thread_identifier = log_entry.thread_identifier or 0
+    ttl = log_entry.ttl or 0
+
+    event_message_parts = []
+
+    if log_entry.process_image_path:
+      _, _, basename = log_entry.process_image_path.rpartition('/')
+      event_message_parts.append(f'{basename:s}:')
+
+    if log_entry.sender_image_path:
+      _, _, basename = log_entry.sender_image_path.rpartition('/')
+      event_message_parts.append(f'({basename:s})')
+
+    if log_entry.sub_system and log_entry.category:
+      event_message_parts.append(
+          f'[{log_entry.sub_system:s}:{log_entry.category:s}]')
+
+    event_message_parts.append(log_entry.event_message or '')
+    event_message = ' '.join(event_message_parts)
+
+    event_type = log_entry.event_type or ''
+
+    return (
+        f'{date_time_string:s}\t0x{thread_identifier:<8x}\t'
+        f'{event_type:11s}\t0x{activity_identifier:<18x}\t'
+        f'{process_identifier:<6d}\t{ttl:<4d}\t{event_message:s}\n')
+
+  def WriteHeader(self):
+    """Writes the header."""
+    self._output_writer.WriteText((
+        'Timestamp                       Thread     Type        '
+        'Activity             PID    TTL\n'))
@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 """WMI Common Information Model (CIM) repository files."""
 
+import bisect
+import collections
+import concurrent.futures
 import glob
 import hashlib
 import logging
 import os
+import struct
 
 from dtfabric import errors as dtfabric_errors
 from dtfabric.runtime import data_maps as dtfabric_data_maps
@@ -146,6 +150,9 @@ class IndexBinaryTreePage(object):
     page_value_offsets (list[int]): page value offsets.
     page_values (list[bytes]): page values.
     root_page_number (int): root page number.
+    sub_page_numbers (list[int]): sub page numbers in order of the keys, where
+        the sub page at index N contains the keys that sort before key N and
+        after key N - 1, and None represents no sub page.
     sub_pages (list[int]): sub page numbers.
   """
 
@@ -159,6 +166,7 @@ class IndexBinaryTreePage(object):
     self.page_value_offsets = None
     self.page_values = []
     self.root_page_number = None
+    self.sub_page_numbers = []
     self.sub_pages = []
 
 
@@ -201,17 +209,22 @@ class ObjectsDataPage(object):
       page_offset (int): offset of the page relative to the start of the file.
     """
     super(ObjectsDataPage, self).__init__()
-    self._object_descriptors = []
+    self._object_descriptors = {}
 
     self.page_offset = page_offset
 
   def AppendObjectDescriptor(self, object_descriptor):
     """Appends an object descriptor.
 
+    If the page contains multiple object descriptors with the same identifier
+    the first one is used.
+
     Args:
-      object_descriptor (cim_object_descriptor): object descriptor.
+      object_descriptor (ObjectDescriptor|cim_object_descriptor): object
+          descriptor.
     """
-    self._object_descriptors.append(object_descriptor)
+    self._object_descriptors.setdefault(
+        object_descriptor.identifier, object_descriptor)
 
   def GetObjectDescriptor(self, record_identifier, data_size):
     """Retrieves a specific object descriptor.
@@ -221,13 +234,10 @@ class ObjectsDataPage(object):
       data_size (int): object record data size.
 
     Returns:
-      cim_object_descriptor: an object descriptor or None.
+      ObjectDescriptor|cim_object_descriptor: an object descriptor or None.
     """
-    object_descriptor_match = None
-    for object_descriptor in self._object_descriptors:
-      if object_descriptor.identifier == record_identifier:
-        object_descriptor_match = object_descriptor
-        break
+    object_descriptor_match = self._object_descriptors.get(
+        record_identifier, None)
 
     if not object_descriptor_match:
       logging.warning('Object record data not found.')
@@ -240,6 +250,37 @@ class ObjectsDataPage(object):
     return object_descriptor_match
 
 
+class ObjectDescriptor(object):
+  """Object descriptor.
+
+  Attributes:
+    data_checksum (int): checksum of the object record data.
+    data_file_offset (int): offset of the object record data relative to
+        the start of the file.
+    data_offset (int): offset of the object record data relative to the start
+        of the page.
+    data_size (int): size of the object record data.
+    identifier (int): identifier of the object record.
+  """
+
+  def __init__(self, identifier, data_offset, data_size, data_checksum):
+    """Initializes an object descriptor.
+
+    Args:
+      identifier (int): identifier of the object record.
+      data_offset (int): offset of the object record data relative to the start
+          of the page.
+      data_size (int): size of the object record data.
+      data_checksum (int): checksum of the object record data.
+    """
+    super(ObjectDescriptor, self).__init__()
+    self.data_checksum = data_checksum
+    self.data_file_offset = None
+    self.data_offset = data_offset
+    self.data_size = data_size
+    self.identifier = identifier
+
+
 class ObjectRecord(object):
   """Object record.
 
@@ -263,6 +304,87 @@ class ObjectRecord(object):
     self.offset = offset
 
 
+class PageCache(object):
+  """Size-bounded least recently used (LRU) page cache.
+
+  The cache is shared by the index binary-tree and objects data files of
+  a CIM repository, where the lookup key identifies the file and the page.
+
+  Attributes:
+    number_of_hits (int): number of lookups of which the page was cached.
+    number_of_misses (int): number of lookups of which the page was not
+        cached.
+  """
+
+  _DEFAULT_MAXIMUM_NUMBER_OF_PAGES = 4096
+
+  _PAGE_SIZE = 8192
+
+  def __init__(self, maximum_number_of_pages=None, maximum_size=None):
+    """Initializes a page cache.
+
+    Args:
+      maximum_number_of_pages (Optional[int]): maximum number of cached pages,
+          where None represents the default or the number of pages that fit in
+          maximum_size.
+      maximum_size (Optional[int]): maximum size, in bytes, of the cached
+          pages, where None represents the default or maximum_number_of_pages.
+    """
+    if maximum_number_of_pages is None:
+      if maximum_size is None:
+        maximum_number_of_pages = self._DEFAULT_MAXIMUM_NUMBER_OF_PAGES
+      else:
+        maximum_number_of_pages = maximum_size // self._PAGE_SIZE
+
+    elif maximum_size is not None:
+      maximum_number_of_pages = min(
+          maximum_number_of_pages, maximum_size // self._PAGE_SIZE)
+
+    super(PageCache, self).__init__()
+    self._maximum_number_of_pages = maximum_number_of_pages
+    self._pages = collections.OrderedDict()
+    self.number_of_hits = 0
+    self.number_of_misses = 0
+
+  def Empty(self):
+    """Empties the cache."""
+    self._pages = collections.OrderedDict()
+
+  def GetPage(self, lookup_key):
+    """Retrieves a page.
+
+    Args:
+      lookup_key (tuple): lookup key of the page.
+
+    Returns:
+      object: page or None if not cached.
+    """
+    page = self._pages.get(lookup_key, None)
+    if page is None:
+      self.number_of_misses += 1
+    else:
+      self._pages.move_to_end(lookup_key)
+      self.number_of_hits += 1
+
+    return page
+
+  def SetPage(self, lookup_key, page):
+    """Caches a page.
+
+    Args:
+      lookup_key (tuple): lookup key of the page.
+      page (object): page.
+    """
+    if self._maximum_number_of_pages <= 0:
+      return
+
+    self._pages[lookup_key] = page
+    self._pages.move_to_end(lookup_key)
+
+    while len(self._pages) > self._maximum_number_of_pages:
+      self._pages.popitem(last=False)
+
+
 class PropertyValueDataMap(object):
   """Property value data map.
 
@@ -313,15 +435,18 @@ class IndexBinaryTreeFile(data_format.BinaryDataFile):
 
   _KEY_SEGMENT_SEPARATOR = '\\'
 
-  def __init__(self, debug=False, output_writer=None):
+  def __init__(self, debug=False, output_writer=None, page_cache=None):
     """Initializes an index binary-tree file.
 
     Args:
       debug (Optional[bool]): True if debug information should be written.
       output_writer (Optional[OutputWriter]): output writer.
+      page_cache (Optional[PageCache]): page cache, where None represents
+          pages are not cached.
     """
     super(IndexBinaryTreeFile, self).__init__(
         debug=debug, output_writer=output_writer)
+    self._page_cache = page_cache
     self._unavailable_page_numbers = set([0, 0xffffffff])
 
   def _DebugPrintPageBody(self, page_body):
@@ -451,7 +576,10 @@ class IndexBinaryTreeFile(data_format.BinaryDataFile):
       index_binary_tree_page.number_of_keys = page_body.number_of_keys
 
       for page_number in page_body.sub_pages:
-        if page_number not in (0, 0xffffffff):
+        if page_number in (0, 0xffffffff):
+          index_binary_tree_page.sub_page_numbers.append(None)
+        else:
+          index_binary_tree_page.sub_page_numbers.append(page_number)
           index_binary_tree_page.sub_pages.append(page_number)
 
       index_binary_tree_page.page_value_offsets = page_body.value_offsets
@@ -596,8 +724,17 @@ class IndexBinaryTreeFile(data_format.BinaryDataFile):
     if file_offset >= self._file_size:
       return None
 
-    # TODO: cache pages.
-    return self._ReadPage(self._file_object, file_offset)
+    if not self._page_cache:
+      return self._ReadPage(self._file_object, file_offset)
+
+    lookup_key = ('index', page_number)
+
+    index_binary_tree_page = self._page_cache.GetPage(lookup_key)
+    if not index_binary_tree_page:
+      index_binary_tree_page = self._ReadPage(self._file_object, file_offset)
+      self._page_cache.SetPage(lookup_key, index_binary_tree_page)
+
+    return index_binary_tree_page
 
   def ReadFileObject(self, file_object):
     """Reads an index binary-tree file-like object.
@@ -889,8 +1026,24 @@ class ObjectsDataFile(data_format.BinaryDataFile):
 
   _EMPTY_OBJECT_DESCRIPTOR = b'\x00' * 16
 
+  # Identifier, data offset, data size and data checksum.
+  _OBJECT_DESCRIPTOR = struct.Struct('<4I')
+
   _PAGE_SIZE = 8192
 
+  def __init__(self, debug=False, output_writer=None, page_cache=None):
+    """Initializes an objects data file.
+
+    Args:
+      debug (Optional[bool]): True if debug information should be written.
+      output_writer (Optional[OutputWriter]): output writer.
+      page_cache (Optional[PageCache]): page cache, where None represents
+          pages are not cached.
+    """
+    super(ObjectsDataFile, self).__init__(
+        debug=debug, output_writer=output_writer)
+    self._page_cache = page_cache
+
   def _ReadObjectDescriptor(self, file_object):
     """Reads an object descriptor.
 
@@ -944,13 +1097,38 @@ class ObjectsDataFile(data_format.BinaryDataFile):
     Raises:
       ParseError: if the object descriptor cannot be read.
     """
-    while True:
-      object_descriptor = self._ReadObjectDescriptor(file_object)
-      if not object_descriptor:
+    if self._debug:
+      while True:
+        object_descriptor = self._ReadObjectDescriptor(file_object)
+        if not object_descriptor:
+          break
+
+        objects_page.AppendObjectDescriptor(object_descriptor)
+
+      return
+
+    # The object descriptors of the page are read and unpacked at once, which
+    # is considerably faster than mapping every object descriptor.
+    file_offset = file_object.tell()
+    page_data = file_object.read(self._PAGE_SIZE)
+
+    page_data_size = len(page_data)
+    page_data_size -= page_data_size % self._OBJECT_DESCRIPTOR.size
+
+    for values in self._OBJECT_DESCRIPTOR.iter_unpack(
+        page_data[:page_data_size]):
+      # The last object descriptor (terminator) is filled with 0-byte values.
+      if not any(values):
         break
 
+      object_descriptor = ObjectDescriptor(*values)
+      object_descriptor.data_file_offset = (
+          file_offset + object_descriptor.data_offset)
+
       objects_page.AppendObjectDescriptor(object_descriptor)
 
+      file_offset += self._OBJECT_DESCRIPTOR.size
+
   def _ReadPage(self, file_object, file_offset, is_data_page):
     """Reads a page.
 
@@ -993,7 +1171,18 @@ class ObjectsDataFile(data_format.BinaryDataFile):
     if file_offset >= self._file_size:
       return None
 
-    return self._ReadPage(self._file_object, file_offset, is_data_page)
+    if not self._page_cache:
+      return self._ReadPage(self._file_object, file_offset, is_data_page)
+
+    lookup_key = ('objects', page_number, is_data_page)
+
+    objects_page = self._page_cache.GetPage(lookup_key)
+    if not objects_page:
+      objects_page = self._ReadPage(
+          self._file_object, file_offset, is_data_page)
+      self._page_cache.SetPage(lookup_key, objects_page)
+
+    return objects_page
 
   def ReadFileObject(self, file_object):
     """Reads an objects data file-like object.
@@ -2788,6 +2977,20 @@ class Instance(CIMObject):
     self.namespace = None
     self.properties = {}
 
+  def __getstate__(self):
+    """Retrieves the state of the instance for pickling.
+
+    The cached data type maps and the output writer are not pickled, since
+    they cannot be pickled.
+
+    Returns:
+      dict[str, object]: state of the instance.
+    """
+    state = dict(self.__dict__)
+    state['_data_type_maps'] = {}
+    state['_output_writer'] = None
+    return state
+
   def DebugPrint(self):
     """Prints instance information."""
     self._DebugPrintText('Instance:\n')
@@ -3068,6 +3271,8 @@ class CIMRepository(data_format.BinaryDataFormat):
 
   Attributes:
     format_version (str): format version.
+    page_cache (PageCache): page cache shared by the index binary-tree and
+        objects data files.
   """
 
   # Using a class constant significantly speeds up the time required to load
@@ -3159,32 +3364,53 @@ class CIMRepository(data_format.BinaryDataFormat):
       'ROOT\\subscription',
       'ROOT\\WMI']
 
-  def __init__(self, debug=False, file_system_helper=None, output_writer=None):
+  # Number of instances that are decoded in one batch by a worker process.
+  _INSTANCES_BATCH_SIZE = 256
+
+  def __init__(
+      self, debug=False, file_system_helper=None, maximum_cached_pages=None,
+      maximum_cached_pages_size=None, output_writer=None,
+      preload_class_definitions=False):
     """Initializes a CIM repository.
 
     Args:
       debug (Optional[bool]): True if debug information should be written.
       file_system_helper (Optional[FileSystemHelper]): file system helper.
+      maximum_cached_pages (Optional[int]): maximum number of cached index
+          binary-tree and objects data pages, where None represents the
+          default.
+      maximum_cached_pages_size (Optional[int]): maximum size, in bytes, of
+          the cached index binary-tree and objects data pages, where None
+          represents the default.
       output_writer (Optional[OutputWriter]): output writer.
+      preload_class_definitions (Optional[bool]): True if all class definitions
+          should be read when the repository is opened, instead of when they
+          are first needed.
     """
     if not file_system_helper:
       file_system_helper = file_system.NativeFileSystemHelper()
 
     super(CIMRepository, self).__init__()
     self._debug = debug
+    self._class_definition_keys_by_hash = None
     self._class_definitions_by_hash = {}
     self._class_value_data_map_by_hash = {}
     self._file_system_helper = file_system_helper
     self._index_binary_tree_file = None
     self._index_mapping_table = None
     self._index_root_page = None
+    self._memory_mapped = False
     self._namespace_instances = []
     self._objects_data_file = None
     self._objects_mapping_table = None
     self._output_writer = output_writer
+    self._preload_class_definitions = preload_class_definitions
     self._repository_file = None
 
     self.format_version = None
+    self.page_cache = PageCache(
+        maximum_number_of_pages=maximum_cached_pages,
+        maximum_size=maximum_cached_pages_size)
 
   def _DebugPrintText(self, text):
     """Prints text for debugging.
@@ -3250,7 +3476,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     # Unsure how reliable this method is since multiple index[1-3].map files
     # can have the same sequence number but contain different mappings.
     for mapping_file_number in range(1, 4):
-      filename_as_glob, _ = self._FormatFilenameAsGlob(
+      filename_as_glob = self._FormatFilenameAsGlob(
           f'mapping{mapping_file_number:d}.map')
       path_with_glob = self._file_system_helper.JoinPath([
           path, filename_as_glob])
@@ -3284,38 +3510,118 @@ class CIMRepository(data_format.BinaryDataFormat):
 
     return active_mapping_file
 
-  def _GetClassDefinitionByName(self, class_name):
+  def _GetClassDefinitionByName(self, class_name, namespace_hash=None):
     """Retrieves a class definition by name.
 
     Args:
       class_name (str): name of the class definition.
+      namespace_hash (Optional[str]): hash of the name of the namespace in
+          which the class definition is first looked up.
 
     Returns:
       ClassDefinition: class definitions or None.
     """
     class_name_hash = self._GetHashFromString(class_name)
-    return self._GetClassDefinitionByHash(class_name_hash)
+    return self._GetClassDefinitionByHash(
+        class_name_hash, namespace_hash=namespace_hash)
 
-  def _GetClassDefinitionByHash(self, class_name_hash):
+  def _GetClassDefinitionByHash(self, class_name_hash, namespace_hash=None):
     """Retrieves a class definition by hash of the name.
 
+    Class definitions are read on first use and cached per namespace, since
+    a class can have a different definition in every namespace.
+
     Args:
       class_name_hash (str): hash of the class name.
+      namespace_hash (Optional[str]): hash of the name of the namespace in
+          which the class definition is first looked up.
 
     Returns:
       ClassDefinition: class definitions or None.
     """
-    # TODO: change to resolve on demand and cache the resulting class
-    # definition.
-    class_definition = self._class_definitions_by_hash.get(
-        class_name_hash.lower(), None)
+    if namespace_hash:
+      namespace_hash = namespace_hash.lower()
+
+    class_name_hash = class_name_hash.lower()
+    lookup_key = (namespace_hash, class_name_hash)
+
+    class_definition = self._class_definitions_by_hash.get(lookup_key, None)
+    if not class_definition and self._index_binary_tree_file:
+      key = self._GetClassDefinitionKeyByHash(
+          class_name_hash, namespace_hash=namespace_hash)
+      if key:
+        # The class definition is also cached for the namespace it is defined
+        # in, such as the namespace of the system classes, so that it is read
+        # only once.
+        key_segments = key.split(self._KEY_SEGMENT_SEPARATOR)
+
+        defining_namespace_hash = None
+        if key_segments[1].startswith('NS_'):
+          defining_namespace_hash = key_segments[1][3:].lower()
+
+        defining_lookup_key = (defining_namespace_hash, class_name_hash)
+
+        class_definition = self._class_definitions_by_hash.get(
+            defining_lookup_key, None)
+        if not class_definition:
+          object_record = self.GetObjectRecordByKey(key)
+          class_definition = self._ReadClassDefinitionFromObjectRecord(
+              object_record)
+
+          self._class_definitions_by_hash[defining_lookup_key] = (
+              class_definition)
+
+        self._class_definitions_by_hash[lookup_key] = class_definition
+
     return class_definition
 
-  def _GetClassValueMapByHash(self, class_name_hash):
+  def _GetClassDefinitionKeyByHash(self, class_name_hash, namespace_hash=None):
+    """Retrieves the index key of a class definition by hash of the name.
+
+    The class definition is looked up in the namespace and in the namespace of
+    the system classes. If not found there, the keys of all class definitions
+    are determined once, from all index keys.
+
+    Args:
+      class_name_hash (str): hash of the class name.
+      namespace_hash (Optional[str]): hash of the name of the namespace in
+          which the class definition is first looked up.
+
+    Returns:
+      str: index key of the class definition or None if not available.
+    """
+    namespace_hashes = [self._GetHashFromString('__SystemClass')]
+    if namespace_hash:
+      namespace_hashes.insert(0, namespace_hash)
+
+    class_name_hash = class_name_hash.upper()
+
+    for namespace_hash in namespace_hashes:
+      key = self.LookupKey(self._KEY_SEGMENT_SEPARATOR.join([
+          '', f'NS_{namespace_hash.upper():s}', f'CD_{class_name_hash:s}']))
+      if key:
+        return key
+
+    if self._class_definition_keys_by_hash is None:
+      self._class_definition_keys_by_hash = {}
+
+      index_page = self._GetIndexRootPage()
+      for key in self._GetKeysFromIndexPage(index_page):
+        _, _, key_segment = key.rpartition(self._KEY_SEGMENT_SEPARATOR)
+        if key_segment.startswith('CD_'):
+          name_hash, _, _ = key_segment[3:].partition(
+              self._KEY_VALUE_SEPARATOR)
+          self._class_definition_keys_by_hash[name_hash] = key
+
+    return self._class_definition_keys_by_hash.get(class_name_hash, None)
+
+  def _GetClassValueMapByHash(self, class_name_hash, namespace_hash=None):
     """Retrieves a class value map by hash of the name.
 
     Args:
       class_name_hash (str): hash of the class name.
+      namespace_hash (Optional[str]): hash of the name of the namespace in
+          which the class definitions are first looked up.
 
     Returns:
       ClassValueMap: class value map or None.
@@ -3323,12 +3629,18 @@ class CIMRepository(data_format.BinaryDataFormat):
     Raises:
       RuntimeError: if a class definition cannot be found.
     """
-    lookup_key = class_name_hash.lower()
+    if namespace_hash:
+      namespace_hash = namespace_hash.lower()
+
+    # The class value map is cached per namespace, since the definitions of
+    # the class and its parent classes are looked up in the namespace.
+    lookup_key = (namespace_hash, class_name_hash.lower())
 
     class_value_data_map = self._class_value_data_map_by_hash.get(
         lookup_key, None)
     if not class_value_data_map:
-      class_definition = self._GetClassDefinitionByHash(class_name_hash)
+      class_definition = self._GetClassDefinitionByHash(
+          class_name_hash, namespace_hash=namespace_hash)
       if not class_definition:
         raise RuntimeError((
             f'Unable to retrieve definition of class with hash: '
@@ -3336,12 +3648,13 @@ class CIMRepository(data_format.BinaryDataFormat):
 
       class_definitions = [class_definition]
       while class_definition.super_class_name:
+        super_class_name = class_definition.super_class_name
         class_definition = self._GetClassDefinitionByName(
-            class_definition.super_class_name)
+            super_class_name, namespace_hash=namespace_hash)
         if not class_definition:
           raise RuntimeError((
               f'Unable to retrieve definition of class with name: '
-              f'{class_definition.super_class_name:s}'))
+              f'{super_class_name:s}'))
 
         class_definitions.append(class_definition)
 
@@ -3461,6 +3774,41 @@ class CIMRepository(data_format.BinaryDataFormat):
             mapped_page_number)
         yield from self._GetKeysFromIndexPage(sub_index_page)
 
+  def _GetKeysWithPrefixFromIndexPage(self, index_page, key_prefix):
+    """Retrieves the keys with a specific prefix from an index page.
+
+    The keys in the binary-tree are sorted, hence only the sub pages that can
+    contain keys with the prefix are read.
+
+    Args:
+      index_page (IndexBinaryTreePage): index binary-tree page.
+      key_prefix (str): prefix of the CIM keys.
+
+    Yields:
+      str: a CIM key.
+    """
+    if index_page:
+      number_of_keys = len(index_page.keys)
+
+      key_index = bisect.bisect_left(index_page.keys, key_prefix)
+      for key_index in range(key_index, number_of_keys + 1):
+        if key_index < len(index_page.sub_page_numbers):
+          mapped_page_number = index_page.sub_page_numbers[key_index]
+          if mapped_page_number is not None:
+            sub_index_page = self._GetIndexPageByMappedPageNumber(
+                mapped_page_number)
+            yield from self._GetKeysWithPrefixFromIndexPage(
+                sub_index_page, key_prefix)
+
+        if key_index == number_of_keys:
+          break
+
+        key = index_page.keys[key_index]
+        if not key.startswith(key_prefix):
+          break
+
+        yield key
+
   def _GetObjectsPageByMappedPageNumber(self, mapped_page_number, is_data_page):
     """Retrieves a specific objects page by mapped page number.
 
@@ -3588,7 +3936,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     Returns:
       IndexBinaryTreeFile: index binary tree file or None if not available.
     """
-    filename_as_glob, _ = self._FormatFilenameAsGlob('index.btr')
+    filename_as_glob = self._FormatFilenameAsGlob('index.btr')
     index_binary_tree_file_glob = self._file_system_helper.JoinPath([
         path, filename_as_glob])
 
@@ -3600,8 +3948,10 @@ class CIMRepository(data_format.BinaryDataFormat):
       self._DebugPrintText(f'Reading: {index_binary_tree_file_path[0]:s}\n')
 
     index_binary_tree_file = IndexBinaryTreeFile(
-        debug=self._debug, output_writer=self._output_writer)
-    index_binary_tree_file.Open(index_binary_tree_file_path[0])
+        debug=self._debug, output_writer=self._output_writer,
+        page_cache=self.page_cache)
+    index_binary_tree_file.Open(
+        index_binary_tree_file_path[0], memory_mapped=self._memory_mapped)
 
     return index_binary_tree_file
 
@@ -3615,7 +3965,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     Returns:
       MappingFile: mapping file or None if not available.
     """
-    filename_as_glob, _ = self._FormatFilenameAsGlob(filename)
+    filename_as_glob = self._FormatFilenameAsGlob(filename)
     mapping_file_glob = self._file_system_helper.JoinPath([
         path, filename_as_glob])
 
@@ -3641,7 +3991,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     Returns:
       file: file-like object or None if not available.
     """
-    filename_as_glob, _ = self._FormatFilenameAsGlob('mapping.ver')
+    filename_as_glob = self._FormatFilenameAsGlob('mapping.ver')
     mapping_version_file_glob = self._file_system_helper.JoinPath([
         path, filename_as_glob])
 
@@ -3660,7 +4010,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     Returns:
       ObjectsDataFile: objects data file or None if not available.
     """
-    filename_as_glob, _ = self._FormatFilenameAsGlob('objects.data')
+    filename_as_glob = self._FormatFilenameAsGlob('objects.data')
     objects_data_file_glob = self._file_system_helper.JoinPath([
         path, filename_as_glob])
 
@@ -3672,8 +4022,10 @@ class CIMRepository(data_format.BinaryDataFormat):
       self._DebugPrintText(f'Reading: {objects_data_file_path[0]:s}\n')
 
     objects_data_file = ObjectsDataFile(
-        debug=self._debug, output_writer=self._output_writer)
-    objects_data_file.Open(objects_data_file_path[0])
+        debug=self._debug, output_writer=self._output_writer,
+        page_cache=self.page_cache)
+    objects_data_file.Open(
+        objects_data_file_path[0], memory_mapped=self._memory_mapped)
 
     return objects_data_file
 
@@ -3686,7 +4038,7 @@ class CIMRepository(data_format.BinaryDataFormat):
     Returns:
       RepositoryFile: repository file or None if not available.
     """
-    filename_as_glob, _ = self._FormatFilenameAsGlob('cim.rep')
+    filename_as_glob = self._FormatFilenameAsGlob('cim.rep')
     repository_file_glob = self._file_system_helper.JoinPath([
         path, filename_as_glob])
 
@@ -3707,7 +4059,8 @@ class CIMRepository(data_format.BinaryDataFormat):
     """Reads class definition object records.
 
     Yields:
-      tuple[str, ObjectRecord]: name hash and class definition object record.
+      tuple[str, str, ObjectRecord]: namespace hash, name hash and class
+          definition object record.
     """
     index_page = self._GetIndexRootPage()
     for key in self._GetKeysFromIndexPage(index_page):
@@ -3719,36 +4072,170 @@ class CIMRepository(data_format.BinaryDataFormat):
       if data_type != 'CD':
         continue
 
+      namespace_hash = None
+      if key_segments[1].startswith('NS_'):
+        namespace_hash = key_segments[1][3:].lower()
+
       object_record = self._GetObjectRecord(
           data_type, mapped_page_number, record_identifier, data_size)
 
-      yield name_hash, object_record
+      yield namespace_hash, name_hash, object_record
+
+  def _ReadClassDefinitionFromObjectRecord(self, object_record):
+    """Reads a class definition from an object record.
+
+    Args:
+      object_record (ObjectRecord): class definition object record.
+
+    Returns:
+      ClassDefinition: class definition.
+
+    Raises:
+      ParseError: if the class definition cannot be read.
+    """
+    class_definition_reference = ClassDefinitionReference(
+        debug=self._debug, output_writer=self._output_writer)
+    class_definition_reference.ReadObjectRecord(object_record.data)
+
+    class_definition = ClassDefinition(
+        debug=self._debug, output_writer=self._output_writer)
+    class_definition.ReadClassDefinitionBlock(
+        class_definition_reference.data,
+        record_data_offset=class_definition_reference.offset)
+
+    return class_definition
 
   def _ReadClassDefinitionsFromObjectRecords(self):
     """Reads the class definitions from object records."""
-    for name_hash, object_record in self._ReadClassDefinitionObjectRecords():
-      class_definition_reference = ClassDefinitionReference(
-          debug=self._debug, output_writer=self._output_writer)
-      class_definition_reference.ReadObjectRecord(object_record.data)
+    for namespace_hash, name_hash, object_record in (
+        self._ReadClassDefinitionObjectRecords()):
+      class_definition = self._ReadClassDefinitionFromObjectRecord(
+          object_record)
 
-      class_definition = ClassDefinition(
-          debug=self._debug, output_writer=self._output_writer)
-      class_definition.ReadClassDefinitionBlock(
-          class_definition_reference.data,
-          record_data_offset=class_definition_reference.offset)
-
-      self._class_definitions_by_hash[name_hash] = class_definition
+      self._class_definitions_by_hash[(namespace_hash, name_hash)] = (
+          class_definition)
 
     if self._debug:
       self._DebugPrintText('Class definitions:\n')
       for class_definition in self._class_definitions_by_hash.values():
         class_definition.DebugPrint()
 
-  def _ReadInstance(self, instance_reference):
+  @staticmethod
+  def _DecodeInstancesInWorker(class_value_data_maps, instance_values):
+    """Decodes the instance block data of a batch of instances.
+
+    Args:
+      class_value_data_maps (dict[tuple[str, str], ClassValueDataMap]): class
+          value data maps per hash of the namespace and of the class name.
+      instance_values (list[tuple[tuple[str, str], bytes, int]]): hash of
+          the namespace and of the class name, instance block data and offset
+          of the instance block data, per instance.
+
+    Returns:
+      list[Instance]: instances.
+
+    Raises:
+      ParseError: if an instance cannot be read.
+    """
+    instances = []
+    for lookup_key, instance_data, record_data_offset in instance_values:
+      class_value_data_map = class_value_data_maps[lookup_key]
+
+      instance = Instance()
+      instance.ReadInstanceBlockData(
+          class_value_data_map, instance_data,
+          record_data_offset=record_data_offset)
+
+      # pylint: disable=attribute-defined-outside-init
+      instance.class_name = class_value_data_map.class_name
+      instance.derivation = class_value_data_map.derivation
+      instance.dynasty = class_value_data_map.dynasty
+      instance.super_class_name = class_value_data_map.super_class_name
+
+      instances.append(instance)
+
+    return instances
+
+  def _GetInstanceBatches(self):
+    """Retrieves batches of instances to decode.
+
+    The index is walked, and the object records are read, in the current
+    process, since they share the page cache and class definitions.
+
+    Yields:
+      tuple[dict[tuple[str, str], ClassValueDataMap],
+          list[tuple[tuple[str, str], bytes, int]]]: class value data maps
+          per hash of the namespace and of the class name, and hash of the
+          namespace and of the class name, instance block data and offset of
+          the instance block data, per instance.
+    """
+    class_value_data_maps = {}
+    instance_values = []
+
+    for namespace_hash, _, object_record in self._ReadInstanceObjectRecords():
+      instance_reference = InstanceReference(self.format_version)
+      instance_reference.ReadObjectRecord(object_record.data)
+
+      class_name_hash = instance_reference.class_name_hash
+      if not class_name_hash:
+        class_name_hash = self._GetHashFromString(
+            instance_reference.class_name)
+
+      # A class can have a different definition in every namespace.
+      lookup_key = (namespace_hash, class_name_hash.lower())
+      if lookup_key not in class_value_data_maps:
+        class_value_data_maps[lookup_key] = self._GetClassValueMapByHash(
+            class_name_hash, namespace_hash=namespace_hash)
+
+      instance_values.append((
+          lookup_key, instance_reference.data, instance_reference.offset))
+
+      if len(instance_values) >= self._INSTANCES_BATCH_SIZE:
+        yield class_value_data_maps, instance_values
+
+        class_value_data_maps = {}
+        instance_values = []
+
+    if instance_values:
+      yield class_value_data_maps, instance_values
+
+  def _GetInstancesInWorkers(self, number_of_workers):
+    """Retrieves instances decoded in worker processes.
+
+    Args:
+      number_of_workers (int): number of worker processes, where None
+          represents the number of CPUs.
+
+    Yields:
+      Instance: an instance, in order of the index.
+
+    Raises:
+      ParseError: if an instance cannot be read.
+    """
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=number_of_workers) as executor:
+      # The number of batches in flight is bounded to limit memory usage.
+      maximum_number_of_futures = 2 * executor._max_workers  # pylint: disable=protected-access
+
+      futures = collections.deque()
+      for class_value_data_maps, instance_values in self._GetInstanceBatches():
+        futures.append(executor.submit(
+            self._DecodeInstancesInWorker, class_value_data_maps,
+            instance_values))
+
+        if len(futures) >= maximum_number_of_futures:
+          yield from futures.popleft().result()
+
+      while futures:
+        yield from futures.popleft().result()
+
+  def _ReadInstance(self, instance_reference, namespace_hash=None):
     """Reads an instance.
 
     Args:
       instance_reference (InstanceReference): instance reference.
+      namespace_hash (Optional[str]): hash of the name of the namespace of
+          the instance.
 
     Returns:
       Instance: instance.
@@ -3757,7 +4244,8 @@ class CIMRepository(data_format.BinaryDataFormat):
     if not class_name_hash:
       class_name_hash = self._GetHashFromString(instance_reference.class_name)
 
-    class_value_data_map = self._GetClassValueMapByHash(class_name_hash)
+    class_value_data_map = self._GetClassValueMapByHash(
+        class_name_hash, namespace_hash=namespace_hash)
 
     instance = Instance(debug=self._debug, output_writer=self._output_writer)
 
@@ -3816,7 +4304,8 @@ class CIMRepository(data_format.BinaryDataFormat):
     """Reads instance object records.
 
     Yields:
-      tuple[str, ObjectRecord]: name hash and instance object record.
+      tuple[str, str, ObjectRecord]: namespace hash, name hash and instance
+          object record.
     """
     index_page = self._GetIndexRootPage()
     for key in self._GetKeysFromIndexPage(index_page):
@@ -3828,10 +4317,14 @@ class CIMRepository(data_format.BinaryDataFormat):
       if data_type not in ('I', 'IL'):
         continue
 
+      namespace_hash = None
+      if key_segments[1].startswith('NS_'):
+        namespace_hash = key_segments[1][3:].lower()
+
       object_record = self._GetObjectRecord(
           data_type, mapped_page_number, record_identifier, data_size)
 
-      yield name_hash, object_record
+      yield namespace_hash, name_hash, object_record
 
   def _ReadNamespacesFromObjectRecords(self):
     """Reads namespaces from object records."""
@@ -3909,6 +4402,7 @@ class CIMRepository(data_format.BinaryDataFormat):
 
   def Close(self):
     """Closes the CIM repository."""
+    self._class_definition_keys_by_hash = None
     self._class_definitions_by_hash = {}
     self._class_value_data_map_by_hash = {}
     self._namespace_instances = []
@@ -3917,6 +4411,8 @@ class CIMRepository(data_format.BinaryDataFormat):
     self._index_root_page = None
     self._objects_mapping_table = None
 
+    self.page_cache.Empty()
+
     if self._objects_data_file:
       self._objects_data_file.Close()
       self._objects_data_file = None
@@ -3925,24 +4421,35 @@ class CIMRepository(data_format.BinaryDataFormat):
       self._index_binary_tree_file.Close()
       self._index_binary_tree_file = None
 
-  def GetInstances(self):
+  def GetInstances(self, number_of_workers=1):
     """Retrieves instances.
 
+    Args:
+      number_of_workers (Optional[int]): number of worker processes to decode
+          the instances, where 1 represents decoding the instances in the
+          current process and None the number of CPUs. Worker processes are
+          not used in debug mode.
+
     Yields:
-      Instance: an instance.
+      Instance: an instance, in order of the index.
     """
     if self._repository_file:
       yield from self._repository_file.ReadInstances()
 
+    elif number_of_workers != 1 and not self._debug:
+      yield from self._GetInstancesInWorkers(number_of_workers)
+
     else:
-      for _, object_record in self._ReadInstanceObjectRecords():
+      for namespace_hash, _, object_record in (
+          self._ReadInstanceObjectRecords()):
         instance_reference = InstanceReference(
             self.format_version, debug=self._debug,
             output_writer=self._output_writer)
 
         instance_reference.ReadObjectRecord(object_record.data)
 
-        yield self._ReadInstance(instance_reference)
+        yield self._ReadInstance(
+            instance_reference, namespace_hash=namespace_hash)
 
   def GetNamespaces(self):
     """Retrieves namespaces.
@@ -3969,16 +4476,22 @@ class CIMRepository(data_format.BinaryDataFormat):
       index_page = self._GetIndexRootPage()
       yield from self._GetKeysFromIndexPage(index_page)
 
-  # TODO: remove after debugging.
   def GetObjectRecordByKey(self, key):
     """Retrieves a specific object record.
 
     Args:
-      key (str): a CIM key.
+      key (str): a CIM key, with or without the object record values of its
+          last key segment.
 
     Returns:
       ObjectRecord: an object record or None.
     """
+    _, _, key_segment = key.rpartition(self._KEY_SEGMENT_SEPARATOR)
+    if self._KEY_VALUE_SEPARATOR not in key_segment:
+      key = self.LookupKey(key)
+      if not key:
+        return None
+
     key_segments = key.split(self._KEY_SEGMENT_SEPARATOR)
 
     data_type, _, mapped_page_number, record_identifier, data_size = (
@@ -3987,12 +4500,69 @@ class CIMRepository(data_format.BinaryDataFormat):
     return self._GetObjectRecord(
         data_type, mapped_page_number, record_identifier, data_size)
 
-  def Open(self, path):
+  def IterateKeysWithPrefix(
+      self, namespace_hash, class_hash=None, class_key_type='CI'):
+    """Iterates the index keys of a namespace or class in the namespace.
+
+    Args:
+      namespace_hash (str): hash of the namespace name.
+      class_hash (Optional[str]): hash of the class name, where None represents
+          all keys of the namespace.
+      class_key_type (Optional[str]): type of the key segment of the class,
+          such as "CD" for the class definition, "CI" for the instances of
+          the class and "CR" for the references to the class.
+
+    Yields:
+      str: an index key path.
+    """
+    if self._index_binary_tree_file:
+      key_segments = ['', f'NS_{namespace_hash.upper():s}']
+      if class_hash:
+        key_segments.append(f'{class_key_type:s}_{class_hash.upper():s}')
+      else:
+        key_segments.append('')
+
+      key_prefix = self._KEY_SEGMENT_SEPARATOR.join(key_segments)
+
+      index_page = self._GetIndexRootPage()
+      yield from self._GetKeysWithPrefixFromIndexPage(index_page, key_prefix)
+
+  def LookupKey(self, key):
+    """Looks up a key in the index.
+
+    Args:
+      key (str): an index key path, with or without the object record values
+          of its last key segment, such as "\\NS_[hash]\\CD_[hash]".
+
+    Returns:
+      str: index key path, including the object record values, or None if
+          not available.
+    """
+    if not self._index_binary_tree_file:
+      return None
+
+    index_page = self._GetIndexRootPage()
+
+    # The key itself, or the key followed by its object record values, sorts
+    # before any key with additional key segments.
+    for index_key in self._GetKeysWithPrefixFromIndexPage(index_page, key):
+      if index_key == key or index_key[len(key)] == self._KEY_VALUE_SEPARATOR:
+        return index_key
+
+      break
+
+    return None
+
+  def Open(self, path, memory_mapped=False):
     """Opens the CIM repository.
 
     Args:
       path (str): path to the CIM repository or an individual file.
+      memory_mapped (Optional[bool]): True if the index binary tree and objects
+          data files should be memory mapped.
     """
+    self._memory_mapped = memory_mapped
+
     basename = os.path.basename(path).lower()
 
     if basename in ('index.map', 'mapping1.map', 'mapping2.map', 'mapping3.map',
@@ -4045,4 +4615,6 @@ class CIMRepository(data_format.BinaryDataFormat):
 
       self._objects_data_file = self._OpenObjectsDataFile(path)
 
-      self._ReadClassDefinitionsFromObjectRecords()
+      # Class definitions are otherwise read when first needed.
+      if self._debug or self._preload_class_definitions:
+        self._ReadClassDefinitionsFromObjectRecords()
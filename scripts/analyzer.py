@@ -48,9 +48,7 @@ class BinaryDataFormatAnalyzer(data_format.BinaryDataFormat):
         file_object, file_offset, data_type_map, name)
 
     if self._debug:
-      # pylint: disable=protected-access
-      data_type_definition = (
-          self._FABRIC._definitions_registry.GetDefinitionByName(name))
+      data_type_definition = self._FABRIC.GetDefinitionByName(name)
 
       self._DebugPrintDataTypeMap(name, data_type_definition, structure_object)
 
@@ -108,9 +106,7 @@ class BinaryDataFormatAnalyzer(data_format.BinaryDataFormat):
       lines.append(f'Entry: {element_number:d}\n')
 
       name = element.__class__.__name__
-      # pylint: disable=protected-access
-      data_type_definition = (
-          self._FABRIC._definitions_registry.GetDefinitionByName(name))
+      data_type_definition = self._FABRIC.GetDefinitionByName(name)
 
       text = self._FormatDataTypeMap(name, data_type_definition, element)
       lines.append(text)
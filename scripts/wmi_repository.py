@@ -90,6 +90,12 @@ def Main():
       '--output_mode', '--output-mode', dest='output_mode', action='store',
       default='instances', help='output mode.')
 
+  argument_parser.add_argument(
+      '--workers', dest='number_of_workers', action='store', type=int,
+      default=1, metavar='NUMBER', help=(
+          'number of worker processes to decode the instances, where 0 '
+          'represents the number of CPUs.'))
+
   argument_parser.add_argument(
       'source', nargs='?', action='store', metavar='PATH',
       default=None, help=(
@@ -131,7 +137,8 @@ def Main():
       print(key_path)
 
   elif options.output_mode == 'instances':
-    for instance in cim_repository.GetInstances():
+    for instance in cim_repository.GetInstances(
+        number_of_workers=options.number_of_workers or None):
       PrintInstance(instance)
 
   elif options.output_mode == 'namespaces':
@@ -1 +1,7 @@
 # -*- coding: utf-8 -*-
+
+import os
+
+# Disable the on-disk cache of compiled dtFabric definition files, so that
+# the tests do not write outside the source tree.
+os.environ.pop('DTFORMATS_CACHE_DIR', None)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Tests for the binary data format analyzer script."""
+
+import io
+import struct
+import unittest
+
+from scripts import analyzer
+
+from tests import test_lib
+
+
+class BinaryDataFormatAnalyzerTest(test_lib.BaseTestCase):
+  """Binary data format analyzer tests."""
+
+  def _CreateTestFileObject(self):
+    """Creates a file-like object with VHDX test data.
+
+    Returns:
+      io.BytesIO: file-like object.
+    """
+    data = bytearray(5 * 64 * 1024)
+
+    creator = 'dtformats'.encode('utf-16-le')
+    data[0:8 + len(creator)] = b'vhdxfile' + creator
+
+    for file_offset in (64 * 1024, 2 * 64 * 1024):
+      data[file_offset:file_offset + 8] = b'head' + struct.pack('<I', 0)
+
+    region_table_entry = b''.join([
+        bytes(range(16)), struct.pack('<QII', 0x100000, 0x10000, 1)])
+
+    for file_offset in (3 * 64 * 1024, 4 * 64 * 1024):
+      region_table_data = b''.join([
+          b'regi', struct.pack('<III', 0, 2, 0), region_table_entry,
+          region_table_entry])
+      data[file_offset:file_offset + len(region_table_data)] = (
+          region_table_data)
+
+    return io.BytesIO(bytes(data))
+
+  def testReadFileObjectWithDebug(self):
+    """Tests the ReadFileObject function with debug output."""
+    output_writer = test_lib.TestOutputWriter()
+    test_analyzer = analyzer.BinaryDataFormatAnalyzer(
+        debug=True, output_writer=output_writer)
+    test_analyzer.ReadDefinition('vhdx.yaml')
+
+    file_object = self._CreateTestFileObject()
+    test_analyzer.ReadFileObject(file_object)
+
+    output = ''.join(output_writer.output)
+    self.assertIn('Creator', output)
+    self.assertIn('Region data offset', output)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -48,6 +48,18 @@ members:
   type: sequence
   element_data_type: point3d
   number_of_elements: shape3d.number_of_points
+---
+name: char
+type: character
+attributes:
+  size: 1
+  units: bytes
+---
+name: cstring
+type: string
+encoding: ascii
+element_data_type: char
+elements_terminator: "\\x00"
 """
 
   _FABRIC = dtfabric_fabric.DataTypeFabric(yaml_definition=_DEFINITION)
@@ -286,6 +298,22 @@ class BinaryDataFormatTest(test_lib.BaseTestCase):
     with self.assertRaises(errors.ParseError):
       test_format._ReadData(file_object, 0, data_size, 'point3d')
 
+    # Test with read ahead.
+    file_object = io.BytesIO(
+        b'\x01\x00\x00\x00\x02\x00\x00\x00\x03\x00\x00\x00')
+
+    data = test_format._ReadData(
+        file_object, 0, 4, 'point3d', read_ahead_size=6)
+    self.assertEqual(len(data), 10)
+
+    data = test_format._ReadData(
+        file_object, 4, 4, 'point3d', read_ahead_size=16)
+    self.assertEqual(len(data), 8)
+
+    data = test_format._ReadData(
+        file_object, 4, 0, 'point3d', read_ahead_size=-1)
+    self.assertEqual(len(data), 8)
+
   def testReadStructureFromByteStream(self):
     """Tests the _ReadStructureFromByteStream function."""
     output_writer = test_lib.TestOutputWriter()
@@ -339,8 +367,57 @@ class BinaryDataFormatTest(test_lib.BaseTestCase):
     test_format._ReadStructureFromFileObject(
         file_object, 0, data_type_map, 'shape3d')
 
+    file_object = io.BytesIO(b''.join([b'A' * 4096, b'\x00', b'B' * 16]))
+
+    data_type_map = test_format._GetDataTypeMap('cstring')
+    string, data_size = test_format._ReadStructureFromFileObject(
+        file_object, 0, data_type_map, 'cstring')
+    self.assertEqual(string, 'A' * 4096)
+    self.assertEqual(data_size, 4097)
+    self.assertEqual(file_object.tell(), 4097)
+
+    # Test with missing elements terminator.
+    file_object = io.BytesIO(b'A' * 1024)
+
+    with self.assertRaises(errors.ParseError):
+      test_format._ReadStructureFromFileObject(
+          file_object, 0, data_type_map, 'cstring')
+
   # TODO: add tests for _ReadStructureObjectFromFileObject
-  # TODO: add tests for ReadDebugInformationFile
+
+  def testReadDebugInformationFile(self):
+    """Tests the ReadDebugInformationFile function."""
+    debug_information = data_format.BinaryDataFormat.ReadDebugInformationFile(
+        'aul_dsc.debug.yaml')
+    self.assertIsInstance(debug_information, data_format.LazyDebugInformation)
+
+    class TestDebugBinaryDataFormat(data_format.BinaryDataFormat):
+      """Binary data format with debug information for testing."""
+
+      _DEBUG_INFORMATION = debug_information
+
+    test_format = TestDebugBinaryDataFormat()
+    self.assertIsInstance(test_format._DEBUG_INFORMATION, dict)
+    self.assertIn('dsc_file_header', test_format._DEBUG_INFORMATION)
+
+    debug_information = data_format.BinaryDataFormat.ReadDebugInformationFile(
+        None)
+    self.assertEqual(debug_information.__get__(None), {})
+
+    # Debug information is not shared between different format callbacks.
+    class TestCallbacksBinaryDataFormat(data_format.BinaryDataFormat):
+      """Binary data format with other format callbacks for testing."""
+
+      _DEBUG_FORMAT_CALLBACKS = {
+          key: '_FormatIntegerAsDecimal'
+          for key in data_format.BinaryDataFormat._DEBUG_FORMAT_CALLBACKS}
+
+    other_debug_information = (
+        TestCallbacksBinaryDataFormat.ReadDebugInformationFile(
+            'aul_dsc.debug.yaml'))
+    self.assertNotEqual(
+        other_debug_information.__get__(None), test_format._DEBUG_INFORMATION)
+
   # TODO: add tests for ReadDefinitionFile
 
 
@@ -364,6 +441,9 @@ class BinaryDataFileTest(test_lib.BaseTestCase):
     with self.assertRaises(IOError):
       test_file.Close()
 
+    test_file.Open(test_file_path, memory_mapped=True)
+    test_file.Close()
+
 
 if __name__ == '__main__':
   unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Tests for the cache of compiled dtFabric definition files."""
+
+import os
+import tempfile
+import unittest
+
+from dtfabric.runtime import fabric as dtfabric_fabric
+
+from dtformats import fabric_cache
+
+from tests import test_lib
+
+
+class GetDefaultCachePathTest(test_lib.BaseTestCase):
+  """Tests for the GetDefaultCachePath function."""
+
+  def testGetDefaultCachePath(self):
+    """Tests the GetDefaultCachePath function."""
+    cache_path = os.environ.pop('DTFORMATS_CACHE_DIR', None)
+
+    try:
+      self.assertIsNone(fabric_cache.GetDefaultCachePath())
+
+      os.environ['DTFORMATS_CACHE_DIR'] = ''
+      self.assertIsNone(fabric_cache.GetDefaultCachePath())
+
+      os.environ['DTFORMATS_CACHE_DIR'] = '/tmp/dtformats'
+      self.assertEqual(fabric_cache.GetDefaultCachePath(), '/tmp/dtformats')
+
+    finally:
+      if cache_path is None:
+        os.environ.pop('DTFORMATS_CACHE_DIR', None)
+      else:
+        os.environ['DTFORMATS_CACHE_DIR'] = cache_path
+
+
+class DataTypeFabricCacheTest(test_lib.BaseTestCase):
+  """On-disk cache of compiled dtFabric definition files tests."""
+
+  _DEFINITION = b"""\
+name: uint32
+type: integer
+attributes:
+  format: unsigned
+  size: 4
+  units: bytes
+"""
+
+  def testGetFabric(self):
+    """Tests the GetFabric function."""
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache')
+      test_cache = fabric_cache.DataTypeFabricCache(cache_path)
+
+      fabric = test_cache.GetFabric(self._DEFINITION)
+      self.assertIsInstance(fabric, dtfabric_fabric.DataTypeFabric)
+      self.assertEqual(len(os.listdir(cache_path)), 1)
+
+      if os.name == 'posix':
+        stat_object = os.stat(cache_path)
+        self.assertEqual(stat_object.st_mode & 0o777, 0o700)
+
+      fabric = test_cache.GetFabric(self._DEFINITION)
+      self.assertIsInstance(fabric, dtfabric_fabric.DataTypeFabric)
+      self.assertEqual(len(os.listdir(cache_path)), 1)
+
+      data_type_map = fabric.CreateDataTypeMap('uint32')
+      self.assertEqual(data_type_map.MapByteStream(b'\x01\x00\x00\x00'), 1)
+
+      # Test with a corrupted cache file.
+      cache_file_path = os.path.join(cache_path, os.listdir(cache_path)[0])
+      with open(cache_file_path, 'wb') as file_object:
+        file_object.write(b'corrupted')
+
+      fabric = test_cache.GetFabric(self._DEFINITION)
+      self.assertIsInstance(fabric, dtfabric_fabric.DataTypeFabric)
+
+  def testGetFabricWithFileOfOtherUser(self):
+    """Tests the GetFabric function with a cache file of another user."""
+    if not hasattr(os, 'getuid') or os.getuid() != 0:
+      raise unittest.SkipTest('missing support to change file ownership')
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache')
+      test_cache = fabric_cache.DataTypeFabricCache(cache_path)
+
+      test_cache.GetFabric(self._DEFINITION)
+
+      # A cache file that is not owned by the current user is not unpickled.
+      cache_file_path = os.path.join(cache_path, os.listdir(cache_path)[0])
+      with open(cache_file_path, 'wb') as file_object:
+        file_object.write(b'corrupted')
+
+      os.chown(cache_file_path, 1, 1)
+
+      with open(cache_file_path, 'rb') as file_object:
+        self.assertFalse(test_cache._IsOwnedByCurrentUser(file_object))  # pylint: disable=protected-access
+
+      fabric = test_cache.GetFabric(self._DEFINITION)
+      self.assertIsInstance(fabric, dtfabric_fabric.DataTypeFabric)
+
+
+class LazyDataTypeFabricTest(test_lib.BaseTestCase):
+  """Lazy data type fabric tests."""
+
+  def testCreateDataTypeMap(self):
+    """Tests the CreateDataTypeMap function."""
+    test_file_path = os.path.join(
+        os.path.dirname(fabric_cache.__file__), 'aul_uuidtext.yaml')
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      fabric = fabric_cache.LazyDataTypeFabric(
+          test_file_path, cache_path=temporary_directory)
+      self.assertEqual(os.listdir(temporary_directory), [])
+
+      data_type_map = fabric.CreateDataTypeMap('uuidtext_file_header')
+      self.assertIsNotNone(data_type_map)
+
+      data_type_definition = fabric.GetDefinitionByName('uuidtext_file_header')
+      self.assertIsNotNone(data_type_definition)
+
+
+if __name__ == '__main__':
+  unittest.main()
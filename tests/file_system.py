@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Tests for the file system helper."""
 
+import os
 import pathlib
 import platform
 import unittest
@@ -10,6 +11,51 @@ from dtformats import file_system
 from tests import test_lib
 
 
+class MemoryMappedFileObjectTest(test_lib.BaseTestCase):
+  """Memory mapped file-like object tests."""
+
+  def testReadSeekTell(self):
+    """Tests the read, seek and tell functions."""
+    test_file_path = self._GetTestFilePath(['utmp-linux_libc6'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    with open(test_file_path, 'rb') as file_object:
+      expected_data = file_object.read()
+
+    file_object = file_system.MemoryMappedFileObject(
+        open(test_file_path, 'rb'))  # pylint: disable=consider-using-with
+
+    try:
+      self.assertEqual(file_object.get_size(), 5376)
+      self.assertEqual(file_object.tell(), 0)
+
+      data = file_object.read(16)
+      self.assertEqual(data, expected_data[:16])
+      self.assertEqual(file_object.tell(), 16)
+
+      file_object.seek(5370, os.SEEK_SET)
+      data = file_object.read(16)
+      self.assertEqual(data, expected_data[5370:])
+      self.assertEqual(file_object.tell(), 5376)
+
+      file_object.seek(-16, os.SEEK_END)
+      data = file_object.read()
+      self.assertEqual(data, expected_data[-16:])
+
+      file_object.seek(6000, os.SEEK_SET)
+      data = file_object.read(16)
+      self.assertEqual(data, b'')
+
+      with self.assertRaises(IOError):
+        file_object.seek(-1, os.SEEK_SET)
+
+    finally:
+      file_object.close()
+
+    with self.assertRaises(IOError):
+      file_object.read(16)
+
+
 class NativeFileSystemHelperTest(test_lib.BaseTestCase):
   """Python native system helper tests."""
 
@@ -99,6 +145,12 @@ class NativeFileSystemHelperTest(test_lib.BaseTestCase):
 
     file_object.close()
 
+    file_object = test_helper.OpenFileByPath(
+        test_file_path, memory_mapped=True)
+    self.assertIsInstance(file_object, file_system.MemoryMappedFileObject)
+
+    file_object.close()
+
   def testSplitPath(self):
     """Tests the SplitPath function."""
     test_file_path = self._GetTestFilePath(['utmp-linux_libc6'])
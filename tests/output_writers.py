@@ -8,6 +8,18 @@ from dtformats import output_writers
 from tests import test_lib
 
 
+class BufferedStdoutWriterTest(test_lib.BaseTestCase):
+  """Buffered stdout output writer tests."""
+
+  def testWriteText(self):
+    """Tests the WriteText and Close functions."""
+    test_writer = output_writers.BufferedStdoutWriter(buffer_size=8)
+
+    test_writer.Open()
+    test_writer.WriteText('')
+    test_writer.Close()
+
+
 class StdoutWriterTest(test_lib.BaseTestCase):
   """Stdout output writer tests."""
 
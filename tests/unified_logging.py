@@ -3,15 +3,310 @@
 
 import collections
 import io
+import os
+import pickle
+import shutil
+import struct
+import tempfile
 import unittest
 import uuid
 
 from dtformats import errors
+from dtformats import file_system
 from dtformats import unified_logging
 
 from tests import test_lib
 
 
+class RecordingTraceV3File(unified_logging.TraceV3File):
+  """Tracev3 file for testing that records the chunk sets it reads.
+
+  Attributes:
+    chunk_set_file_offsets (list[int]): offsets of the chunk headers of the
+        chunk sets that were read relative to the start of the file.
+  """
+
+  def __init__(self):
+    """Initializes a tracev3 file for testing."""
+    super(RecordingTraceV3File, self).__init__()
+    self.chunk_set_file_offsets = []
+
+  def _ReadChunkSet(self, file_object, file_offset, *args, **kwargs):
+    """Reads a chunk set and records its offset."""
+    self.chunk_set_file_offsets.append(file_offset - 16)
+    return super(RecordingTraceV3File, self)._ReadChunkSet(
+        file_object, file_offset, *args, **kwargs)
+
+
+class ImageValuesTest(test_lib.BaseTestCase):
+  """Image values tests."""
+
+  def testGetStringFormatter(self):
+    """Tests the GetStringFormatter function."""
+    image_values1 = unified_logging.ImageValues(string='%d bytes')
+    image_values2 = unified_logging.ImageValues(string='%d bytes')
+
+    string_formatter1 = image_values1.GetStringFormatter()
+    self.assertIsNotNone(string_formatter1)
+
+    string_formatter2 = image_values2.GetStringFormatter()
+    self.assertIs(string_formatter2, string_formatter1)
+
+    self.assertEqual(string_formatter1.FormatString(['5']), '5 bytes')
+
+
+class ImageValuesCacheTest(test_lib.BaseTestCase):
+  """Persistent cache of image values and image paths tests."""
+
+  def testGetAndSetImageValues(self):
+    """Tests the GetImageValues and SetImageValues functions."""
+    identifier = uuid.UUID('8e21cab1-dcf9-36b4-9f85-cf860e6f34ec')
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache.db')
+
+      test_cache = unified_logging.ImageValuesCache()
+      test_cache.Open(cache_path)
+
+      try:
+        image_values = test_cache.GetImageValues('8E21CAB1', 0x10, False)
+        self.assertIsNone(image_values)
+
+        image_values = unified_logging.ImageValues(
+            identifier=identifier, path='/usr/lib/libtest.dylib',
+            string='%d bytes', text_offset=0x1000)
+        test_cache.SetImageValues('8E21CAB1', 0x10, False, image_values)
+
+        test_cache.SetImagePath('7EF56328', '/usr/bin/test')
+
+      finally:
+        test_cache.Close()
+
+      test_cache = unified_logging.ImageValuesCache()
+      test_cache.Open(cache_path)
+
+      try:
+        image_values = test_cache.GetImageValues('8E21CAB1', 0x10, False)
+        self.assertIsNotNone(image_values)
+        self.assertEqual(image_values.identifier, identifier)
+        self.assertEqual(image_values.path, '/usr/lib/libtest.dylib')
+        self.assertEqual(image_values.string, '%d bytes')
+        self.assertEqual(image_values.text_offset, 0x1000)
+
+        image_values = test_cache.GetImageValues('8E21CAB1', 0x10, True)
+        self.assertIsNone(image_values)
+
+        image_path = test_cache.GetImagePath('7EF56328')
+        self.assertEqual(image_path, '/usr/bin/test')
+
+        image_path = test_cache.GetImagePath('8E21CAB1')
+        self.assertIsNone(image_path)
+
+      finally:
+        test_cache.Close()
+
+  def testGetImageValuesQueriedOnce(self):
+    """Tests that the database is queried and written once per key."""
+    queries = []
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache.db')
+
+      test_cache = unified_logging.ImageValuesCache()
+      test_cache.Open(cache_path)
+
+      try:
+        def _TraceQuery(query):
+          if query.startswith(('INSERT', 'SELECT')):
+            queries.append(query)
+
+        test_cache._connection.set_trace_callback(_TraceQuery)
+
+        for _ in range(3):
+          image_values = test_cache.GetImageValues('8E21CAB1', 0x10, False)
+          self.assertIsNone(image_values)
+
+          image_path = test_cache.GetImagePath('7EF56328')
+          self.assertIsNone(image_path)
+
+        self.assertEqual(len(queries), 2)
+
+        image_values = unified_logging.ImageValues(
+            path='/usr/lib/libtest.dylib', string='%d bytes')
+
+        for _ in range(3):
+          test_cache.SetImageValues('8E21CAB1', 0x10, False, image_values)
+          test_cache.SetImagePath('7EF56328', '/usr/bin/test')
+
+        # The image values are copied when they are cached.
+        image_values.string = '%s'
+
+        image_values = test_cache.GetImageValues('8E21CAB1', 0x10, False)
+        self.assertEqual(image_values.string, '%d bytes')
+
+        image_path = test_cache.GetImagePath('7EF56328')
+        self.assertEqual(image_path, '/usr/bin/test')
+
+        self.assertEqual(len(queries), 4)
+
+      finally:
+        test_cache.Close()
+
+
+class LogEntryTest(test_lib.BaseTestCase):
+  """Log entry tests."""
+
+  def testDeferredEventMessage(self):
+    """Tests the deferred event message."""
+    format_calls = []
+
+    def _FormatEventMessage(value):
+      format_calls.append(value)
+      return f'value: {value:d}'
+
+    log_entry = unified_logging.LogEntry()
+    log_entry.SetDeferredEventMessage(_FormatEventMessage, (1, ))
+    self.assertEqual(format_calls, [])
+
+    self.assertEqual(log_entry.event_message, 'value: 1')
+    self.assertEqual(log_entry.event_message, 'value: 1')
+    self.assertEqual(format_calls, [1])
+
+    log_entry.SetDeferredEventMessage(_FormatEventMessage, (2, ))
+    log_entry.MaterializeEventMessage()
+    self.assertEqual(format_calls, [1, 2])
+
+    log_entry.SetDeferredEventMessage(_FormatEventMessage, (3, ))
+    log_entry.event_message = 'message'
+    self.assertEqual(log_entry.event_message, 'message')
+    self.assertEqual(format_calls, [1, 2])
+
+    log_entry.SetDeferredEventMessage('value: {0:d}'.format, (4, ))
+    log_entry = pickle.loads(pickle.dumps(log_entry))
+    self.assertIsNotNone(log_entry._deferred_event_message)  # pylint: disable=protected-access
+    self.assertEqual(log_entry.event_message, 'value: 4')
+
+  def testPickle(self):
+    """Tests pickling a log entry."""
+    log_entry = unified_logging.LogEntry()
+    log_entry.process_identifier = 51
+    log_entry.sub_system = 'com.apple.UIKit'
+    log_entry.timestamp = 1000
+
+    self.assertFalse(hasattr(log_entry, '__dict__'))
+
+    log_entry = pickle.loads(pickle.dumps(log_entry))
+    self.assertEqual(log_entry.process_identifier, 51)
+    self.assertEqual(log_entry.sub_system, 'com.apple.UIKit')
+    self.assertEqual(log_entry.timestamp, 1000)
+    self.assertIsNone(log_entry.category)
+
+
+class LogEntryBatchTest(test_lib.BaseTestCase):
+  """Batch of log entries stored as columns tests."""
+
+  def testAppendLogEntry(self):
+    """Tests the AppendLogEntry function."""
+    log_entry_batch = unified_logging.LogEntryBatch()
+    self.assertEqual(len(log_entry_batch), 0)
+
+    log_entry = unified_logging.LogEntry()
+    log_entry.event_message = 'message'
+    log_entry.event_type = 'logEvent'
+    log_entry.process_identifier = 51
+    log_entry.sub_system = ''.join(['com.apple.', 'UIKit'])
+    log_entry.thread_identifier = 1234
+    log_entry.timestamp = 1000
+
+    log_entry_batch.AppendLogEntry(log_entry)
+
+    log_entry = unified_logging.LogEntry()
+    log_entry.event_type = 'timesyncEvent'
+    log_entry.sub_system = ''.join(['com.apple.', 'UIKit'])
+    log_entry.timestamp = 2000
+
+    log_entry_batch.AppendLogEntry(log_entry)
+
+    self.assertEqual(len(log_entry_batch), 2)
+    self.assertEqual(log_entry_batch.categories, [None, None])
+    self.assertEqual(log_entry_batch.event_messages, ['message', None])
+    self.assertEqual(log_entry_batch.event_types, ['logEvent', 'timesyncEvent'])
+    self.assertEqual(list(log_entry_batch.process_identifiers), [51, 0])
+    self.assertEqual(list(log_entry_batch.thread_identifiers), [1234, 0])
+    self.assertEqual(list(log_entry_batch.timestamps), [1000, 2000])
+
+    self.assertIs(log_entry_batch.sub_systems[0], log_entry_batch.sub_systems[1])
+
+
+class LogEntryFilterTest(test_lib.BaseTestCase):
+  """Log entry filter tests."""
+
+  def testMatches(self):
+    """Tests the Matches function."""
+    log_entry = unified_logging.LogEntry()
+    log_entry.event_type = 'logEvent'
+    log_entry.process_identifier = 51
+    log_entry.sub_system = 'com.apple.UIKit'
+    log_entry.timestamp = 1000
+
+    log_entry_filter = unified_logging.LogEntryFilter()
+    self.assertTrue(log_entry_filter.Matches(log_entry))
+
+    log_entry_filter = unified_logging.LogEntryFilter(
+        end_timestamp=2000, event_types=['logEvent'], process_identifiers=[51],
+        start_timestamp=1000, sub_systems=['com.apple.UIKit'])
+    self.assertTrue(log_entry_filter.Matches(log_entry))
+
+    log_entry_filter = unified_logging.LogEntryFilter(event_types=['lossEvent'])
+    self.assertFalse(log_entry_filter.Matches(log_entry))
+
+    log_entry_filter = unified_logging.LogEntryFilter(process_identifiers=[1])
+    self.assertFalse(log_entry_filter.Matches(log_entry))
+
+    log_entry_filter = unified_logging.LogEntryFilter(sub_systems=[])
+    self.assertFalse(log_entry_filter.Matches(log_entry))
+
+    log_entry_filter = unified_logging.LogEntryFilter(end_timestamp=1000)
+    self.assertFalse(log_entry_filter.Matches(log_entry))
+
+  def testCopyWithTimeRange(self):
+    """Tests the CopyWithTimeRange function."""
+    log_entry_filter = unified_logging.LogEntryFilter(
+        end_timestamp=2000, process_identifiers=[51], start_timestamp=1000)
+
+    copied_filter = log_entry_filter.CopyWithTimeRange(
+        end_timestamp=3000, start_timestamp=1500)
+    self.assertEqual(copied_filter.end_timestamp, 2000)
+    self.assertEqual(copied_filter.process_identifiers, frozenset([51]))
+    self.assertEqual(copied_filter.start_timestamp, 1500)
+
+    copied_filter = log_entry_filter.CopyWithTimeRange(end_timestamp=1800)
+    self.assertEqual(copied_filter.end_timestamp, 1800)
+    self.assertEqual(copied_filter.start_timestamp, 1000)
+
+    # The time range of the original filter is not changed.
+    self.assertEqual(log_entry_filter.end_timestamp, 2000)
+    self.assertEqual(log_entry_filter.start_timestamp, 1000)
+
+    log_entry_filter = unified_logging.LogEntryFilter()
+
+    copied_filter = log_entry_filter.CopyWithTimeRange(start_timestamp=1500)
+    self.assertIsNone(copied_filter.end_timestamp)
+    self.assertIsNone(copied_filter.process_identifiers)
+    self.assertEqual(copied_filter.start_timestamp, 1500)
+
+  def testMatchesTimeRange(self):
+    """Tests the MatchesTimeRange function."""
+    log_entry_filter = unified_logging.LogEntryFilter(
+        end_timestamp=2000, start_timestamp=1000)
+
+    self.assertTrue(log_entry_filter.MatchesTimeRange(500, 1000))
+    self.assertTrue(log_entry_filter.MatchesTimeRange(1500, 2500))
+    self.assertTrue(log_entry_filter.MatchesTimeRange(500, 2500))
+    self.assertFalse(log_entry_filter.MatchesTimeRange(500, 999))
+    self.assertFalse(log_entry_filter.MatchesTimeRange(2000, 2500))
+
+
 class FormatStringOperatorTest(test_lib.BaseTestCase):
   """Format string operator tests."""
 
@@ -234,6 +529,33 @@ class StringFormatterTest(test_lib.BaseTestCase):
 
   # pylint: disable=protected-access
 
+  def testGetValueFormatters(self):
+    """Tests the GetValueFormatters function."""
+    format_string_decoders = {
+        'internal:u': unified_logging.UnsignedIntegerFormatStringDecoder()}
+
+    test_formatter = unified_logging.StringFormatter()
+    test_formatter.ParseFormatString('%#x %{bogus}d %{private}s')
+
+    value_formatters = test_formatter.GetValueFormatters(
+        format_string_decoders)
+    self.assertEqual(len(value_formatters), 3)
+    self.assertEqual(value_formatters[0](b'\x10\x00\x00\x00'), '0x10')
+    self.assertEqual(
+        value_formatters[1](b''), '<decode: unsupported decoder: bogus>')
+    self.assertEqual(
+        value_formatters[2](b''),
+        '<decode: unsupported decoder: internal:s>')
+
+    cached_value_formatters = test_formatter.GetValueFormatters(
+        format_string_decoders)
+    self.assertIs(cached_value_formatters, value_formatters)
+
+    test_formatter.ParseFormatString('text')
+    value_formatters = test_formatter.GetValueFormatters(
+        format_string_decoders)
+    self.assertEqual(value_formatters, [])
+
   def testParseFormatString(self):
     """Tests the ParseFormatString function."""
     test_formatter = unified_logging.StringFormatter()
@@ -1216,7 +1538,36 @@ class DSCFileTest(test_lib.BaseTestCase):
         '/System/Library/Extensions/AppleD2207PMU.kext/AppleD2207PMU')
     self.assertEqual(uuids[197].image_path, expected_path)
 
-  # TODO: add test for GetImageValues
+  def testGetImageValues(self):
+    """Tests the GetImageValues function."""
+    output_writer = test_lib.TestOutputWriter()
+    test_file = unified_logging.DSCFile(output_writer=output_writer)
+
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', 'uuidtext', 'dsc', 'dsc-version1'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    test_file.Open(test_file_path)
+
+    try:
+      expected_path = (
+          '/System/Library/Extensions/IOImageLoader.kext/IOImageLoader')
+
+      image_values = test_file.GetImageValues(121196, False)
+      self.assertIsNotNone(image_values)
+      self.assertEqual(image_values.path, expected_path)
+      self.assertEqual(image_values.string, 'ageLoaderRequest')
+
+      image_values = test_file.GetImageValues(5881860, True)
+      self.assertIsNotNone(image_values)
+      self.assertEqual(image_values.path, expected_path)
+      self.assertEqual(image_values.string, '%s')
+
+      image_values = test_file.GetImageValues(0xffffffffff, False)
+      self.assertIsNone(image_values)
+
+    finally:
+      test_file.Close()
 
   def testReadFileObject(self):
     """Tests the ReadFileObject function."""
@@ -1234,6 +1585,320 @@ class DSCFileTest(test_lib.BaseTestCase):
     test_file.Close()
 
 
+class LogEntriesSorterTest(test_lib.BaseTestCase):
+  """Log entries sorter tests."""
+
+  def _CreateLogEntries(self, timestamps):
+    """Creates log entries.
+
+    Args:
+      timestamps (list[int]): timestamps of the log entries.
+
+    Returns:
+      list[LogEntry]: log entries, where the thread identifier contains the
+          index of the log entry.
+    """
+    log_entries = []
+    for index, timestamp in enumerate(timestamps):
+      log_entry = unified_logging.LogEntry()
+      log_entry.event_message = f'message {index:d}'
+      log_entry.thread_identifier = index
+      log_entry.timestamp = timestamp
+
+      log_entries.append(log_entry)
+
+    return log_entries
+
+  def testSortLogEntries(self):
+    """Tests the SortLogEntries function."""
+    timestamps = [5, 3, 9, 3, 1, 7, 3, 2]
+    expected_thread_identifiers = [4, 7, 1, 3, 6, 0, 5, 2]
+
+    for maximum_run_size in (None, 1, 3):
+      log_entries_sorter = unified_logging.LogEntriesSorter(
+          maximum_run_size=maximum_run_size)
+
+      log_entries = list(log_entries_sorter.SortLogEntries(
+          self._CreateLogEntries(timestamps)))
+
+      self.assertEqual(
+          [log_entry.timestamp for log_entry in log_entries], sorted(timestamps))
+      self.assertEqual(
+          [log_entry.thread_identifier for log_entry in log_entries],
+          expected_thread_identifiers)
+      self.assertEqual(log_entries[0].event_message, 'message 4')
+
+    log_entries_sorter = unified_logging.LogEntriesSorter()
+    log_entries = list(log_entries_sorter.SortLogEntries([]))
+    self.assertEqual(log_entries, [])
+
+
+class LogArchiveTest(test_lib.BaseTestCase):
+  """Tests for the log archive."""
+
+  def testReadLogEntries(self):
+    """Tests the ReadLogEntries function."""
+    test_file_path1 = self._GetTestFilePath([
+        'unified_logging', '0000000000000030.tracev3'])
+    self._SkipIfPathNotExists(test_file_path1)
+
+    test_file_path2 = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path2)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.logarchive')
+      os.makedirs(os.path.join(test_path, 'Persist'))
+      os.makedirs(os.path.join(test_path, 'Special'))
+
+      shutil.copy(test_file_path1, os.path.join(
+          test_path, 'logdata.LiveData.tracev3'))
+      shutil.copy(test_file_path2, os.path.join(
+          test_path, 'Persist', '0000000000000f85.tracev3'))
+
+      log_archive = unified_logging.LogArchive()
+      log_archive.Open(test_path)
+
+      try:
+        tracev3_file_paths = log_archive.GetTraceV3FilePaths()
+        self.assertEqual(len(tracev3_file_paths), 2)
+
+        timestamps = [
+            log_entry.timestamp for log_entry in log_archive.ReadLogEntries()]
+
+        worker_timestamps = [
+            log_entry.timestamp for log_entry in log_archive.ReadLogEntries(
+                number_of_workers=2)]
+
+      finally:
+        log_archive.Close()
+
+    self.assertEqual(len(timestamps), 8659)
+    self.assertEqual(timestamps, sorted(timestamps))
+    self.assertEqual(worker_timestamps, timestamps)
+
+  def testReadLogEntriesWithFilter(self):
+    """Tests the ReadLogEntries function with a log entry filter."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    log_entry_filter = unified_logging.LogEntryFilter(
+        process_identifiers=[92560])
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.logarchive')
+      os.makedirs(test_path)
+
+      shutil.copy(test_file_path, os.path.join(
+          test_path, '0000000000000f85.tracev3'))
+
+      log_archive = unified_logging.LogArchive()
+      log_archive.Open(test_path)
+
+      try:
+        process_identifiers = [
+            log_entry.process_identifier
+            for log_entry in log_archive.ReadLogEntries(
+                log_entry_filter=log_entry_filter)]
+
+      finally:
+        log_archive.Close()
+
+    self.assertEqual(len(process_identifiers), 1543)
+    self.assertEqual(set(process_identifiers), set([92560]))
+
+  def testReadLogEntryBatches(self):
+    """Tests the ReadLogEntryBatches function."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.logarchive')
+      os.makedirs(test_path)
+
+      shutil.copy(test_file_path, os.path.join(
+          test_path, '0000000000000f85.tracev3'))
+
+      log_archive = unified_logging.LogArchive()
+      log_archive.Open(test_path)
+
+      try:
+        timestamps = [
+            log_entry.timestamp for log_entry in log_archive.ReadLogEntries()]
+
+        log_entry_batches = list(log_archive.ReadLogEntryBatches(
+            batch_size=1000))
+
+      finally:
+        log_archive.Close()
+
+    self.assertEqual(len(log_entry_batches), 9)
+    self.assertEqual(len(log_entry_batches[0]), 1000)
+
+    batch_timestamps = []
+    for log_entry_batch in log_entry_batches:
+      batch_timestamps.extend(log_entry_batch.timestamps)
+
+    self.assertEqual(batch_timestamps, timestamps)
+
+
+class OversizeChunkStoreTest(test_lib.BaseTestCase):
+  """Memory-bounded store of oversize chunk data tests."""
+
+  def testGetAndSetChunkData(self):
+    """Tests the GetChunkData and SetChunkData functions."""
+    oversize_chunk_store = unified_logging.OversizeChunkStore(
+        maximum_memory_size=16)
+
+    try:
+      oversize_chunk_store.SetChunkData('1@2:0001', b'\x01' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x02' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 0)
+
+      # Reading the first chunk data makes the second the least recently used.
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+
+      oversize_chunk_store.SetChunkData('1@2:0003', b'\x03' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 1)
+
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0002')
+      self.assertEqual(chunk_data, b'\x02' * 8)
+
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0003')
+      self.assertEqual(chunk_data, b'\x03' * 8)
+
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x04' * 4)
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0002')
+      self.assertEqual(chunk_data, b'\x04' * 4)
+
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0004')
+      self.assertIsNone(chunk_data)
+
+      self.assertEqual(oversize_chunk_store.number_of_hits, 4)
+      self.assertEqual(oversize_chunk_store.number_of_misses, 1)
+
+    finally:
+      oversize_chunk_store.Close()
+
+  def testGetChunk(self):
+    """Tests the GetChunk function."""
+    oversize_chunk_store = unified_logging.OversizeChunkStore(
+        maximum_memory_size=16)
+
+    try:
+      oversize_chunk = object()
+      oversize_chunk_store.SetChunkData(
+          '1@2:0001', b'\x01' * 8, oversize_chunk=oversize_chunk)
+
+      chunk_data, stored_oversize_chunk = oversize_chunk_store.GetChunk(
+          '1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+      self.assertIs(stored_oversize_chunk, oversize_chunk)
+
+      # The parsed oversize chunk is not written to the spill file.
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x02' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0003', b'\x03' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 1)
+
+      chunk_data, stored_oversize_chunk = oversize_chunk_store.GetChunk(
+          '1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+      self.assertIsNone(stored_oversize_chunk)
+
+      chunk_data, stored_oversize_chunk = oversize_chunk_store.GetChunk(
+          '1@2:0004')
+      self.assertIsNone(chunk_data)
+      self.assertIsNone(stored_oversize_chunk)
+
+    finally:
+      oversize_chunk_store.Close()
+
+  def testGetChunkReadBack(self):
+    """Tests the GetChunk function with chunk data read back."""
+    oversize_chunk_store = unified_logging.OversizeChunkStore(
+        maximum_memory_size=16)
+
+    try:
+      oversize_chunk_store.SetChunkData('1@2:0001', b'\x01' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x02' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0003', b'\x03' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 1)
+
+      # The chunk data read back is kept in memory with its parsed chunk.
+      chunk_data, stored_oversize_chunk = oversize_chunk_store.GetChunk(
+          '1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+      self.assertIsNone(stored_oversize_chunk)
+
+      oversize_chunk = object()
+      oversize_chunk_store.SetParsedChunk('1@2:0001', oversize_chunk)
+
+      chunk_data, stored_oversize_chunk = oversize_chunk_store.GetChunk(
+          '1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+      self.assertIs(stored_oversize_chunk, oversize_chunk)
+
+      # Reading the chunk data back spilled the least recently used chunk
+      # data.
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 2)
+
+      oversize_chunk_store.SetChunkData('1@2:0004', b'\x04' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 3)
+      self.assertEqual(oversize_chunk_store._spill_file_size, 24)
+
+      # Chunk data that was read back is not written again.
+      oversize_chunk_store.SetChunkData('1@2:0005', b'\x05' * 8)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 3)
+      self.assertEqual(oversize_chunk_store._spill_file_size, 24)
+
+      chunk_data = oversize_chunk_store.GetChunkData('1@2:0001')
+      self.assertEqual(chunk_data, b'\x01' * 8)
+
+    finally:
+      oversize_chunk_store.Close()
+
+  def testSetChunkDataReusesSpillRanges(self):
+    """Tests that SetChunkData reuses freed ranges of the spill file."""
+    oversize_chunk_store = unified_logging.OversizeChunkStore(
+        maximum_memory_size=8)
+
+    try:
+      oversize_chunk_store.SetChunkData('1@2:0001', b'\x01' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x02' * 8)
+      oversize_chunk_store.SetChunkData('1@2:0003', b'\x03' * 4)
+      oversize_chunk_store.SetChunkData('1@2:0004', b'\x04' * 4)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 2)
+      self.assertEqual(oversize_chunk_store._spill_file_size, 16)
+
+      # Replacing spilled chunk data frees its range, which is reused by the
+      # chunk data that is spilled next.
+      oversize_chunk_store.SetChunkData('1@2:0001', b'\x05' * 4)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 3)
+      self.assertEqual(oversize_chunk_store._free_spill_ranges, [(4, 4)])
+      self.assertEqual(oversize_chunk_store._spill_file_size, 16)
+
+      # Freed ranges are merged and truncated at the end of the spill file.
+      oversize_chunk_store.SetChunkData('1@2:0002', b'\x06' * 4)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 4)
+      self.assertEqual(oversize_chunk_store._free_spill_ranges, [])
+      self.assertEqual(oversize_chunk_store._spill_file_size, 8)
+
+      expected_chunk_data = {
+          '1@2:0001': b'\x05' * 4,
+          '1@2:0002': b'\x06' * 4,
+          '1@2:0003': b'\x03' * 4,
+          '1@2:0004': b'\x04' * 4}
+      for lookup_key, expected_data in expected_chunk_data.items():
+        chunk_data = oversize_chunk_store.GetChunkData(lookup_key)
+        self.assertEqual(chunk_data, expected_data)
+
+    finally:
+      oversize_chunk_store.Close()
+
+
 class TimesyncDatabaseFileTest(test_lib.BaseTestCase):
   """Tests for the timesync database file."""
 
@@ -1285,6 +1950,93 @@ class TimesyncDatabaseFileTest(test_lib.BaseTestCase):
     test_file.Close()
 
 
+class TimesyncIndexTest(test_lib.BaseTestCase):
+  """Tests for the timesync index."""
+
+  def testGetRecords(self):
+    """Tests the GetRecords function."""
+    test_path = self._GetTestFilePath(['unified_logging', 'timesync'])
+    self._SkipIfPathNotExists(test_path)
+
+    file_system_helper = file_system.NativeFileSystemHelper()
+    timesync_index = unified_logging.TimesyncIndex(
+        file_system_helper, test_path)
+
+    boot_identifier = uuid.UUID('3a291558-1b0e-41e1-b6de-da4bbf062610')
+    boot_record, sync_records = timesync_index.GetRecords(boot_identifier)
+    self.assertIsNotNone(boot_record)
+    self.assertEqual(boot_record.boot_identifier, boot_identifier)
+    self.assertEqual(len(sync_records), 456)
+
+    boot_identifier = uuid.UUID('00000000-0000-0000-0000-000000000000')
+    boot_record, sync_records = timesync_index.GetRecords(boot_identifier)
+    self.assertIsNone(boot_record)
+    self.assertEqual(sync_records, [])
+
+
+class TraceV3ChunkSetIndexTest(test_lib.BaseTestCase):
+  """Index of the chunk sets of a tracev3 file tests."""
+
+  def testWriteToAndReadFromFile(self):
+    """Tests the WriteToFile and ReadFromFile functions."""
+    chunk_set_index = unified_logging.TraceV3ChunkSetIndex()
+    chunk_set_index.boot_identifier = uuid.UUID(
+        '3a291558-1b0e-41e1-b6de-da4bbf062610')
+    chunk_set_index.file_size = 65536
+
+    entry = unified_logging.TraceV3ChunkSetIndexEntry()
+    entry.catalog_file_offset = 1232
+    entry.chunk_set_file_offset = 4096
+    entry.end_time = 200
+    entry.has_oversize_chunks = True
+    entry.process_identifiers = frozenset([0, 1, 74])
+    entry.start_time = 100
+    chunk_set_index.entries.append(entry)
+
+    entry = unified_logging.TraceV3ChunkSetIndexEntry()
+    entry.chunk_set_file_offset = 8192
+    entry.end_time = 300
+    entry.start_time = 200
+    chunk_set_index.entries.append(entry)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.tv3idx')
+      chunk_set_index.WriteToFile(test_path)
+
+      chunk_set_index = unified_logging.TraceV3ChunkSetIndex()
+      chunk_set_index.ReadFromFile(test_path)
+
+    self.assertEqual(chunk_set_index.boot_identifier, uuid.UUID(
+        '3a291558-1b0e-41e1-b6de-da4bbf062610'))
+    self.assertEqual(chunk_set_index.file_size, 65536)
+    self.assertEqual(len(chunk_set_index.entries), 2)
+
+    entry = chunk_set_index.entries[0]
+    self.assertEqual(entry.catalog_file_offset, 1232)
+    self.assertEqual(entry.chunk_set_file_offset, 4096)
+    self.assertEqual(entry.end_time, 200)
+    self.assertTrue(entry.has_oversize_chunks)
+    self.assertEqual(entry.process_identifiers, frozenset([0, 1, 74]))
+    self.assertEqual(entry.start_time, 100)
+
+    entry = chunk_set_index.entries[1]
+    self.assertIsNone(entry.catalog_file_offset)
+    self.assertFalse(entry.has_oversize_chunks)
+    self.assertEqual(entry.process_identifiers, frozenset())
+
+  def testReadFromFileUnsupported(self):
+    """Tests the ReadFromFile function with an unsupported file."""
+    chunk_set_index = unified_logging.TraceV3ChunkSetIndex()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.tv3idx')
+      with open(test_path, 'wb') as file_object:
+        file_object.write(b'unsupported')
+
+      with self.assertRaises(errors.ParseError):
+        chunk_set_index.ReadFromFile(test_path)
+
+
 class TraceV3FileTest(test_lib.BaseTestCase):
   """Apple Unified Logging and Activity Tracing (tracev3) file tests."""
 
@@ -1607,9 +2359,98 @@ class TraceV3FileTest(test_lib.BaseTestCase):
         tracepoint_data_object, 0)
     self.assertEqual(program_counter, 0x8008ecf707e9)
 
+  def testCalculateTimestampRange(self):
+    """Tests the _CalculateTimestampRange function."""
+    output_writer = test_lib.TestOutputWriter()
+    test_file = unified_logging.TraceV3File(output_writer=output_writer)
+
+    # The wall clock is adjusted backwards at kernel time 200.
+    test_file._timesync_kernel_times = [100, 200, 300]
+    test_file._timesync_timestamps = [1000, 1050, 3000]
+
+    timestamp_range = test_file._CalculateTimestampRange(120, 150)
+    self.assertEqual(timestamp_range, (1020, 1050))
+
+    timestamp_range = test_file._CalculateTimestampRange(150, 220)
+    self.assertEqual(timestamp_range, (1050, 1099))
+
+    timestamp_range = test_file._CalculateTimestampRange(150, 350)
+    self.assertEqual(timestamp_range, (1050, 3050))
+
   # TODO: add tests for _FormatArrayOfStrings
   # TODO: add tests for _FormatArrayOfUUIDS
 
+  def testGetDSCImageValues(self):
+    """Tests the _GetDSCImageValues function."""
+    test_path = self._GetTestFilePath(['unified_logging', 'uuidtext'])
+    self._SkipIfPathNotExists(test_path)
+
+    expected_path = (
+        '/System/Library/Extensions/IOImageLoader.kext/IOImageLoader')
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      cache_path = os.path.join(temporary_directory, 'cache.db')
+
+      output_writer = test_lib.TestOutputWriter()
+      test_file = unified_logging.TraceV3File(output_writer=output_writer)
+      test_file._uuidtext_path = test_path
+      test_file._image_values_cache = unified_logging.ImageValuesCache()
+      test_file._image_values_cache.Open(cache_path)
+
+      try:
+        image_values = test_file._GetDSCImageValues(
+            'dsc-version1', 121196, False)
+        self.assertIsNotNone(image_values)
+        self.assertEqual(image_values.path, expected_path)
+        self.assertEqual(image_values.string, 'ageLoaderRequest')
+
+        image_values = test_file._GetDSCImageValues(
+            'bogus', 121196, False)
+        self.assertIsNone(image_values)
+
+      finally:
+        test_file._image_values_cache.Close()
+
+        for dsc_file in test_file._cached_dsc_files.values():
+          if dsc_file:
+            dsc_file.Close()
+
+      # Test retrieving the image values from the cache only.
+      test_file = unified_logging.TraceV3File(output_writer=output_writer)
+      test_file._image_values_cache = unified_logging.ImageValuesCache()
+      test_file._image_values_cache.Open(cache_path)
+
+      try:
+        image_values = test_file._GetDSCImageValues(
+            'dsc-version1', 121196, False)
+        self.assertIsNotNone(image_values)
+        self.assertEqual(image_values.path, expected_path)
+        self.assertEqual(image_values.string, 'ageLoaderRequest')
+
+      finally:
+        test_file._image_values_cache.Close()
+
+  def testGetTimesyncRecordIndex(self):
+    """Tests the _GetTimesyncRecordIndex function."""
+    output_writer = test_lib.TestOutputWriter()
+    test_file = unified_logging.TraceV3File(output_writer=output_writer)
+
+    test_file._timesync_kernel_times = [100, 200, 300]
+    test_file._timesync_timestamps = [1000, 2000, 3000]
+
+    self.assertIsNone(test_file._GetTimesyncRecordIndex(50))
+    self.assertIsNone(test_file._GetTimesyncRecordIndex(99))
+    self.assertEqual(test_file._GetTimesyncRecordIndex(100), 0)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(150), 0)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(199), 0)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(250), 1)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(300), 2)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(5000), 2)
+    self.assertEqual(test_file._GetTimesyncRecordIndex(120), 0)
+
+    timestamp = test_file._GetTimestamp(250)
+    self.assertEqual(timestamp, 2050)
+
   def testReadCatalog(self):
     """Tests the _ReadCatalog function."""
     output_writer = test_lib.TestOutputWriter()
@@ -1639,6 +2480,54 @@ class TraceV3FileTest(test_lib.BaseTestCase):
 
     self.assertIsNotNone(chunk_header)
 
+  def testGetDataItemsAndValuesData(self):
+    """Tests the _GetDataItemsAndValuesData function."""
+    output_writer = test_lib.TestOutputWriter()
+    test_file = unified_logging.TraceV3File(
+        debug=True, output_writer=output_writer)
+
+    oversize_chunk_data = b''.join([
+        struct.pack('<QIBBHQIHHBB', 1, 2, 0, 0, 0, 0, 5, 4, 2, 0, 0),
+        b'abcdef'])
+
+    tracepoint_data_object = collections.namedtuple(
+        'tracepoint_data_object', ['data_reference'])(5)
+
+    oversize_chunk_store = unified_logging.OversizeChunkStore(
+        maximum_memory_size=len(oversize_chunk_data))
+
+    try:
+      oversize_chunk = test_file._ReadOversizeChunkData(
+          oversize_chunk_data, len(oversize_chunk_data), 0)
+      oversize_chunk_store.SetChunkData(
+          '1@2:0005', oversize_chunk_data, oversize_chunk=oversize_chunk)
+
+      output_writer.output = []
+
+      data_items, values_data, private_data = (
+          test_file._GetDataItemsAndValuesData(
+              '1@2', tracepoint_data_object, b'', b'', oversize_chunk_store))
+      self.assertEqual(len(data_items), 0)
+      self.assertEqual(values_data, b'abcd')
+      self.assertEqual(private_data, b'ef')
+
+      # Spill the oversize chunk so that it is read back from the spill file.
+      oversize_chunk_store.SetChunkData('1@2:0006', oversize_chunk_data)
+      self.assertEqual(oversize_chunk_store.number_of_spilled_chunks, 1)
+
+      data_items, values_data, private_data = (
+          test_file._GetDataItemsAndValuesData(
+              '1@2', tracepoint_data_object, b'', b'', oversize_chunk_store))
+      self.assertEqual(len(data_items), 0)
+      self.assertEqual(values_data, b'abcd')
+      self.assertEqual(private_data, b'ef')
+
+      # Looking up a stored oversize chunk does not print it again.
+      self.assertEqual(output_writer.output, [])
+
+    finally:
+      oversize_chunk_store.Close()
+
   def testReadChunkSet(self):
     """Tests the _ReadChunkSet function."""
     output_writer = test_lib.TestOutputWriter()
@@ -1650,7 +2539,9 @@ class TraceV3FileTest(test_lib.BaseTestCase):
 
     with open(test_file_path, 'rb') as file_object:
       chunk_header = test_file._ReadChunkHeader(file_object, 0x000001a8)
-      test_file._ReadChunkSet(file_object, 0x000001b8, chunk_header, {})
+      oversize_chunk_store = unified_logging.OversizeChunkStore()
+      test_file._ReadChunkSet(
+          file_object, 0x000001b8, chunk_header, oversize_chunk_store)
 
   def testReadBacktraceData(self):
     """Tests the _ReadBacktraceData function."""
@@ -1671,8 +2562,52 @@ class TraceV3FileTest(test_lib.BaseTestCase):
     output_writer = test_lib.TestOutputWriter()
     test_file = unified_logging.TraceV3File(output_writer=output_writer)
 
+    oversize_chunk_store = unified_logging.OversizeChunkStore()
     test_file._ReadFirehoseChunkData(
-        self._FIREHOSE_CHUNK_DATA, len(self._FIREHOSE_CHUNK_DATA), 0, {})
+        self._FIREHOSE_CHUNK_DATA, len(self._FIREHOSE_CHUNK_DATA), 0,
+        oversize_chunk_store)
+
+  def testReadFirehoseChunkDataWithLossAndFilter(self):
+    """Tests the _ReadFirehoseChunkData function with loss and a filter."""
+    test_file = unified_logging.TraceV3File()
+
+    process_information_entry = collections.namedtuple(
+        'process_information_entry', ['main_uuid', 'process_identifier'])(
+            None, 51)
+
+    test_file._catalog = object()
+    test_file._catalog_process_information_entries = {
+        '1@2': process_information_entry}
+
+    # Firehose chunk of process 51 with a loss tracepoint.
+    firehose_chunk_data = b''.join([
+        struct.pack('<QIBBHHHHBBQ', 1, 2, 0, 0, 0, 80, 0, 0, 0, 0, 0),
+        struct.pack('<BBHIQIHH', 0x07, 0, 0, 0, 0, 0, 0, 24),
+        struct.pack('<QQQ', 1, 2, 3)])
+
+    oversize_chunk_store = unified_logging.OversizeChunkStore()
+
+    log_entries = list(test_file._ReadFirehoseChunkData(
+        firehose_chunk_data, len(firehose_chunk_data), 0,
+        oversize_chunk_store))
+    self.assertEqual(len(log_entries), 1)
+
+    loss_log_entry = log_entries[0]
+    self.assertEqual(loss_log_entry.event_type, 'lossEvent')
+
+    # The filter is evaluated in the same way as LogEntryFilter.Matches.
+    for process_identifiers, expected_number_of_log_entries in (
+        ([0], 1), ([51], 0), ([1], 0)):
+      log_entry_filter = unified_logging.LogEntryFilter(
+          process_identifiers=process_identifiers)
+      self.assertEqual(
+          log_entry_filter.Matches(loss_log_entry),
+          bool(expected_number_of_log_entries))
+
+      log_entries = list(test_file._ReadFirehoseChunkData(
+          firehose_chunk_data, len(firehose_chunk_data), 0,
+          oversize_chunk_store, log_entry_filter=log_entry_filter))
+      self.assertEqual(len(log_entries), expected_number_of_log_entries)
 
   def testReadFirehoseTracepointActivityData(self):
     """Tests the _ReadFirehoseTracepointActivityData function."""
@@ -1689,6 +2624,13 @@ class TraceV3FileTest(test_lib.BaseTestCase):
     self.assertEqual(activity.new_activity_identifier, 0x80000000000000e1)
     self.assertEqual(activity.load_address_lower, 0x00047e48)
 
+    # Test with the activity data as a memory view.
+    activity, _ = test_file._ReadFirehoseTracepointActivityData(
+        0x01, 0x0213, memoryview(self._FIREHOSE_TRACEPOINT_ACTIVITY_DATA), 0)
+
+    self.assertIsNotNone(activity)
+    self.assertEqual(activity.new_activity_identifier, 0x80000000000000e1)
+
     with self.assertRaises(errors.ParseError):
       test_file._ReadFirehoseTracepointActivityData(
           0x01, 0xffff, self._FIREHOSE_TRACEPOINT_ACTIVITY_DATA, 0)
@@ -1752,6 +2694,28 @@ class TraceV3FileTest(test_lib.BaseTestCase):
       test_file._ReadFirehoseTracepointTraceData(
           0xffff, self._FIREHOSE_TRACEPOINT_TRACE_DATA1, 0)
 
+  def testReadFirehoseTracepointTraceRawValues(self):
+    """Tests the _ReadFirehoseTracepointTraceRawValues function."""
+    output_writer = test_lib.TestOutputWriter()
+    test_file = unified_logging.TraceV3File(output_writer=output_writer)
+
+    trace, _ = test_file._ReadFirehoseTracepointTraceData(
+        0x0000, self._FIREHOSE_TRACEPOINT_TRACE_DATA2, 0)
+
+    self.assertIsNotNone(trace)
+
+    values_data = memoryview(self._FIREHOSE_TRACEPOINT_TRACE_DATA2)[4:]
+
+    raw_values = test_file._ReadFirehoseTracepointTraceRawValues(
+        trace, values_data)
+
+    self.assertEqual(len(raw_values), 2)
+    self.assertEqual(raw_values[0], (None, b'\xb0\x60\xe1\x4b\xfb\x7f\x00\x00'))
+
+    # The value data is copied and does not reference the values data.
+    self.assertIsInstance(raw_values[0][1], bytes)
+    self.assertIsInstance(raw_values[1][1], bytes)
+
   def testReadFirehoseTracepointTraceValuesData(self):
     """Tests the _ReadFirehoseTracepointTraceValuesData function."""
     output_writer = test_lib.TestOutputWriter()
@@ -1895,6 +2859,246 @@ class TraceV3FileTest(test_lib.BaseTestCase):
     test_file.Open(test_file_path)
     test_file.Close()
 
+  def testReadLogEntriesPickle(self):
+    """Tests pickling log entries with deferred event messages."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    test_file = unified_logging.TraceV3File()
+    test_file.Open(test_file_path)
+
+    try:
+      log_entries = list(test_file.ReadLogEntries())
+    finally:
+      test_file.Close()
+
+    deferred_log_entries = [
+        log_entry for log_entry in log_entries
+        if log_entry._deferred_event_message]  # pylint: disable=protected-access
+    self.assertGreater(len(deferred_log_entries), 0)
+
+    # The deferred event messages are formatted after unpickling.
+    unpickled_log_entries = pickle.loads(pickle.dumps(deferred_log_entries))
+
+    for log_entry, unpickled_log_entry in zip(
+        deferred_log_entries, unpickled_log_entries):
+      self.assertIsNotNone(unpickled_log_entry._deferred_event_message)  # pylint: disable=protected-access
+      self.assertEqual(
+          unpickled_log_entry.event_message, log_entry.event_message)
+
+  def testReadLogEntriesWithChunkSetIndex(self):
+    """Tests the ReadLogEntries function with a chunk set index."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    test_file = unified_logging.TraceV3File()
+    test_file.Open(test_file_path)
+
+    try:
+      timestamps = sorted(
+          log_entry.timestamp for log_entry in test_file.ReadLogEntries())
+
+      start_timestamp = timestamps[len(timestamps) // 4]
+      end_timestamp = timestamps[len(timestamps) // 2]
+
+      expected_timestamps = [
+          log_entry.timestamp for log_entry in test_file.ReadLogEntries(
+              end_timestamp=end_timestamp, start_timestamp=start_timestamp)]
+      self.assertGreater(len(expected_timestamps), 0)
+
+      log_entry_filter = unified_logging.LogEntryFilter(
+          process_identifiers=[32149])
+
+      expected_log_entries = [
+          (log_entry.timestamp, log_entry.event_message)
+          for log_entry in test_file.ReadLogEntries(
+              log_entry_filter=log_entry_filter, end_timestamp=end_timestamp,
+              start_timestamp=start_timestamp)]
+      self.assertEqual(len(expected_log_entries), 481)
+
+    finally:
+      test_file.Close()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.tv3idx')
+
+      # The first reader builds and writes the index, the second reads it.
+      for _ in range(2):
+        test_file = unified_logging.TraceV3File()
+        test_file.Open(test_file_path)
+
+        try:
+          test_file.ReadChunkSetIndex(test_path)
+          self.assertTrue(os.path.exists(test_path))
+
+          timestamps = [
+              log_entry.timestamp for log_entry in test_file.ReadLogEntries(
+                  end_timestamp=end_timestamp,
+                  start_timestamp=start_timestamp)]
+
+          # The time range is combined with the process identifiers of
+          # the filter.
+          log_entries = [
+              (log_entry.timestamp, log_entry.event_message)
+              for log_entry in test_file.ReadLogEntries(
+                  log_entry_filter=log_entry_filter,
+                  end_timestamp=end_timestamp,
+                  start_timestamp=start_timestamp)]
+
+        finally:
+          test_file.Close()
+
+        self.assertEqual(timestamps, expected_timestamps)
+        self.assertEqual(log_entries, expected_log_entries)
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'test.tv3idx')
+
+      test_file = RecordingTraceV3File()
+      test_file.Open(test_file_path)
+
+      try:
+        test_file.ReadChunkSetIndex(test_path)
+
+        # Chunk sets that were read are not read again for their oversize
+        # chunks.
+        for _ in test_file.ReadLogEntries(start_timestamp=timestamps[0]):
+          unread_file_offsets = set(
+              test_file._unread_oversize_chunk_set_file_offsets)
+          self.assertFalse(unread_file_offsets.intersection(
+              test_file.chunk_set_file_offsets))
+
+      finally:
+        test_file.Close()
+
+  def testReadNewLogEntries(self):
+    """Tests the ReadNewLogEntries function."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    with open(test_file_path, 'rb') as file_object:
+      test_data = file_object.read()
+
+    test_file = unified_logging.TraceV3File()
+    test_file.Open(test_file_path)
+
+    try:
+      expected_timestamps = [
+          log_entry.timestamp for log_entry in test_file.ReadLogEntries()]
+    finally:
+      test_file.Close()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, 'logdata.LiveData.tracev3')
+
+      # The data is split within a chunk to simulate a partially written file.
+      with open(test_path, 'wb') as file_object:
+        file_object.write(test_data[:len(test_data) // 2])
+
+      cursor = unified_logging.TraceV3FileCursor()
+
+      test_file = unified_logging.TraceV3File()
+      test_file.Open(test_path)
+
+      try:
+        timestamps = [
+            log_entry.timestamp
+            for log_entry in test_file.ReadNewLogEntries(cursor)]
+        self.assertEqual(len(timestamps), 5424)
+
+        new_timestamps = [
+            log_entry.timestamp
+            for log_entry in test_file.ReadNewLogEntries(cursor)]
+        self.assertEqual(new_timestamps, [])
+
+      finally:
+        test_file.Close()
+
+      self.assertLess(cursor.file_offset, len(test_data) // 2)
+
+      # Only the chunk sets after the most recent catalog are restored.
+      self.assertTrue(all(
+          file_offset > cursor.catalog_file_offset
+          for file_offset in cursor.oversize_chunk_set_file_offsets))
+
+      with open(test_path, 'ab') as file_object:
+        file_object.write(test_data[len(test_data) // 2:])
+
+      # Resume with a cursor that was serialized by a previous reader.
+      cursor = unified_logging.TraceV3FileCursor.CopyFromDict(
+          cursor.CopyToDict())
+
+      test_file = unified_logging.TraceV3File()
+      test_file.Open(test_path)
+
+      try:
+        timestamps.extend([
+            log_entry.timestamp
+            for log_entry in test_file.ReadNewLogEntries(cursor)])
+      finally:
+        test_file.Close()
+
+    self.assertEqual(timestamps, expected_timestamps)
+
+  def testReadLogEntriesWithIncompleteChunk(self):
+    """Tests the ReadLogEntries function with an incomplete chunk."""
+    test_file_path = self._GetTestFilePath([
+        'unified_logging', '0000000000000f85.tracev3'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    with open(test_file_path, 'rb') as file_object:
+      test_data = file_object.read()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+      test_path = os.path.join(temporary_directory, '0000000000000f85.tracev3')
+
+      # Only ReadNewLogEntries tolerates a chunk that is not completely written.
+      with open(test_path, 'wb') as file_object:
+        file_object.write(test_data[:len(test_data) // 2])
+
+      test_file = unified_logging.TraceV3File()
+      test_file.Open(test_path)
+
+      try:
+        with self.assertRaises(errors.ParseError):
+          list(test_file.ReadLogEntries())
+
+      finally:
+        test_file.Close()
+
+
+class TraceV3FileCursorTest(test_lib.BaseTestCase):
+  """Resumable position in a tracev3 file tests."""
+
+  def testCopyToAndFromDict(self):
+    """Tests the CopyToDict and CopyFromDict functions."""
+    cursor = unified_logging.TraceV3FileCursor()
+    cursor.catalog_file_offset = 1232
+    cursor.chunk_set_index = 2
+    cursor.file_offset = 65536
+    cursor.oversize_chunk_set_file_offsets = [4096, 32768]
+
+    expected_cursor_dict = {
+        'catalog_file_offset': 1232,
+        'chunk_set_index': 2,
+        'file_offset': 65536,
+        'oversize_chunk_set_file_offsets': [4096, 32768]}
+
+    cursor_dict = cursor.CopyToDict()
+    self.assertEqual(cursor_dict, expected_cursor_dict)
+
+    cursor = unified_logging.TraceV3FileCursor.CopyFromDict(cursor_dict)
+    self.assertEqual(cursor.catalog_file_offset, 1232)
+    self.assertEqual(cursor.chunk_set_index, 2)
+    self.assertEqual(cursor.file_offset, 65536)
+    self.assertEqual(cursor.oversize_chunk_set_file_offsets, [4096, 32768])
+
+    cursor = unified_logging.TraceV3FileCursor.CopyFromDict({})
+    self.assertIsNone(cursor.file_offset)
+
 
 class UUIDTextFileTest(test_lib.BaseTestCase):
   """Apple Unified Logging and Activity Tracing (uuidtext) file tests."""
@@ -1987,6 +3191,21 @@ class UUIDTextFileTest(test_lib.BaseTestCase):
 
     self.assertEqual(string, 'system.install.apple-software')
 
+    # Test with string data read into memory.
+    test_file = unified_logging.UUIDTextFile(
+        output_writer=output_writer, preload_strings=True)
+    test_file.Open(test_file_path)
+
+    try:
+      string = test_file.GetString(0x00005591)
+      self.assertEqual(string, 'system.install.apple-software')
+
+      string = test_file.GetString(0xffffffff)
+      self.assertIsNone(string)
+
+    finally:
+      test_file.Close()
+
   def testReadFileObject(self):
     """Tests the ReadFileObject function."""
     output_writer = test_lib.TestOutputWriter()
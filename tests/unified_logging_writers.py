@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""Tests for Apple Unified Logging and Activity Tracing log entry writers."""
+
+import json
+import unittest
+import uuid
+
+from dfdatetime import posix_time as dfdatetime_posix_time
+
+from dtformats import unified_logging
+from dtformats import unified_logging_writers
+
+from tests import test_lib
+
+
+class LogEntryWritersTestCase(test_lib.BaseTestCase):
+  """Shared functionality for log entry writer tests."""
+
+  def _CreateTestLogEntries(self):
+    """Creates log entries for testing.
+
+    Returns:
+      list[LogEntry]: log entries.
+    """
+    backtrace_frame = unified_logging.BacktraceFrame()
+    backtrace_frame.image_identifier = uuid.UUID(
+        '671e0820-86ab-3339-a384-01efbd8017a4')
+    backtrace_frame.image_offset = 141347428
+
+    log_entry1 = unified_logging.LogEntry()
+    log_entry1.activity_identifier = 15020658
+    log_entry1.backtrace_frames = [backtrace_frame]
+    log_entry1.boot_identifier = uuid.UUID(
+        'a6ebc8e3-0a1c-40e8-93b9-da3a7f671d19')
+    log_entry1.category = 'MC'
+    log_entry1.creator_activity_identifier = 15020600
+    log_entry1.event_message = 'Path: "/usr/bin"\n\tdone\x01'
+    log_entry1.event_type = 'activityCreateEvent'
+    log_entry1.mach_timestamp = 96370345288136
+    log_entry1.process_identifier = 49549
+    log_entry1.process_image_path = '/usr/libexec/test'
+    log_entry1.sub_system = 'com.apple.ManagedConfiguration'
+    log_entry1.thread_identifier = 11090491
+    log_entry1.timestamp = 1653871101053672123
+    log_entry1.trace_identifier = 611508566008070148
+
+    log_entry2 = unified_logging.LogEntry()
+    log_entry2.activity_identifier = 15020658
+    log_entry2.boot_identifier = log_entry1.boot_identifier
+    log_entry2.event_message = 'second'
+    log_entry2.event_type = 'logEvent'
+    log_entry2.mach_timestamp = 96370345288137
+    log_entry2.message_type = 'Default'
+    log_entry2.timestamp = 1653871101274030000
+    log_entry2.trace_identifier = 2
+
+    return [log_entry1, log_entry2]
+
+
+class GetDateTimeStringTest(test_lib.BaseTestCase):
+  """Tests for the GetDateTimeString function."""
+
+  def testGetDateTimeString(self):
+    """Tests the GetDateTimeString function."""
+    date_time_string = unified_logging_writers.GetDateTimeString(None)
+    self.assertEqual(date_time_string, 'YYYY-MM-DD hh:ss:mm.######+####')
+
+    for timestamp in (0, 1653871101053672123, 1653871101999999999):
+      date_time = dfdatetime_posix_time.PosixTimeInNanoseconds(
+          timestamp=timestamp)
+      iso8601_string = date_time.CopyToDateTimeStringISO8601()
+      expected_date_time_string = ''.join([
+          iso8601_string[:10], ' ', iso8601_string[11:26],
+          iso8601_string[29:32], iso8601_string[33:35]])
+
+      date_time_string = unified_logging_writers.GetDateTimeString(timestamp)
+      self.assertEqual(date_time_string, expected_date_time_string)
+
+
+class JSONLogEntryWriterTest(LogEntryWritersTestCase):
+  """JSON log entry writer tests."""
+
+  def testWriteLogEntries(self):
+    """Tests the WriteLogEntries function."""
+    output_writer = test_lib.TestOutputWriter()
+    log_entry_writer = unified_logging_writers.JSONLogEntryWriter(
+        output_writer)
+
+    log_entry_writer.WriteHeader()
+    log_entry_writer.WriteLogEntries(self._CreateTestLogEntries())
+    log_entry_writer.WriteFooter()
+
+    output = ''.join(output_writer.output)
+    self.assertTrue(output.startswith('[{\n  "traceID" : 611508566008070148,'))
+    self.assertIn('\n},{\n', output)
+    self.assertTrue(output.endswith('  "timezoneName" : ""\n}]'))
+
+    json_objects = json.loads(output)
+    self.assertEqual(len(json_objects), 2)
+
+    json_object = json_objects[0]
+    self.assertEqual(
+        json_object['eventMessage'], 'Path: "/usr/bin"\n\tdone\x01')
+    self.assertEqual(json_object['backtrace'], {'frames': [{
+        'imageOffset': 141347428,
+        'imageUUID': '671E0820-86AB-3339-A384-01EFBD8017A4'}]})
+    self.assertEqual(json_object['creatorActivityID'], 15020600)
+    self.assertEqual(
+        json_object['timestamp'], '2022-05-30 00:38:21.053672+0000')
+
+    json_object = json_objects[1]
+    self.assertEqual(json_object['parentActivityIdentifier'], 15020600)
+
+  def testWriteLogEntriesInWorkers(self):
+    """Tests the WriteLogEntries function with worker processes."""
+    output_writer = test_lib.TestOutputWriter()
+    log_entry_writer = unified_logging_writers.JSONLogEntryWriter(
+        output_writer)
+    log_entry_writer._BATCH_SIZE = 1  # pylint: disable=protected-access
+
+    log_entry_writer.WriteLogEntries(self._CreateTestLogEntries())
+    expected_output = ''.join(output_writer.output)
+
+    output_writer = test_lib.TestOutputWriter()
+    log_entry_writer = unified_logging_writers.JSONLogEntryWriter(
+        output_writer, number_of_workers=2)
+    log_entry_writer._BATCH_SIZE = 1  # pylint: disable=protected-access
+
+    log_entry_writer.WriteLogEntries(self._CreateTestLogEntries())
+    output = ''.join(output_writer.output)
+
+    self.assertEqual(output, expected_output)
+
+
+class NDJSONLogEntryWriterTest(LogEntryWritersTestCase):
+  """Newline delimited JSON (NDJSON) log entry writer tests."""
+
+  def testWriteLogEntries(self):
+    """Tests the WriteLogEntries function."""
+    output_writer = test_lib.TestOutputWriter()
+    log_entry_writer = unified_logging_writers.NDJSONLogEntryWriter(
+        output_writer)
+
+    log_entry_writer.WriteHeader()
+    log_entry_writer.WriteLogEntries(self._CreateTestLogEntries())
+    log_entry_writer.WriteFooter()
+
+    lines = ''.join(output_writer.output).split('\n')
+    self.assertEqual(len(lines), 3)
+    self.assertEqual(lines[2], '')
+
+    json_object = json.loads(lines[0])
+    self.assertEqual(json_object['traceID'], 611508566008070148)
+    self.assertEqual(json_object['backtrace'], {'frames': [{
+        'imageOffset': 141347428,
+        'imageUUID': '671E0820-86AB-3339-A384-01EFBD8017A4'}]})
+
+    json_object = json.loads(lines[1])
+    self.assertEqual(json_object['eventMessage'], 'second')
+
+
+class TextLogEntryWriterTest(LogEntryWritersTestCase):
+  """Text log entry writer tests."""
+
+  def testWriteLogEntries(self):
+    """Tests the WriteLogEntries function."""
+    output_writer = test_lib.TestOutputWriter()
+    log_entry_writer = unified_logging_writers.TextLogEntryWriter(
+        output_writer)
+
+    log_entry_writer.WriteHeader()
+    log_entry_writer.WriteLogEntries(self._CreateTestLogEntries())
+    log_entry_writer.WriteFooter()
+
+    # The event message of the first log entry contains an end-of-line.
+    lines = ''.join(output_writer.output).split('\n')
+    self.assertEqual(len(lines), 5)
+    self.assertTrue(lines[0].startswith('Timestamp '))
+    self.assertEqual(lines[3], (
+        '2022-05-30 00:38:21.274030+0000\t0x0       \tlogEvent   \t'
+        '0xe53272            \t0     \t0   \tsecond'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
 """Tests for WMI Common Information Model (CIM) repository files."""
 
+import io
 import os
+import pickle
+import struct
 import unittest
 
 from dtformats import wmi_repository
@@ -11,7 +14,33 @@ from tests import test_lib
 
 # TODO: add tests for IndexBinaryTreePage
 # TODO: add tests for ObjectRecord
-# TODO: add tests for ObjectsDataPage
+
+
+class ObjectsDataPageTest(test_lib.BaseTestCase):
+  """Objects data page tests."""
+
+  def testGetObjectDescriptor(self):
+    """Tests the GetObjectDescriptor function."""
+    objects_page = wmi_repository.ObjectsDataPage(8192)
+
+    for identifier in range(1, 101):
+      object_descriptor = wmi_repository.ObjectDescriptor(
+          identifier, identifier * 16, identifier, 0)
+      objects_page.AppendObjectDescriptor(object_descriptor)
+
+    # The first object descriptor with an identifier is used.
+    objects_page.AppendObjectDescriptor(
+        wmi_repository.ObjectDescriptor(50, 0, 0, 0))
+
+    object_descriptor = objects_page.GetObjectDescriptor(50, 50)
+    self.assertIsNotNone(object_descriptor)
+    self.assertEqual(object_descriptor.data_offset, 800)
+
+    object_descriptor = objects_page.GetObjectDescriptor(50, 99)
+    self.assertIsNone(object_descriptor)
+
+    object_descriptor = objects_page.GetObjectDescriptor(200, 200)
+    self.assertIsNone(object_descriptor)
 
 
 class IndexBinaryTreeFileTest(test_lib.BaseTestCase):
@@ -30,6 +59,34 @@ class IndexBinaryTreeFileTest(test_lib.BaseTestCase):
   # TODO: add tests for GetMappedPage
   # TODO: add tests for GetRootPage
 
+  def testGetPage(self):
+    """Tests the GetPage function."""
+    page_cache = wmi_repository.PageCache(maximum_number_of_pages=2)
+
+    output_writer = test_lib.TestOutputWriter()
+    test_file = wmi_repository.IndexBinaryTreeFile(
+        output_writer=output_writer, page_cache=page_cache)
+
+    test_file_path = self._GetTestFilePath(['cim', 'INDEX.BTR'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    test_file.Open(test_file_path)
+
+    try:
+      index_page = test_file.GetPage(1)
+      self.assertIsNotNone(index_page)
+      self.assertEqual(page_cache.number_of_misses, 1)
+
+      cached_index_page = test_file.GetPage(1)
+      self.assertIs(cached_index_page, index_page)
+      self.assertEqual(page_cache.number_of_hits, 1)
+
+      index_page = test_file.GetPage(0xffffff)
+      self.assertIsNone(index_page)
+
+    finally:
+      test_file.Close()
+
   def testReadFileObject(self):
     """Tests the ReadFileObject."""
     test_file_path = self._GetTestFilePath(['cim', 'INDEX.MAP'])
@@ -128,6 +185,40 @@ class ObjectsDataFileTest(test_lib.BaseTestCase):
   # TODO: add tests GetMappedPage
   # TODO: add tests GetObjectRecordByKey
 
+  # pylint: disable=protected-access
+
+  def testReadObjectDescriptors(self):
+    """Tests the _ReadObjectDescriptors function."""
+    page_data = b''.join([
+        struct.pack('<4I', 1, 64, 32, 0x12345678),
+        struct.pack('<4I', 2, 96, 1024, 0x9abcdef0),
+        struct.pack('<4I', 3, 1120, 16, 0x00000001),
+        b'\x00' * 16])
+    page_data += b'\xff' * (8192 - len(page_data))
+
+    for debug in (False, True):
+      output_writer = test_lib.TestOutputWriter()
+      test_file = wmi_repository.ObjectsDataFile(
+          debug=debug, output_writer=output_writer)
+
+      file_object = io.BytesIO(b''.join([b'\x00' * 8192, page_data]))
+      file_object.seek(8192, os.SEEK_SET)
+
+      objects_page = wmi_repository.ObjectsDataPage(8192)
+      test_file._ReadObjectDescriptors(file_object, objects_page)
+
+      object_descriptor = objects_page.GetObjectDescriptor(2, 1024)
+      self.assertIsNotNone(object_descriptor)
+      self.assertEqual(object_descriptor.data_checksum, 0x9abcdef0)
+      self.assertEqual(object_descriptor.data_file_offset, 8192 + 16 + 96)
+      self.assertEqual(object_descriptor.data_offset, 96)
+
+      object_descriptor = objects_page.GetObjectDescriptor(3, 16)
+      self.assertIsNotNone(object_descriptor)
+
+      object_descriptor = objects_page.GetObjectDescriptor(0xffffffff, 0)
+      self.assertIsNone(object_descriptor)
+
   def testReadFileObject(self):
     """Tests the ReadFileObject."""
     test_file_path = self._GetTestFilePath(['cim', 'OBJECTS.MAP'])
@@ -143,7 +234,244 @@ class ObjectsDataFileTest(test_lib.BaseTestCase):
     test_file.Open(test_file_path)
 
 
-# TODO: add tests for CIMRepository
+class PageCacheTest(test_lib.BaseTestCase):
+  """Size-bounded least recently used (LRU) page cache tests."""
+
+  def testGetAndSetPage(self):
+    """Tests the GetPage and SetPage functions."""
+    page_cache = wmi_repository.PageCache(maximum_number_of_pages=2)
+
+    page_cache.SetPage(('index', 1), 'page1')
+    page_cache.SetPage(('index', 2), 'page2')
+
+    page = page_cache.GetPage(('index', 1))
+    self.assertEqual(page, 'page1')
+
+    # Page 2 is the least recently used page and is removed.
+    page_cache.SetPage(('index', 3), 'page3')
+
+    page = page_cache.GetPage(('index', 2))
+    self.assertIsNone(page)
+
+    page = page_cache.GetPage(('index', 3))
+    self.assertEqual(page, 'page3')
+
+    self.assertEqual(page_cache.number_of_hits, 2)
+    self.assertEqual(page_cache.number_of_misses, 1)
+
+    page_cache.Empty()
+
+    page = page_cache.GetPage(('index', 1))
+    self.assertIsNone(page)
+
+  def testMaximumSize(self):
+    """Tests the maximum size in bytes."""
+    page_cache = wmi_repository.PageCache(maximum_size=8192)
+
+    page_cache.SetPage(('objects', 1, False), 'page1')
+    page_cache.SetPage(('objects', 2, False), 'page2')
+
+    page = page_cache.GetPage(('objects', 1, False))
+    self.assertIsNone(page)
+
+    page_cache = wmi_repository.PageCache(maximum_size=0)
+
+    page_cache.SetPage(('objects', 1, False), 'page1')
+
+    page = page_cache.GetPage(('objects', 1, False))
+    self.assertIsNone(page)
+
+
+class InstanceTest(test_lib.BaseTestCase):
+  """Instance tests."""
+
+  def testPickle(self):
+    """Tests pickling an instance."""
+    instance = wmi_repository.Instance()
+    instance.class_name = 'Win32_Service'
+    instance.properties['Name'] = 'test'
+
+    # Cache a data type map, which cannot be pickled.
+    instance._GetDataTypeMap('uint32le')  # pylint: disable=protected-access
+
+    instance = pickle.loads(pickle.dumps(instance))
+    self.assertEqual(instance.class_name, 'Win32_Service')
+    self.assertEqual(instance.properties, {'Name': 'test'})
+
+
+class CIMRepositoryTest(test_lib.BaseTestCase):
+  """CIM repository tests."""
+
+  # pylint: disable=protected-access
+
+  _INSTANCE_BLOCK_DATA = b''.join([
+      struct.pack('<IB', 0, 0),
+      struct.pack('<IB', 4, 1),
+      struct.pack('<I', 0),
+      b'\x00Win32_Service\x00'])
+
+  def testDecodeInstancesInWorker(self):
+    """Tests the _DecodeInstancesInWorker function."""
+    class_value_data_map = wmi_repository.ClassValueDataMap()
+    class_value_data_map.class_name = 'Win32_Service'
+    class_value_data_map.derivation = ['Win32_BaseService']
+    class_value_data_map.super_class_name = 'Win32_BaseService'
+
+    lookup_key = ('fedcba9876543210', '0123456789abcdef')
+    class_value_data_maps = {lookup_key: class_value_data_map}
+    instance_values = [
+        (lookup_key, self._INSTANCE_BLOCK_DATA, 0),
+        (lookup_key, self._INSTANCE_BLOCK_DATA, 128)]
+
+    instances = wmi_repository.CIMRepository._DecodeInstancesInWorker(
+        class_value_data_maps, instance_values)
+    self.assertEqual(len(instances), 2)
+
+    instance = instances[0]
+    self.assertEqual(instance.class_name, 'Win32_Service')
+    self.assertEqual(instance.derivation, ['Win32_BaseService'])
+    self.assertEqual(instance.super_class_name, 'Win32_BaseService')
+    self.assertEqual(instance.properties, {})
+
+    # The instances must be able to be returned by a worker process.
+    instance = pickle.loads(pickle.dumps(instance))
+    self.assertEqual(instance.class_name, 'Win32_Service')
+
+  def testGetClassDefinitionKeyByHash(self):
+    """Tests the _GetClassDefinitionKeyByHash function."""
+    test_file_path = self._GetTestFilePath(['cim', 'INDEX.BTR'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    cim_repository = wmi_repository.CIMRepository()
+    cim_repository.Open(test_file_path)
+
+    try:
+      # Class definition in the namespace: ROOT\CIMV2
+      key = cim_repository._GetClassDefinitionKeyByHash(
+          '5e472a8237ad2890bcd6323b5f35a15f',
+          namespace_hash='dd73323810dab2d362482d85928c165a')
+      self.assertEqual(key, (
+          '\\NS_DD73323810DAB2D362482D85928C165A\\'
+          'CD_5E472A8237AD2890BCD6323B5F35A15F.54.1.15681'))
+
+      # System class definition of __NAMESPACE
+      key = cim_repository._GetClassDefinitionKeyByHash(
+          'e5844d1645b0b6e6f2af610eb14bfc34')
+      self.assertEqual(key, (
+          '\\NS_DBF21B925FFA9E1C6698804D0E53308C\\'
+          'CD_E5844D1645B0B6E6F2AF610EB14BFC34.1.692295.180'))
+
+      # The keys of all class definitions are only determined if a class
+      # definition is not found in the namespace.
+      self.assertIsNone(cim_repository._class_definition_keys_by_hash)
+
+      key = cim_repository._GetClassDefinitionKeyByHash(
+          '5e472a8237ad2890bcd6323b5f35a15f')
+      self.assertIsNotNone(key)
+      self.assertIsNotNone(cim_repository._class_definition_keys_by_hash)
+
+      key = cim_repository._GetClassDefinitionKeyByHash(
+          '00000000000000000000000000000000')
+      self.assertIsNone(key)
+
+    finally:
+      cim_repository.Close()
+
+  def testGetClassValueMapByHash(self):
+    """Tests the _GetClassValueMapByHash function."""
+    test_file_path = self._GetTestFilePath(['cim', 'INDEX.BTR'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    cim_repository = wmi_repository.CIMRepository()
+    cim_repository.Open(test_file_path)
+
+    class_name_hash = '19aeda42897eb08b8d27bee505daa661'
+    namespace_hashes = [
+        '14bb13e874022cd07b1538a79462e04a',
+        '20ebe06767bdcebbe048c0dd418462c2',
+        '8dfcca0b7fab09c32755407485035a60']
+
+    try:
+      # The class is defined differently in each namespace, which is
+      # simulated by class definitions that are already read.
+      for namespace_hash in namespace_hashes:
+        class_definition = wmi_repository.ClassDefinition()
+        class_definition.name = f'Class in: {namespace_hash:s}'
+        cim_repository._class_definitions_by_hash[
+            (namespace_hash, class_name_hash)] = class_definition
+
+      for namespace_hash in namespace_hashes:
+        class_value_data_map = cim_repository._GetClassValueMapByHash(
+            class_name_hash.upper(), namespace_hash=namespace_hash.upper())
+        self.assertEqual(
+            class_value_data_map.class_name, f'Class in: {namespace_hash:s}')
+
+      for namespace_hash in reversed(namespace_hashes):
+        class_value_data_map = cim_repository._GetClassValueMapByHash(
+            class_name_hash, namespace_hash=namespace_hash)
+        self.assertEqual(
+            class_value_data_map.class_name, f'Class in: {namespace_hash:s}')
+
+    finally:
+      cim_repository.Close()
+
+  def testIterateKeysWithPrefix(self):
+    """Tests the IterateKeysWithPrefix function."""
+    test_file_path = self._GetTestFilePath(['cim', 'INDEX.BTR'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    cim_repository = wmi_repository.CIMRepository()
+    cim_repository.Open(test_file_path)
+
+    try:
+      keys = list(cim_repository.IterateKeysWithPrefix(
+          'dd73323810dab2d362482d85928c165a',
+          class_hash='27c6485611261f773ba4d3ad51c80a17'))
+      self.assertEqual(len(keys), 40)
+      self.assertIn((
+          '\\NS_DD73323810DAB2D362482D85928C165A\\'
+          'CI_27C6485611261F773BA4D3AD51C80A17\\'
+          'IL_97EC605428C3E50A2F9A63B5DCE6F8AB.6.599947.231'), keys)
+      self.assertEqual(keys, sorted(keys))
+
+      # Only the pages that can contain the keys are read.
+      self.assertLessEqual(cim_repository.page_cache.number_of_misses, 4)
+
+      keys = list(cim_repository.IterateKeysWithPrefix(
+          'dd73323810dab2d362482d85928c165a'))
+      self.assertEqual(len(keys), 2537)
+
+    finally:
+      cim_repository.Close()
+
+  def testLookupKey(self):
+    """Tests the LookupKey function."""
+    test_file_path = self._GetTestFilePath(['cim', 'INDEX.BTR'])
+    self._SkipIfPathNotExists(test_file_path)
+
+    cim_repository = wmi_repository.CIMRepository()
+    cim_repository.Open(test_file_path)
+
+    expected_key = (
+        '\\NS_14BB13E874022CD07B1538A79462E04A\\'
+        'CD_1BFFA3D61D060515FED695AD97593472.643.693832.348')
+
+    try:
+      key = cim_repository.LookupKey((
+          '\\NS_14BB13E874022CD07B1538A79462E04A\\'
+          'CD_1BFFA3D61D060515FED695AD97593472'))
+      self.assertEqual(key, expected_key)
+
+      key = cim_repository.LookupKey(expected_key)
+      self.assertEqual(key, expected_key)
+
+      key = cim_repository.LookupKey((
+          '\\NS_14BB13E874022CD07B1538A79462E04A\\'
+          'CD_00000000000000000000000000000000'))
+      self.assertIsNone(key)
+
+    finally:
+      cim_repository.Close()
 
 
 if __name__ == '__main__':